@@ -1,2 +1,12 @@
 from .optimizers import DE, AsyncDE
-from .optimizers import DEHB, PDEHB
+from .optimizers import DEHB
+
+__all__ = ["DE", "AsyncDE", "DEHB", "PDEHB"]
+
+
+def __getattr__(name):
+    # PDEHB is imported on first access, see dehb.optimizers
+    if name == "PDEHB":
+        from .optimizers import PDEHB
+        return PDEHB
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
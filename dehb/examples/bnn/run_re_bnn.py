@@ -14,7 +14,6 @@ https://colab.research.google.com/github/google-research/google-research/blob/ma
 
 import os
 import sys
-import json
 import random
 import argparse
 import collections
@@ -24,6 +23,7 @@ from copy import deepcopy
 
 from hpolib.benchmarks.ml.bnn_benchmark import BNNOnBostonHousing, BNNOnProteinStructure
 from hpolib.benchmarks.ml.bnn_benchmark import BNNOnToyFunction, BNNOnYearPrediction
+from dehb.utils.results import save_run
 
 
 global_cost = []
@@ -243,9 +243,7 @@ if runs is None:
 
     res = convert_to_json(history)
 
-    fh = open(os.path.join(output_path, 'run_%d.json' % args.run_id), 'w')
-    json.dump(res, fh)
-    fh.close()
+    save_run(output_path, args.run_id, res)
 else:
     ### Multiple runs
     for run_id in range(runs):
@@ -256,7 +254,5 @@ else:
 
         res = convert_to_json(history)
 
-        fh = open(os.path.join(output_path, 'run_%d.json' % run_id), 'w')
-        json.dump(res, fh)
-        fh.close()
+        save_run(output_path, run_id, res)
         print("Run saved. Resetting...")
@@ -1,10 +1,10 @@
 import os
-import json
 import pickle
 import collections
 import numpy as np
 import pandas as pd
 from scipy import stats
+from dehb.utils.results import load_run
 
 
 def create_plot(plt, methods, path, regret_type, fill_trajectory,
@@ -33,7 +33,7 @@ def create_plot(plt, methods, path, regret_type, fill_trajectory,
         for k, i in enumerate(np.arange(n_runs)):
             try:
                 if 'de' in m or 'evolution' in m:
-                    res = json.load(open(os.path.join(path, m, "run_{}.json".format(i))))
+                    res = load_run(os.path.join(path, m), i)
                 else:
                     res = pickle.load(open(os.path.join(path, m,
                                                         "{}_run_{}.pkl".format(m, i)), 'rb'))
@@ -62,7 +62,7 @@ def create_plot(plt, methods, path, regret_type, fill_trajectory,
             min_time = max(min_time, t)
             te, time = fill_trajectory(regret, runtimes, replace_nan=3000)
 
-            idx = time.tolist().index(t)
+            idx = np.searchsorted(time, t)
             te = te[idx:, :]
             time = time[idx:]
 
@@ -3,7 +3,6 @@
 
 import os
 import sys
-import json
 import pickle
 import argparse
 import numpy as np
@@ -14,6 +13,7 @@ from hpolib.benchmarks.rl.cartpole import CartpoleReduced as surrogate
 
 from dehb import DE
 from dehb import DEHB, DEHB_0, DEHB_1, DEHB_2, DEHB_3
+from dehb.utils.results import save_run
 
 
 # Common objective function for DE & DEHB representing Cartpole RL surrogates
@@ -47,14 +47,12 @@ def calc_regrets(history):
     return valid_scores, test_scores
 
 
-def save_json(valid, test, runtime, output_path, run_id):
+def save_results(valid, test, runtime, output_path, run_id, history=None):
     res = {}
     res['regret_validation'] = valid
     res['regret_test'] = test
     res['runtime'] = np.cumsum(runtime).tolist()
-    fh = open(os.path.join(output_path, 'run_{}.json'.format(run_id)), 'w')
-    json.dump(res, fh)
-    fh.close()
+    save_run(output_path, run_id, res, history)
 
 
 def save_configspace(cs, path, filename='configspace'):
@@ -148,7 +146,7 @@ if args.runs is None:  # for a single run
     traj, runtime, history = dehb.run(iterations=args.iter, verbose=args.verbose)
     valid_scores, test_scores = calc_regrets(history)
 
-    save_json(valid_scores, test_scores, runtime, output_path, args.run_id)
+    save_results(valid_scores, test_scores, runtime, output_path, args.run_id, history)
 
 else:  # for multiple runs
     for run_id, _ in enumerate(range(args.runs), start=args.run_start):
@@ -160,7 +158,7 @@ else:  # for multiple runs
         traj, runtime, history = dehb.run(iterations=args.iter, verbose=args.verbose)
         valid_scores, test_scores = calc_regrets(history)
 
-        save_json(valid_scores, test_scores, runtime, output_path, run_id)
+        save_results(valid_scores, test_scores, runtime, output_path, run_id, history)
 
         if args.verbose:
             print("Run saved. Resetting...")
@@ -1,8 +1,8 @@
 import os
-import json
 import pickle
 import numpy as np
 from scipy import stats
+from dehb.utils.results import load_run
 
 
 def create_plot(plt, methods, path, regret_type, fill_trajectory,
@@ -21,7 +21,7 @@ def create_plot(plt, methods, path, regret_type, fill_trajectory,
         runtimes = []
         for k, i in enumerate(np.arange(n_runs)):
             try:
-                res = json.load(open(os.path.join(path, m, "run_{}.json".format(i))))
+                res = load_run(os.path.join(path, m), i)
             except Exception as e:
                 print(m, i, e)
                 runtimes.append(limit)
@@ -44,7 +44,7 @@ def create_plot(plt, methods, path, regret_type, fill_trajectory,
         runtimes = []
         for k, i in enumerate(np.arange(n_runs)):
             try:
-                res = json.load(open(os.path.join(path, m, "run_{}.json".format(i))))
+                res = load_run(os.path.join(path, m), i)
                 no_runs_found = False
             except Exception as e:
                 print(m, i, e)
@@ -65,7 +65,7 @@ def create_plot(plt, methods, path, regret_type, fill_trajectory,
             min_time = min(min_time, t)
             te, time = fill_trajectory(regret, runtimes, replace_nan=1)
 
-            idx = time.tolist().index(t)
+            idx = np.searchsorted(time, t)
             te = te[idx:, :]
             time = time[idx:]
 
@@ -4,7 +4,6 @@
 import os
 import sys
 
-import json
 import pickle
 import logging
 import argparse
@@ -22,6 +21,7 @@ from utils import util
 sys.path.append(os.path.join(os.getcwd(), '../HPOlib3/'))
 from hpolib.benchmarks.ml.xgboost_benchmark import XGBoostBenchmark as Benchmark
 from hpolib.util.openml_data_manager import get_openmlcc18_taskids
+from dehb.utils.results import save_run
 
 
 # task_ids = get_openmlcc18_taskids()
@@ -147,9 +147,7 @@ if args.runs is None:
                 trials=trials)
 
     res = convert_to_json(trials.results)
-    fh = open(os.path.join(output_path, 'run_{}.json'.format(args.run_id)), 'w')
-    json.dump(res, fh)
-    fh.close()
+    save_run(output_path, args.run_id, res)
 
 else:
     for run_id, _ in enumerate(range(args.runs), start=args.run_start):
@@ -165,6 +163,4 @@ else:
                     trials=trials)
 
         res = convert_to_json(trials.results)
-        fh = open(os.path.join(output_path, 'run_{}.json'.format(run_id)), 'w')
-        json.dump(res, fh)
-        fh.close()
+        save_run(output_path, run_id, res)
@@ -1,9 +1,9 @@
 import os
-import json
 import pickle
 import numpy as np
 import pandas as pd
 from scipy import stats
+from dehb.utils.results import load_run
 
 
 def create_plot(plt, methods, path, regret_type, fill_trajectory,
@@ -34,7 +34,7 @@ def create_plot(plt, methods, path, regret_type, fill_trajectory,
         for k, i in enumerate(np.arange(n_runs)):
             try:
                 if 'de' in m or 'evolution' in m or ('smac' in m and d == 64) or m == 'rs':
-                    res = json.load(open(os.path.join(path, m, "run_{}.json".format(i))))
+                    res = load_run(os.path.join(path, m), i)
                 else:
                     res = pickle.load(open(os.path.join(path, m,
                                                         "{}_run_{}.pkl".format(m, i)), 'rb'))
@@ -66,7 +66,7 @@ def create_plot(plt, methods, path, regret_type, fill_trajectory,
             min_time = min(min_time, t)
             te, time = fill_trajectory(regret, runtimes, replace_nan=1)
 
-            idx = time.tolist().index(t)
+            idx = np.searchsorted(time, t)
             te = te[idx:, :]
             time = time[idx:]
 
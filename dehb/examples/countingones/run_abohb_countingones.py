@@ -1,6 +1,5 @@
 import os
 import time
-import json
 import pickle
 import argparse
 import numpy as np
@@ -11,6 +10,7 @@ import autogluon as ag
 from hpolib.benchmarks.synthetic_functions.counting_ones import CountingOnes
 
 from dehb import DEHB
+from dehb.utils.results import save_run
 
 
 def calc_regrets(history):
@@ -33,14 +33,12 @@ def calc_regrets(history):
     return valid_scores, test_scores
 
 
-def save_json(valid, test, runtime, output_path, run_id):
+def save_results(valid, test, runtime, output_path, run_id):
     res = {}
     res['regret_validation'] = valid
     res['regret_test'] = test
     res['runtime'] = np.cumsum(runtime).tolist()
-    fh = open(os.path.join(output_path, 'run_{}.json'.format(run_id)), 'w')
-    json.dump(res, fh)
-    fh.close()
+    save_run(output_path, run_id, res)
 
 
 def save_configspace(cs, path, filename='configspace'):
@@ -83,9 +81,7 @@ def save_to_json(training_history, output_path, run_id):
     res['validation_score'] = result["best"].tolist()
     res['test_score'] = result["best_test"].tolist()
     res['runtime'] = result["x"].tolist()
-    fh = open(os.path.join(output_path, 'run_{}.json'.format(run_id)), 'w')
-    json.dump(res, fh)
-    fh.close()
+    save_run(output_path, run_id, res)
 
 
 parser = argparse.ArgumentParser()
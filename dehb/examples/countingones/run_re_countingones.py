@@ -14,7 +14,6 @@ https://colab.research.google.com/github/google-research/google-research/blob/ma
 
 import os
 import sys
-import json
 import random
 import argparse
 import collections
@@ -23,6 +22,7 @@ import numpy as np
 from copy import deepcopy
 
 from hpolib.benchmarks.synthetic_functions.counting_ones import CountingOnes
+from dehb.utils.results import save_run
 
 
 global_cost = []
@@ -242,9 +242,7 @@ if runs is None:
 
     res = convert_to_json(history)
 
-    fh = open(os.path.join(output_path, 'run_%d.json' % args.run_id), 'w')
-    json.dump(res, fh)
-    fh.close()
+    save_run(output_path, args.run_id, res)
 else:
     ### Multiple runs
     for run_id in range(runs):
@@ -255,7 +253,5 @@ else:
 
         res = convert_to_json(history)
 
-        fh = open(os.path.join(output_path, 'run_%d.json' % run_id), 'w')
-        json.dump(res, fh)
-        fh.close()
+        save_run(output_path, run_id, res)
         print("Run saved. Resetting...")
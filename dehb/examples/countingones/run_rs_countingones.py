@@ -1,11 +1,11 @@
 import os
 import sys
-import json
 import pickle
 import argparse
 import numpy as np
 
 from hpolib.benchmarks.synthetic_functions.counting_ones import CountingOnes
+from dehb.utils.results import save_run
 
 
 # Common objective function for DE & DEHB representing Counting Ones benchmark
@@ -35,13 +35,11 @@ def calc_regrets(trajectory):
     return valid_scores
 
 
-def save_json(valid, runtime, output_path, run_id):
+def save_results(valid, runtime, output_path, run_id):
     res = {}
     res['regret_validation'] = valid
     res['runtime'] = np.cumsum(runtime).tolist()
-    fh = open(os.path.join(output_path, 'run_{}.json'.format(run_id)), 'w')
-    json.dump(res, fh)
-    fh.close()
+    save_run(output_path, run_id, res)
 
 
 def save_configspace(cs, path, filename='configspace'):
@@ -121,7 +119,7 @@ if args.runs is None:  # for a single run
         np.random.seed(args.run_id)
     traj, runtime = run_random_search(iterations=args.iter, verbose=args.verbose)
     valid_scores = calc_regrets(traj)
-    save_json(valid_scores, runtime, output_path, args.run_id)
+    save_results(valid_scores, runtime, output_path, args.run_id)
 
 else:  # for multiple runs
     for run_id, _ in enumerate(range(args.runs), start=args.run_start):
@@ -131,6 +129,6 @@ else:  # for multiple runs
             print("\nRun #{:<3}\n{}".format(run_id + 1, '-' * 8))
         traj, runtime = run_random_search(iterations=args.iter, verbose=args.verbose)
         valid_scores = calc_regrets(traj)
-        save_json(valid_scores, runtime, output_path, run_id)
+        save_results(valid_scores, runtime, output_path, run_id)
 
 save_configspace(cs, output_path)
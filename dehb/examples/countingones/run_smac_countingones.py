@@ -1,6 +1,5 @@
 import os
 import sys
-import json
 import pickle
 import argparse
 import numpy as np
@@ -10,6 +9,7 @@ from smac.facade.smac_hpo_facade import SMAC4HPO as SMAC
 from smac.initial_design.latin_hypercube_design import LHDesign
 
 from hpolib.benchmarks.synthetic_functions.counting_ones import CountingOnes
+from dehb.utils.results import save_run
 
 
 def objective_function(config, **kwargs):
@@ -42,14 +42,12 @@ def calc_regrets(data):
     return valid_regret, test_regret, runtimes
 
 
-def save_json(valid, test, runtime, output_path, run_id):
+def save_results(valid, test, runtime, output_path, run_id):
     res = dict()
     res['regret_validation'] = valid
     res['regret_test'] = test
     res['runtime'] = np.cumsum(runtime).tolist()
-    fh = open(os.path.join(output_path, 'run_{}.json'.format(run_id)), 'w')
-    json.dump(res, fh)
-    fh.close()
+    save_run(output_path, run_id, res)
 
 
 def save_configspace(cs, path, filename='configspace'):
@@ -106,7 +104,7 @@ if args.runs is None:  # for a single run
         smac = SMAC(scenario=scenario, tae_runner=objective_function, initial_design=LHDesign)
     smac.optimize()
     valid_scores, test_scores, runtimes = calc_regrets(smac.runhistory.data)
-    save_json(valid_scores, test_scores, runtimes, output_path, args.run_id)
+    save_results(valid_scores, test_scores, runtimes, output_path, args.run_id)
 
 else:  # for multiple runs
     for run_id, _ in enumerate(range(args.runs), start=args.run_start):
@@ -119,7 +117,7 @@ else:  # for multiple runs
             smac = SMAC(scenario=scenario, tae_runner=objective_function, initial_design=LHDesign)
         smac.optimize()
         valid_scores, test_scores, runtimes = calc_regrets(smac.runhistory.data)
-        save_json(valid_scores, test_scores, runtimes, output_path, run_id)
+        save_results(valid_scores, test_scores, runtimes, output_path, run_id)
         if args.verbose:
             print("Run saved. Resetting...")
 
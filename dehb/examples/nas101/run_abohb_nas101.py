@@ -9,7 +9,6 @@ sys.path.append(os.path.join(os.getcwd(), '../nas_benchmarks-development/'))
 sys.path.append(os.path.join(os.getcwd(), '../nas_benchmarks_development/'))
 sys.path.append('../NAS101/nasbench')
 
-import json
 import time
 import argparse
 import numpy as np
@@ -22,6 +21,7 @@ from tabular_benchmarks import NASCifar10A, NASCifar10B, NASCifar10C
 import autogluon as ag
 
 from dehb import DEHB
+from dehb.utils.results import save_run
 
 
 def save_to_json(training_history, output_path, run_id):
@@ -56,9 +56,7 @@ def save_to_json(training_history, output_path, run_id):
     res['validation_score'] = result["best"].tolist()
     res['test_score'] = result["best_test"].tolist()
     res['runtime'] = result["x"].tolist()
-    fh = open(os.path.join(output_path, 'run_{}.json'.format(run_id)), 'w')
-    json.dump(res, fh)
-    fh.close()
+    save_run(output_path, run_id, res)
 
 
 parser = argparse.ArgumentParser()
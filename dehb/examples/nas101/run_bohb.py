@@ -6,7 +6,6 @@ import sys
 sys.path.append(os.path.join(os.getcwd(), '../nas_benchmarks/'))
 sys.path.append(os.path.join(os.getcwd(), '../nas_benchmarks-development/'))
 
-import json
 import argparse
 import logging
 import ConfigSpace
@@ -20,6 +19,7 @@ from hpbandster.core.worker import Worker
 from tabular_benchmarks import FCNetProteinStructureBenchmark, FCNetSliceLocalizationBenchmark, \
     FCNetNavalPropulsionBenchmark, FCNetParkinsonsTelemonitoringBenchmark
 from tabular_benchmarks import NASCifar10A, NASCifar10B, NASCifar10C
+from dehb.utils.results import save_run
 
 parser = argparse.ArgumentParser()
 parser.add_argument('--runs', default=1, type=int, nargs='?',
@@ -170,8 +170,6 @@ for run_id in range(runs):
     else:
         res = b.get_results()
 
-    fh = open(os.path.join(output_path, 'run_%d.json' % run_id), 'w')
-    json.dump(res, fh)
-    fh.close()
+    save_run(output_path, run_id, res)
     print("Run saved. Resetting...")
     b.reset_tracker()
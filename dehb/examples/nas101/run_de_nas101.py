@@ -6,7 +6,6 @@ import sys
 sys.path.append(os.path.join(os.getcwd(), '../nas_benchmarks/'))
 sys.path.append(os.path.join(os.getcwd(), '../nas_benchmarks-development/'))
 
-import json
 import pickle
 import argparse
 import numpy as np
@@ -16,6 +15,7 @@ from tabular_benchmarks import FCNetProteinStructureBenchmark, FCNetSliceLocaliz
 from tabular_benchmarks import NASCifar10A, NASCifar10B, NASCifar10C
 
 from dehb import DE, AsyncDE
+from dehb.utils.results import save_run
 
 
 def save_configspace(cs, path, filename='configspace'):
@@ -147,9 +147,7 @@ if args.runs is None:  # for a single run
         res = b.get_results(ignore_invalid_configs=True)
     else:
         res = b.get_results()
-    fh = open(os.path.join(output_path, 'run_{}.json'.format(args.run_id)), 'w')
-    json.dump(res, fh)
-    fh.close()
+    save_run(output_path, args.run_id, res, history)
 else:  # for multiple runs
     for run_id, _ in enumerate(range(args.runs), start=args.run_start):
         if not args.fix_seed:
@@ -162,9 +160,7 @@ else:  # for multiple runs
             res = b.get_results(ignore_invalid_configs=True)
         else:
             res = b.get_results()
-        fh = open(os.path.join(output_path, 'run_{}.json'.format(run_id)), 'w')
-        json.dump(res, fh)
-        fh.close()
+        save_run(output_path, run_id, res, history)
         if args.verbose:
             print("Run saved. Resetting...")
         # essential step to not accumulate consecutive runs
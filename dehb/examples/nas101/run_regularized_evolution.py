@@ -20,7 +20,6 @@ sys.path.append(os.path.join(os.getcwd(), '../nas_benchmarks-development/'))
 import argparse
 import collections
 import random
-import json
 from copy import deepcopy
 
 import ConfigSpace
@@ -30,6 +29,7 @@ import numpy as np
 from tabular_benchmarks import FCNetProteinStructureBenchmark, FCNetSliceLocalizationBenchmark,\
     FCNetNavalPropulsionBenchmark, FCNetParkinsonsTelemonitoringBenchmark
 from tabular_benchmarks import NASCifar10A, NASCifar10B, NASCifar10C
+from dehb.utils.results import save_run
 
 global_cost = []
 
@@ -230,9 +230,7 @@ if runs is None:
     else:
         res = b.get_results()
 
-    fh = open(os.path.join(output_path, 'run_%d.json' % args.run_id), 'w')
-    json.dump(res, fh)
-    fh.close()
+    save_run(output_path, args.run_id, res)
 else:
     ### Multiple runs
     for run_id in range(runs):
@@ -247,8 +245,6 @@ else:
             res = b.get_results()
         res['global_cost'] = global_cost
 
-        fh = open(os.path.join(output_path, 'run_%d.json' % run_id), 'w')
-        json.dump(res, fh)
-        fh.close()
+        save_run(output_path, run_id, res)
         print("Run saved. Resetting...")
         b.reset_tracker()
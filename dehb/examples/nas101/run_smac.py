@@ -6,7 +6,6 @@ import sys
 sys.path.append(os.path.join(os.getcwd(), '../nas_benchmarks/'))
 sys.path.append(os.path.join(os.getcwd(), '../nas_benchmarks-development/'))
 
-import json
 import pickle
 import argparse
 import numpy as np
@@ -18,6 +17,7 @@ from multiprocessing.managers import BaseManager
 from tabular_benchmarks import FCNetProteinStructureBenchmark, FCNetSliceLocalizationBenchmark,\
     FCNetNavalPropulsionBenchmark, FCNetParkinsonsTelemonitoringBenchmark
 from tabular_benchmarks import NASCifar10A, NASCifar10B, NASCifar10C
+from dehb.utils.results import save_run
 
 
 def objective_function(config, **kwargs):
@@ -128,9 +128,7 @@ for run_id in range(start, runs):
         res = b.get_results(ignore_invalid_configs=True)
     else:
         res = b.get_results()
-    fh = open(os.path.join(output_path, 'run_{}.json'.format(run_id)), 'w')
-    json.dump(res, fh)
-    fh.close()
+    save_run(output_path, run_id, res)
     print("Run saved. Resetting...")
     b.reset_tracker()
 
@@ -1,10 +1,10 @@
 import os
-import json
 import pickle
 import collections
 import numpy as np
 import pandas as pd
 from scipy import stats
+from dehb.utils.results import load_run
 
 
 def create_plot(plt, methods, path, regret_type, fill_trajectory,
@@ -32,7 +32,7 @@ def create_plot(plt, methods, path, regret_type, fill_trajectory,
         runtimes = []
         for k, i in enumerate(np.arange(n_runs)):
             try:
-                res = json.load(open(os.path.join(path, m, str(ssp), "run_%d.json" % i)))
+                res = load_run(os.path.join(path, m, str(ssp)), i)
                 no_runs_found = False
             except Exception as e:
                 print(m, i, e)
@@ -51,7 +51,7 @@ def create_plot(plt, methods, path, regret_type, fill_trajectory,
             min_time = min(min_time, t)
             te, time = fill_trajectory(regret, runtimes, replace_nan=1)
 
-            idx = time.tolist().index(t)
+            idx = np.searchsorted(time, t)
             te = te[idx:, :]
             time = time[idx:]
 
@@ -0,0 +1,140 @@
+'''Flat, memory-mapped lookup table of NAS-Bench-201
+
+Converting the benchmark once, with
+
+    python dehb/examples/nas201/nas201_table.py --data_dir <NAS-Bench-201 .pth> --output_path <dir>
+
+writes, for every dataset, numpy arrays indexed by a packed architecture code: the operation
+chosen on each of the 6 edges of the cell as the digits of a base-5 number. The arrays are opened
+as read-only memory maps, such that any number of processes share one page-cached copy of the
+table, and an objective function evaluation is a single array lookup straight from the DE vector.
+'''
+
+import os
+import json
+import argparse
+import numpy as np
+
+
+# the operations and the edges in the order of the configuration space of the nas201 examples
+OPERATIONS = ['none', 'skip_connect', 'nor_conv_1x1', 'nor_conv_3x3', 'avg_pool_3x3']
+MAX_NODES = 4
+EDGES = [(i, j) for i in range(1, MAX_NODES) for j in range(i)]
+N_ARCHS = len(OPERATIONS) ** len(EDGES)
+N_EPOCHS = 200
+MAX_SEEDS = 3
+DATASETS = ['cifar10-valid', 'cifar100', 'ImageNet16-120']
+
+
+def vector_to_code(vector):
+    '''Packs a DE vector in [0, 1] (or a 2D array of them) into architecture codes
+
+    The vector values are binned the way the ConfigDecoder bins categorical hyperparameters.
+    '''
+    vector = np.asarray(vector, dtype=float)
+    bins = np.arange(start=0, stop=1, step=1/len(OPERATIONS))
+    ops = np.clip(np.searchsorted(bins, vector, side='right') - 1, 0, len(OPERATIONS) - 1)
+    return ops @ (len(OPERATIONS) ** np.arange(len(EDGES)))
+
+
+def code_to_arch_str(code):
+    '''Returns the NAS-Bench-201 architecture string, e.g., |nor_conv_3x3~0|+|none~0|..., of code
+    '''
+    ops = [(code // len(OPERATIONS) ** k) % len(OPERATIONS) for k in range(len(EDGES))]
+    nodes = []
+    for i in range(1, MAX_NODES):
+        nodes.append('|' + '|'.join('{}~{}'.format(OPERATIONS[ops[EDGES.index((i, j))]], j)
+                                    for j in range(i)) + '|')
+    return '+'.join(nodes)
+
+
+class NAS201Table():
+    '''Objective function of NAS-Bench-201 on one dataset, read from the converted table
+
+    valid and cost are (N_ARCHS, MAX_SEEDS, N_EPOCHS) arrays of the validation error and the
+    training + validation time of every training run of an architecture, test is a (N_ARCHS,)
+    array of the test error at the last epoch averaged over the runs.
+    '''
+    def __init__(self, path, dataset):
+        self.path = os.path.join(path, dataset)
+        self.dataset = dataset
+        self.valid = np.load(os.path.join(self.path, 'valid.npy'), mmap_mode='r')
+        self.cost = np.load(os.path.join(self.path, 'cost.npy'), mmap_mode='r')
+        self.test = np.load(os.path.join(self.path, 'test.npy'), mmap_mode='r')
+        self.n_seeds = np.load(os.path.join(self.path, 'n_seeds.npy'))
+        with open(os.path.join(self.path, 'meta.json'), 'r') as fh:
+            meta = json.load(fh)
+        self.y_star_valid = meta['y_star_valid']
+        self.y_star_test = meta['y_star_test']
+
+    def __call__(self, vector, budget=None):
+        '''Returns the validation error and cost of one of the training runs, at random, as
+        get_more_info(..., is_random=True) of the NAS-Bench-201 API does
+        '''
+        code = vector_to_code(vector)
+        epoch = N_EPOCHS - 1 if budget is None else int(budget)
+        seed = np.random.randint(self.n_seeds[code])
+        return float(self.valid[code, seed, epoch]), float(self.cost[code, seed, epoch])
+
+    def test_error(self, vector):
+        return float(self.test[vector_to_code(vector)])
+
+
+def get_metrics(info):
+    fitness = info['valid-accuracy'] if 'valid-accuracy' in info else info['valtest-accuracy']
+    cost = info['train-all-time']
+    cost += info['valid-all-time'] if 'valid-all-time' in info else info['valtest-all-time']
+    return 1 - fitness / 100, cost
+
+
+def convert(api, dataset, path):
+    '''Writes the table of dataset to path/dataset from the loaded NAS-Bench-201 API
+    '''
+    path = os.path.join(path, dataset)
+    os.makedirs(path, exist_ok=True)
+    shape = (N_ARCHS, MAX_SEEDS, N_EPOCHS)
+    valid = np.lib.format.open_memmap(os.path.join(path, 'valid.npy'), mode='w+',
+                                      dtype=np.float32, shape=shape)
+    cost = np.lib.format.open_memmap(os.path.join(path, 'cost.npy'), mode='w+',
+                                     dtype=np.float32, shape=shape)
+    test = np.full(N_ARCHS, np.nan, dtype=np.float32)
+    n_seeds = np.zeros(N_ARCHS, dtype=np.int8)
+    valid[:] = np.nan
+    cost[:] = np.nan
+    for code in range(N_ARCHS):
+        arch_index = api.query_index_by_arch(code_to_arch_str(code))
+        seeds = api.arch2infos_full[arch_index].dataset_seed[dataset][:MAX_SEEDS]
+        n_seeds[code] = len(seeds)
+        for s, seed in enumerate(seeds):
+            for epoch in range(N_EPOCHS):
+                info = api.get_more_info(arch_index, dataset, iepoch=epoch,
+                                         use_12epochs_result=False, is_random=seed)
+                valid[code, s, epoch], cost[code, s, epoch] = get_metrics(info)
+        info = api.get_more_info(arch_index, dataset, N_EPOCHS - 1, False, False)
+        test[code] = 1 - info['test-accuracy'] / 100
+    valid.flush()
+    cost.flush()
+    np.save(os.path.join(path, 'test.npy'), test)
+    np.save(os.path.join(path, 'n_seeds.npy'), n_seeds)
+    _, y_star_test = api.find_best(dataset=dataset, metric_on_set='ori-test')
+    _, y_star_valid = api.find_best(dataset=dataset, metric_on_set='x-valid')
+    with open(os.path.join(path, 'meta.json'), 'w') as fh:
+        json.dump({'y_star_valid': 1 - y_star_valid / 100, 'y_star_test': 1 - y_star_test / 100},
+                  fh)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Converts NAS-Bench-201 to lookup tables')
+    parser.add_argument('--data_dir', type=str, nargs='?',
+                        default="../nas201/NAS-Bench-201-v1_1-096897.pth",
+                        help='specifies the path to the benchmark data')
+    parser.add_argument('--output_path', default="../nas201/table", type=str, nargs='?',
+                        help='specifies the path where the tables will be saved')
+    parser.add_argument('--datasets', default=DATASETS, type=str, nargs='+', choices=DATASETS)
+    args = parser.parse_args()
+
+    from nas_201_api import NASBench201API as API
+    api = API(args.data_dir)
+    for dataset in args.datasets:
+        print("Converting {}...".format(dataset))
+        convert(api, dataset, args.output_path)
@@ -6,7 +6,6 @@ import sys
 sys.path.append(os.path.join(os.getcwd(), '../nas201/'))
 sys.path.append(os.path.join(os.getcwd(), '../AutoDL-Projects/lib/'))
 
-import json
 import pickle
 import argparse
 import numpy as np
@@ -16,7 +15,9 @@ from nas_201_api import NASBench201API as API
 from models import CellStructure, get_search_spaces
 
 from dehb import DE
+from dehb.examples.nas201.nas201_table import NAS201Table
 from dehb import DEHB, DEHB_0, DEHB_1, DEHB_2, DEHB_3
+from dehb.utils.results import save_run
 
 
 # From https://github.com/D-X-Y/AutoDL-Projects/blob/master/exps/algos/BOHB.py
@@ -61,11 +62,14 @@ def calculate_regrets(history, runtime):
         valid_regret = valid_regret - y_star_valid
         if valid_regret <= inc:
             inc = valid_regret
-            config = de.vector_to_configspace(config)
-            structure = config2structure(config)
-            arch_index = api.query_index_by_arch(structure)
-            info = api.get_more_info(arch_index, dataset, max_budget, False, False)
-            test_regret = (1 - (info['test-accuracy'] / 100)) - y_star_test
+            if table is not None:
+                test_regret = table.test_error(config) - y_star_test
+            else:
+                config = de.vector_to_configspace(config)
+                structure = config2structure(config)
+                arch_index = api.query_index_by_arch(structure)
+                info = api.get_more_info(arch_index, dataset, max_budget, False, False)
+                test_regret = (1 - (info['test-accuracy'] / 100)) - y_star_test
         regret_validation.append(inc)
         regret_test.append(test_regret)
     res = {}
@@ -109,6 +113,9 @@ parser.add_argument('--output_path', default="./results", type=str, nargs='?',
 parser.add_argument('--data_dir', type=str, nargs='?',
                     default="../nas201/NAS-Bench-201-v1_1-096897.pth",
                     help='specifies the path to the benchmark data')
+parser.add_argument('--table', default=None, type=str, nargs='?',
+                    help='path to the tables written by nas201_table.py, used instead of '
+                         'the benchmark data at data_dir if given')
 strategy_choices = ['rand1_bin', 'rand2_bin', 'rand2dir_bin', 'best1_bin', 'best2_bin',
                     'currenttobest1_bin', 'randtobest1_bin',
                     'rand1_exp', 'rand2_exp', 'rand2dir_exp', 'best1_exp', 'best2_exp',
@@ -153,8 +160,13 @@ else:
 output_path = os.path.join(args.output_path, args.dataset, folder)
 os.makedirs(output_path, exist_ok=True)
 
-# Loading NAS-201
-api = API(args.data_dir)
+# Loading NAS-201, or the memory-mapped table shared by all processes
+if args.table is None:
+    api = API(args.data_dir)
+    table = None
+else:
+    api = None
+    table = NAS201Table(args.table, dataset)
 search_space = get_search_spaces('cell', 'nas-bench-201')
 
 # Parameter space to be used by DE
@@ -162,7 +174,10 @@ cs = get_configuration_space(args.max_nodes, search_space)
 dimensions = len(cs.get_hyperparameters())
 config2structure = config2structure_func(args.max_nodes)
 
-y_star_valid, y_star_test = find_nas201_best(api, dataset)
+if table is None:
+    y_star_valid, y_star_test = find_nas201_best(api, dataset)
+else:
+    y_star_valid, y_star_test = table.y_star_valid, table.y_star_test
 inc_config = cs.get_default_configuration().get_array().tolist()
 
 
@@ -192,16 +207,22 @@ def f(config, budget=max_budget):
     return fitness, cost
 
 
+if table is not None:
+    # the table is queried with the DE vector, without decoding it to a configuration
+    f = table
+
+
 dehbs = {None: DEHB, "0": DEHB_0, "1": DEHB_1, "2": DEHB_2, "3": DEHB_3}
 DEHB = dehbs[args.version]
 
 # Initializing DEHB object
-dehb = DEHB(cs=cs, dimensions=dimensions, f=f, strategy=args.strategy,
+dehb = DEHB(cs=cs, dimensions=dimensions, f=f, configspace=table is None,
+            strategy=args.strategy,
             mutation_factor=args.mutation_factor, crossover_prob=args.crossover_prob,
             eta=args.eta, min_budget=min_budget, max_budget=max_budget,
             generations=args.gens, boundary_fix_type=args.boundary_fix_type)
 # Initializing DE object
-de = DE(cs=cs, dimensions=dimensions, f=f, pop_size=10,
+de = DE(cs=cs, dimensions=dimensions, f=f, configspace=table is None, pop_size=10,
         mutation_factor=args.mutation_factor, crossover_prob=args.crossover_prob,
         strategy=args.strategy, budget=args.max_budget)
 
@@ -211,9 +232,7 @@ if args.runs is None:  # for a single run
     # Running DE iterations
     traj, runtime, history = dehb.run(iterations=args.iter, verbose=args.verbose)
     res = calculate_regrets(history, runtime)
-    fh = open(os.path.join(output_path, 'run_{}.json'.format(args.run_id)), 'w')
-    json.dump(res, fh)
-    fh.close()
+    save_run(output_path, args.run_id, res, history)
 else:  # for multiple runs
     for run_id, _ in enumerate(range(args.runs), start=args.run_start):
         if not args.fix_seed:
@@ -223,9 +242,7 @@ else:  # for multiple runs
         # Running DE iterations
         traj, runtime, history = dehb.run(iterations=args.iter, verbose=args.verbose)
         res = calculate_regrets(history, runtime)
-        fh = open(os.path.join(output_path, 'run_{}.json'.format(run_id)), 'w')
-        json.dump(res, fh)
-        fh.close()
+        save_run(output_path, run_id, res, history)
         print("Run saved. Resetting...")
         # essential step to not accumulate consecutive runs
         dehb.reset()
@@ -7,7 +7,6 @@ sys.path.append(os.path.join(os.getcwd(), '../nas201/'))
 sys.path.append(os.path.join(os.getcwd(), '../AutoDL-Projects/lib/'))
 
 import time
-import json
 import pickle
 import argparse
 import numpy as np
@@ -18,6 +17,8 @@ from models import CellStructure, get_search_spaces
 
 from dehb import DE
 from dehb import DEHB, DEHB_0, DEHB_1, DEHB_2, DEHB_3
+from dehb.utils.results import save_run
+from dehb.optimizers import Profiler
 
 
 # From https://github.com/D-X-Y/AutoDL-Projects/blob/master/exps/algos/BOHB.py
@@ -56,6 +57,13 @@ def calculate_regrets(runtime):
     return res
 
 
+def save_profile(profiler, path, run_id):
+    # the phase timers and the trace of the run, and the stacks for a flamegraph
+    profiler.to_json(os.path.join(path, 'profile_{}.json'.format(run_id)))
+    profiler.to_folded(os.path.join(path, 'profile_{}.folded'.format(run_id)))
+    profiler.reset()
+
+
 def save_configspace(cs, path, filename='configspace'):
     fh = open(os.path.join(output_path, '{}.pkl'.format(filename)), 'wb')
     pickle.dump(cs, fh)
@@ -111,12 +119,15 @@ parser.add_argument('--verbose', default='False', choices=['True', 'False'], nar
                     help='to print progress or not')
 parser.add_argument('--folder', default=None, type=str, nargs='?',
                     help='name of folder where files will be dumped')
+parser.add_argument('--profile', default='False', choices=['True', 'False'], nargs='?', type=str,
+                    help='to time the phases of DEHB and save them as profile_<run_id>.json')
 parser.add_argument('--version', default=None, type=str, nargs='?',
                     help='DEHB version to run')
 
 args = parser.parse_args()
 args.verbose = True if args.verbose == 'True' else False
 args.fix_seed = True if args.fix_seed == 'True' else False
+args.profile = True if args.profile == 'True' else False
 min_budget = args.min_budget
 max_budget = args.max_budget
 dataset = args.dataset
@@ -181,7 +192,7 @@ DEHB = dehbs[args.version]
 dehb = DEHB(cs=cs, dimensions=dimensions, f=f, strategy=args.strategy,
             mutation_factor=args.mutation_factor, crossover_prob=args.crossover_prob,
             eta=args.eta, min_budget=min_budget, max_budget=max_budget,
-            generations=args.gens)
+            generations=args.gens, **({'profiler': Profiler(trace=True)} if args.profile else {}))
 # Initializing DE object
 de = DE(cs=cs, dimensions=dimensions, f=f, pop_size=10,
         mutation_factor=args.mutation_factor, crossover_prob=args.crossover_prob,
@@ -194,9 +205,9 @@ if args.runs is None:  # for a single run
     start = time.time()
     traj, runtime, history = dehb.run(iterations=args.iter, verbose=args.verbose)
     res = calculate_regrets(runtime)
-    fh = open(os.path.join(output_path, 'run_{}.json'.format(args.run_id)), 'w')
-    json.dump(res, fh)
-    fh.close()
+    save_run(output_path, args.run_id, res, history)
+    if args.profile:
+        save_profile(dehb.profiler, output_path, args.run_id)
 else:  # for multiple runs
     for run_id, _ in enumerate(range(args.runs), start=args.run_start):
         if not args.fix_seed:
@@ -207,9 +218,9 @@ else:  # for multiple runs
         start = time.time()
         traj, runtime, history = dehb.run(iterations=args.iter, verbose=args.verbose)
         res = calculate_regrets(runtime)
-        fh = open(os.path.join(output_path, 'run_{}.json'.format(run_id)), 'w')
-        json.dump(res, fh)
-        fh.close()
+        save_run(output_path, run_id, res, history)
+        if args.profile:
+            save_profile(dehb.profiler, output_path, run_id)
         print("Run saved. Resetting...")
         # essential step to not accumulate consecutive runs
         dehb.reset()
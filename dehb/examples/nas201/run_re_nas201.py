@@ -11,7 +11,6 @@ sys.path.append(os.path.join(os.getcwd(), '../AutoDL-Projects/lib/'))
 
 import os
 import time
-import json
 import random
 import pickle
 import logging
@@ -25,6 +24,7 @@ logging.basicConfig(level=logging.ERROR)
 
 from nas_201_api import NASBench201API as API
 from models import CellStructure, get_search_spaces
+from dehb.utils.results import save_run
 
 
 class Model(object):
@@ -281,9 +281,7 @@ if args.runs is None:
                                                 mutate_arch, nas_bench, None, dataset)
 
     res = convert_to_json(history)
-    fh = open(os.path.join(output_path, 'run_{}.json'.format(args.run_id)), 'w')
-    json.dump(res, fh)
-    fh.close()
+    save_run(output_path, args.run_id, res)
 
 else:
     for run_id, _ in enumerate(range(args.runs), start=args.run_start):
@@ -296,6 +294,4 @@ else:
                                                     mutate_arch, nas_bench, None, dataset)
 
         res = convert_to_json(history)
-        fh = open(os.path.join(output_path, 'run_{}.json'.format(run_id)), 'w')
-        json.dump(res, fh)
-        fh.close()
+        save_run(output_path, run_id, res)
@@ -12,7 +12,6 @@ sys.path.append(os.path.join(os.getcwd(), '../AutoDL-Projects/lib/'))
 
 import os
 import time
-import json
 import random
 import pickle
 import logging
@@ -26,6 +25,7 @@ logging.basicConfig(level=logging.ERROR)
 
 from nas_201_api import NASBench201API as API
 from models import CellStructure, get_search_spaces
+from dehb.utils.results import save_run
 
 
 class Model(object):
@@ -227,9 +227,7 @@ if args.runs is None:
     history, total_cost = random_search(args.time_budget, nas_bench, dataset)
 
     res = convert_to_json(history)
-    fh = open(os.path.join(output_path, 'run_{}.json'.format(args.run_id)), 'w')
-    json.dump(res, fh)
-    fh.close()
+    save_run(output_path, args.run_id, res)
 
 else:
     for run_id, _ in enumerate(range(args.runs), start=args.run_start):
@@ -240,6 +238,4 @@ else:
         history, total_cost = random_search(args.time_budget, nas_bench, dataset)
 
         res = convert_to_json(history)
-        fh = open(os.path.join(output_path, 'run_{}.json'.format(run_id)), 'w')
-        json.dump(res, fh)
-        fh.close()
+        save_run(output_path, run_id, res)
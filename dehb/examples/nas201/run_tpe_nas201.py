@@ -12,7 +12,6 @@ sys.path.append(os.path.join(os.getcwd(), '../AutoDL-Projects/lib/'))
 
 import os
 import time
-import json
 import random
 import pickle
 import logging
@@ -28,6 +27,7 @@ from hyperopt import fmin, tpe, hp, STATUS_OK, Trials
 
 from nas_201_api import NASBench201API as API
 from models import CellStructure, get_search_spaces
+from dehb.utils.results import save_run
 
 
 # From https://github.com/D-X-Y/AutoDL-Projects/blob/master/exps/algos/BOHB.py
@@ -202,9 +202,7 @@ if args.runs is None:
                 trials=trials)
 
     res = convert_to_json(trials.results)
-    fh = open(os.path.join(output_path, 'run_{}.json'.format(args.run_id)), 'w')
-    json.dump(res, fh)
-    fh.close()
+    save_run(output_path, args.run_id, res)
 
 else:
     for run_id, _ in enumerate(range(args.runs), start=args.run_start):
@@ -220,6 +218,4 @@ else:
                     trials=trials)
 
         res = convert_to_json(trials.results)
-        fh = open(os.path.join(output_path, 'run_{}.json'.format(run_id)), 'w')
-        json.dump(res, fh)
-        fh.close()
+        save_run(output_path, run_id, res)
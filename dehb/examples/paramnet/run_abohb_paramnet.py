@@ -1,5 +1,4 @@
 import os
-import json
 import time
 import argparse
 import numpy as np
@@ -10,6 +9,7 @@ import autogluon as ag
 from hpolib.benchmarks.surrogates.paramnet import SurrogateReducedParamNetTime
 
 from dehb import DEHB
+from dehb.utils.results import save_run
 
 
 parser = argparse.ArgumentParser()
@@ -119,9 +119,7 @@ def save_to_json(training_history, output_path, run_id):
     res['validation_score'] = result["best"].tolist()
     res['test_score'] = result["best_test"].tolist()
     res['runtime'] = result["x"].tolist()
-    fh = open(os.path.join(output_path, 'run_{}.json'.format(run_id)), 'w')
-    json.dump(res, fh)
-    fh.close()
+    save_run(output_path, run_id, res)
 
 
 scheduler = ag.scheduler.HyperbandScheduler(
@@ -1,6 +1,5 @@
 import os
 import sys
-import json
 import pickle
 import argparse
 import numpy as np
@@ -11,6 +10,7 @@ from hpolib.benchmarks.surrogates.paramnet import SurrogateReducedParamNetTime
 
 from dehb import DE
 from dehb import DEHB, DEHB_0, DEHB_1, DEHB_2, DEHB_3
+from dehb.utils.results import save_run
 
 
 # Common objective function for DE & DEHB representing SVM Surrogates benchmark
@@ -43,14 +43,12 @@ def calc_test_scores(history):
     return test_scores
 
 
-def save_json(valid, test, runtime, output_path, run_id):
+def save_results(valid, test, runtime, output_path, run_id, history=None):
     res = {}
     res['validation_score'] = valid.tolist()
     res['test_score'] = test
     res['runtime'] = np.cumsum(runtime).tolist()
-    fh = open(os.path.join(output_path, 'run_{}.json'.format(run_id)), 'w')
-    json.dump(res, fh)
-    fh.close()
+    save_run(output_path, run_id, res, history)
 
 
 def save_configspace(cs, path, filename='configspace'):
@@ -151,7 +149,7 @@ if args.runs is None:  # for a single run
     traj, runtime, history = dehb.run(iterations=args.iter, verbose=args.verbose)
     test_scores = calc_test_scores(history)
 
-    save_json(traj, test_scores, runtime, output_path, args.run_id)
+    save_results(traj, test_scores, runtime, output_path, args.run_id, history)
 
 else:  # for multiple runs
     for run_id, _ in enumerate(range(args.runs), start=args.run_start):
@@ -163,7 +161,7 @@ else:  # for multiple runs
         traj, runtime, history = dehb.run(iterations=args.iter, verbose=args.verbose)
         test_scores = calc_test_scores(history)
 
-        save_json(traj, test_scores, runtime, output_path, run_id)
+        save_results(traj, test_scores, runtime, output_path, run_id, history)
 
         if args.verbose:
             print("Run saved. Resetting...")
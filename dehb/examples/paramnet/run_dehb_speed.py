@@ -1,6 +1,5 @@
 import os
 import sys
-import json
 import time
 import pickle
 import argparse
@@ -12,6 +11,8 @@ from hpolib.benchmarks.surrogates.paramnet import SurrogateReducedParamNetTime
 
 from dehb import DE
 from dehb import DEHB, DEHB_0, DEHB_1, DEHB_2, DEHB_3
+from dehb.utils.results import save_run
+from dehb.optimizers import Profiler
 
 
 # Common objective function for DE & DEHB representing SVM Surrogates benchmark
@@ -46,14 +47,19 @@ def calc_test_scores(history):
     return test_scores
 
 
-def save_json(valid, test, runtime, output_path, run_id):
+def save_results(valid, test, runtime, output_path, run_id, history=None):
     res = {}
     res['validation_score'] = valid.tolist()[1:]
     res['test_score'] = test
     res['runtime'] = np.cumsum(runtime[1:]).tolist()
-    fh = open(os.path.join(output_path, 'run_{}.json'.format(run_id)), 'w')
-    json.dump(res, fh)
-    fh.close()
+    save_run(output_path, run_id, res, history)
+
+
+def save_profile(profiler, path, run_id):
+    # the phase timers and the trace of the run, and the stacks for a flamegraph
+    profiler.to_json(os.path.join(path, 'profile_{}.json'.format(run_id)))
+    profiler.to_folded(os.path.join(path, 'profile_{}.folded'.format(run_id)))
+    profiler.reset()
 
 
 def save_configspace(cs, path, filename='configspace'):
@@ -95,12 +101,15 @@ parser.add_argument('--verbose', default='False', choices=['True', 'False'], nar
                     help='to print progress or not')
 parser.add_argument('--folder', default=None, type=str, nargs='?',
                     help='name of folder where files will be dumped')
+parser.add_argument('--profile', default='False', choices=['True', 'False'], nargs='?', type=str,
+                    help='to time the phases of DEHB and save them as profile_<run_id>.json')
 parser.add_argument('--version', default=None, type=str, nargs='?',
                     help='version of DEHB to run')
 
 args = parser.parse_args()
 args.verbose = True if args.verbose == 'True' else False
 args.fix_seed = True if args.fix_seed == 'True' else False
+args.profile = True if args.profile == 'True' else False
 
 dehbs = {None: DEHB, "0": DEHB_0, "1": DEHB_1, "2": DEHB_2, "3": DEHB_3}
 DEHB = dehbs[args.version]
@@ -139,7 +148,7 @@ min_budget, max_budget = budgets[args.dataset]
 dehb = DEHB(cs=cs, dimensions=dimensions, f=f, strategy=args.strategy,
             mutation_factor=args.mutation_factor, crossover_prob=args.crossover_prob,
             eta=args.eta, min_budget=min_budget, max_budget=max_budget,
-            generations=args.gens)
+            generations=args.gens, **({'profiler': Profiler(trace=True)} if args.profile else {}))
 
 # Helper DE object for vector to config mapping
 de = DE(cs=cs, b=b, f=f)
@@ -152,7 +161,9 @@ if args.runs is None:  # for a single run
     traj, runtime, history = dehb.run(iterations=args.iter, verbose=args.verbose)
     test_scores = calc_test_scores(history)
 
-    save_json(traj, test_scores, runtime, output_path, args.run_id)
+    save_results(traj, test_scores, runtime, output_path, args.run_id, history)
+    if args.profile:
+        save_profile(dehb.profiler, output_path, args.run_id)
 
 else:  # for multiple runs
     for run_id, _ in enumerate(range(args.runs), start=args.run_start):
@@ -164,7 +175,9 @@ else:  # for multiple runs
         traj, runtime, history = dehb.run(iterations=args.iter, verbose=args.verbose)
         test_scores = calc_test_scores(history)
 
-        save_json(traj, test_scores, runtime, output_path, run_id)
+        save_results(traj, test_scores, runtime, output_path, run_id, history)
+        if args.profile:
+            save_profile(dehb.profiler, output_path, run_id)
 
         if args.verbose:
             print("Run saved. Resetting...")
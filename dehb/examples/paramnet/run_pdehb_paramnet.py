@@ -1,6 +1,5 @@
 import os
 import sys
-import json
 import time
 import pickle
 import argparse
@@ -12,6 +11,7 @@ from dehb import DE
 from dehb import DEHB, PDEHB
 
 from multiprocessing.managers import BaseManager
+from dehb.utils.results import save_run
 
 
 # Common objective function for DE & DEHB representing SVM Surrogates benchmark
@@ -45,14 +45,12 @@ def calc_test_scores(history):
     return test_scores
 
 
-def save_json(valid, test, runtime, output_path, run_id):
+def save_results(valid, test, runtime, output_path, run_id, history=None):
     res = {}
     res['validation_score'] = valid.tolist()
     res['test_score'] = test
     res['runtime'] = runtime.tolist()  # np.cumsum(runtime).tolist()
-    fh = open(os.path.join(output_path, 'run_{}.json'.format(run_id)), 'w')
-    json.dump(res, fh)
-    fh.close()
+    save_run(output_path, run_id, res, history)
 
 
 def save_configspace(cs, path, filename='configspace'):
@@ -150,7 +148,7 @@ if __name__ == "__main__":
         )
         test_scores = calc_test_scores(history)
 
-        save_json(traj, test_scores, runtime, output_path, args.run_id)
+        save_results(traj, test_scores, runtime, output_path, args.run_id, history)
 
     else:  # for multiple runs
         for run_id, _ in enumerate(range(args.runs), start=args.run_start):
@@ -167,7 +165,7 @@ if __name__ == "__main__":
             )
             test_scores = calc_test_scores(history)
 
-            save_json(traj, test_scores, runtime, output_path, run_id)
+            save_results(traj, test_scores, runtime, output_path, run_id, history)
 
             if args.verbose:
                 print("Run saved. Resetting...")
@@ -14,7 +14,6 @@ https://colab.research.google.com/github/google-research/google-research/blob/ma
 
 import os
 import sys
-import json
 import random
 import argparse
 import collections
@@ -23,6 +22,7 @@ import numpy as np
 from copy import deepcopy
 
 from hpolib.benchmarks.surrogates.paramnet import SurrogateReducedParamNetTime
+from dehb.utils.results import save_run
 
 
 global_cost = []
@@ -246,9 +246,7 @@ if runs is None:
 
     res = convert_to_json(history)
 
-    fh = open(os.path.join(output_path, 'run_%d.json' % args.run_id), 'w')
-    json.dump(res, fh)
-    fh.close()
+    save_run(output_path, args.run_id, res)
 else:
     ### Multiple runs
     for run_id in range(runs):
@@ -259,7 +257,5 @@ else:
 
         res = convert_to_json(history)
 
-        fh = open(os.path.join(output_path, 'run_%d.json' % run_id), 'w')
-        json.dump(res, fh)
-        fh.close()
+        save_run(output_path, run_id, res)
         print("Run saved. Resetting...")
@@ -1,3 +1,21 @@
 from .de import DE, AsyncDE
 from .dehb import DEHB, DEHBBase
-from .pdehb import PDEHB
+from .decoder import ConfigDecoder
+from .history import History
+from .cache import EvaluationCache
+from .continuation import ContinuationStore
+from .profiler import Profiler
+from .runtime_model import RuntimeModel
+from .scheduling import ScheduleLog
+
+__all__ = ["DE", "AsyncDE", "DEHB", "DEHBBase", "PDEHB", "ConfigDecoder", "History",
+           "EvaluationCache", "ContinuationStore", "Profiler", "RuntimeModel",
+           "ScheduleLog"]
+
+
+def __getattr__(name):
+    # PDEHB is imported on first access, such that importing DE or DEHB pulls in only numpy
+    if name == "PDEHB":
+        from .pdehb import PDEHB
+        return PDEHB
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
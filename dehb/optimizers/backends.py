@@ -0,0 +1,179 @@
+import uuid
+import asyncio
+import functools
+import threading
+import concurrent.futures
+
+from .executor import SerialExecutor, _Installed, _constant, _install, _install_all
+
+
+class WorkerBackend(object):
+    """ Interface through which PDEHB runs jobs on workers
+
+    A backend submits function calls and returns futures supporting done() and result(), blocks
+    till futures are done and reports how many jobs can run simultaneously (capacity).
+    """
+    # if True, the functions submitted are coroutine functions
+    asynchronous = False
+
+    def submit(self, fn, *args):
+        raise NotImplementedError("The function needs to be defined in the sub class.")
+
+    def capacity(self):
+        raise NotImplementedError("The function needs to be defined in the sub class.")
+
+    def wait(self, futures, timeout=None, return_when="FIRST_COMPLETED"):
+        """ Blocks till one ('FIRST_COMPLETED') or all ('ALL_COMPLETED') futures are done
+
+        Returns without raising if timeout (in seconds) expires first.
+        """
+        concurrent.futures.wait(futures, timeout=timeout, return_when=return_when)
+
+    def scatter(self, data):
+        """ Makes data available to all workers and returns what jobs should reference it by
+        """
+        return data
+
+    def install(self, name, factory):
+        """ Calls factory() once in every worker and keeps the result there under name
+
+        Jobs get it with executor._get_installed(name). Workers running in the master process
+        share a single call.
+        """
+        _install(name, factory)
+
+    def cancel(self, futures):
+        """ Cancels the jobs of futures, jobs already running may run on till they return
+        """
+        for future in futures:
+            future.cancel()
+
+    def restart(self):
+        """ Brings the workers back to a clean state between independent runs
+        """
+        pass
+
+    def close(self):
+        pass
+
+
+class PoolBackend(WorkerBackend):
+    """ Runs jobs on a concurrent.futures executor of n_workers threads or processes
+    """
+    def __init__(self, executor, n_workers=1):
+        self.executor = executor
+        self.n_workers = n_workers
+
+    def submit(self, fn, *args):
+        return self.executor.submit(fn, *args)
+
+    def capacity(self):
+        return self.n_workers
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+
+class ProcessBackend(PoolBackend):
+    """ Runs jobs on a concurrent.futures process pool of n_workers
+
+    Objects are installed by the initializer of the processes, the factories need to be
+    picklable, e.g. functions defined at the module level. Data scattered is installed the same
+    way, such that jobs reference it by name instead of carrying it.
+    """
+    def __init__(self, n_workers=1):
+        self._factories = {}
+        self._scattered = None  # name the data scattered last is installed under
+        super().__init__(self._new_pool(n_workers), n_workers=n_workers)
+
+    def _new_pool(self, n_workers):
+        return concurrent.futures.ProcessPoolExecutor(
+            n_workers, initializer=_install_all, initargs=(dict(self._factories),)
+        )
+
+    def install(self, name, factory):
+        self._factories[name] = factory
+        # the initializer only runs when a process starts, the pool is replaced by one running
+        # all factories installed so far
+        self.executor.shutdown(wait=True)
+        self.executor = self._new_pool(self.n_workers)
+
+    def scatter(self, data):
+        # the data scattered before is replaced, not kept in the workers along with it
+        self._factories.pop(self._scattered, None)
+        self._scattered = "scattered-{}".format(uuid.uuid4().hex)
+        self.install(self._scattered, functools.partial(_constant, data))
+        return _Installed(self._scattered)
+
+
+class AsyncioBackend(WorkerBackend):
+    """ Runs coroutine objective functions on an asyncio event loop in a background thread
+
+    Suited for objective functions that await external training jobs, where up to n_workers
+    evaluations are in flight at the same time without occupying a thread or process each.
+    """
+    asynchronous = True
+
+    def __init__(self, n_workers=1):
+        self.n_workers = n_workers
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, *args):
+        # returns a concurrent.futures.Future which is thread-safe to query and wait on
+        return asyncio.run_coroutine_threadsafe(fn(*args), self.loop)
+
+    def capacity(self):
+        return self.n_workers
+
+    def close(self):
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join()
+        if not self.loop.is_closed():
+            self.loop.close()
+
+
+def get_backend(backend=None, n_workers=1):
+    """ Returns the worker backend PDEHB runs jobs with
+
+    Parameters
+    ----------
+    backend : str or WorkerBackend
+        None - 'dask' if n_workers > 1 else 'serial'
+        'serial' - jobs run right away in the master process
+        'dask' - jobs run on a local Dask cluster of n_workers processes
+        'process' - jobs run on a concurrent.futures process pool of n_workers
+        'thread' - jobs run on a thread pool of n_workers, for I/O bound objective functions or
+            ones that release the GIL
+        'asyncio' - jobs are coroutines (async objective function) on an event loop, with at
+            most n_workers running at a time
+        An instance of WorkerBackend is returned as is.
+    n_workers : int
+    """
+    if isinstance(backend, WorkerBackend):
+        return backend
+    if backend is None:
+        backend = 'dask' if n_workers > 1 else 'serial'
+    if backend == 'serial':
+        return PoolBackend(SerialExecutor(), n_workers=1)
+    if backend == 'dask':
+        from .dask_backend import DaskBackend
+        return DaskBackend(n_workers=n_workers)
+    if backend == 'process':
+        return ProcessBackend(n_workers=n_workers)
+    if backend == 'thread':
+        return PoolBackend(concurrent.futures.ThreadPoolExecutor(n_workers), n_workers=n_workers)
+    if backend == 'asyncio':
+        return AsyncioBackend(n_workers=n_workers)
+    raise ValueError("{} is not a valid choice of backend, choose from "
+                     "{{'serial', 'dask', 'process', 'thread', 'asyncio'}}".format(backend))
+
+
+def __getattr__(name):
+    # the Dask backend is imported on first use, as importing distributed takes long
+    if name in ["DaskBackend", "WorkerCountPlugin", "InstallPlugin"]:
+        from . import dask_backend
+        return getattr(dask_backend, name)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
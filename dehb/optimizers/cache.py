@@ -0,0 +1,95 @@
+import numpy as np
+from collections import OrderedDict
+
+
+class EvaluationCache():
+    '''Least recently used cache of function evaluations, keyed on configuration and budget
+
+    Vectors are keyed on their discretized configuration (see ConfigDecoder.discretize()), such
+    that distinct vectors which decode to the same configuration share an entry. A cache can be
+    shared by several optimizers and is shared by all subpopulations and brackets of DEHB and
+    PDEHB.
+
+    Parameters
+    ----------
+    maxsize : int
+        Number of evaluations kept, the least recently used is evicted first. None for no bound.
+    free_hits : bool
+        If True, evaluations read from the cache are charged a cost of 0, else the cost of the
+        evaluation that was cached.
+    '''
+    def __init__(self, maxsize=None, free_hits=False):
+        self.maxsize = maxsize
+        self.free_hits = free_hits
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, x, budget=None, decoder=None):
+        '''Returns the key of the vector x on budget, decoder discretizes x if given
+        '''
+        x = np.asarray(x, dtype=float)
+        if decoder is not None:
+            x = decoder.discretize(x)[0]
+        return (None if budget is None else float(budget), x.tobytes())
+
+    def get(self, key):
+        '''Returns the cached (fitness, cost) of key, or None if it was not evaluated
+        '''
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        fitness, cost = entry
+        return fitness, 0 if self.free_hits else cost
+
+    def put(self, key, fitness, cost):
+        self._entries[key] = (fitness, cost)
+        self._entries.move_to_end(key)
+        if self.maxsize is not None and len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self),
+                "hit_rate": self.hit_rate}
+
+
+def get_cache(cache=None):
+    '''Returns the evaluation cache an optimizer uses
+
+    Parameters
+    ----------
+    cache : bool, int or EvaluationCache
+        None or False - no cache
+        True - a cache without size bound
+        int - a cache keeping at most that many evaluations
+        An instance of EvaluationCache is returned as is.
+    '''
+    if isinstance(cache, EvaluationCache):
+        return cache
+    if cache is None or cache is False:
+        return None
+    if cache is True:
+        return EvaluationCache()
+    if isinstance(cache, (int, np.integer)):
+        return EvaluationCache(maxsize=int(cache))
+    raise ValueError("{} is not a valid choice of cache, pass a bool, an int or an "
+                     "EvaluationCache".format(cache))
@@ -0,0 +1,107 @@
+import os
+import pickle
+import numpy as np
+
+from .history import History
+
+
+# attributes of the DE subpopulations that make up the state of a DEHB run
+SUBPOP_ATTRIBUTES = [
+    "population", "fitness", "age", "pop_size", "inc_score", "inc_config",
+    "parent_counter", "promotion_pop", "promotion_fitness", "rng"
+]
+
+
+class Checkpointer():
+    '''Writes the state of a DEHB run to a directory and reads it back
+
+    The history is appended to a binary file, one row of float64 per function evaluation (the
+    configuration followed by fitness, budget, cost, bracket ID and timestamp), such that a
+    checkpoint only writes the evaluations made since the previous one. The rest of the state is
+    small and pickled to a temporary file which then atomically replaces the previous state.
+    The state records the number of history rows it belongs to, so rows appended by a write
+    that was interrupted before the state was replaced are discarded on loading.
+    '''
+    STATE_FILE = "state.pkl"
+    HISTORY_FILE = "history.bin"
+
+    def __init__(self, path):
+        self.path = path
+        self.state_file = os.path.join(self.path, self.STATE_FILE)
+        self.history_file = os.path.join(self.path, self.HISTORY_FILE)
+        # number of history rows in the history file, unknown till the state is loaded
+        self._n_written = None
+
+    def exists(self):
+        return os.path.isfile(self.state_file)
+
+    def _append_history(self, history):
+        n = len(history)
+        if n <= self._n_written:
+            return
+        rows = slice(self._n_written, n)
+        block = np.column_stack((
+            history.configs[rows], history.fitness[rows], history.budgets[rows],
+            history.costs[rows], history.brackets[rows], history.timestamps[rows]
+        )).astype(np.float64)
+        with open(self.history_file, "ab") as fh:
+            fh.write(block.tobytes())
+            fh.flush()
+            os.fsync(fh.fileno())
+        self._n_written = n
+
+    def save(self, state, history):
+        '''Appends the new rows of history and replaces the state on disk
+        '''
+        os.makedirs(self.path, exist_ok=True)
+        if self._n_written is None:
+            # a new run overwrites whatever was saved to the directory before
+            if self.exists():
+                os.remove(self.state_file)
+            open(self.history_file, "wb").close()
+            self._n_written = 0
+        self._append_history(history)
+        state = dict(state)
+        state["n_history"] = self._n_written
+        state["dimensions"] = history.dimensions
+        tmp_file = self.state_file + ".tmp"
+        with open(tmp_file, "wb") as fh:
+            pickle.dump(state, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_file, self.state_file)
+
+    def load(self):
+        '''Returns the state and the History saved last
+        '''
+        with open(self.state_file, "rb") as fh:
+            state = pickle.load(fh)
+        n, dimensions = state["n_history"], state["dimensions"]
+        if n > 0:
+            rows = np.fromfile(self.history_file, dtype=np.float64, count=n * (dimensions + 5))
+            rows = rows.reshape(n, dimensions + 5)
+            history = History.from_arrays(rows[:, :dimensions], *rows[:, dimensions:].T)
+        else:
+            history = History(dimensions)
+        # discarding rows of an interrupted write, appended after the state was saved
+        os.truncate(self.history_file, n * ((dimensions or 0) + 5) * 8)
+        self._n_written = n
+        return state, history
+
+
+def get_subpop_state(de):
+    '''Returns the state of a dict of DE subpopulations keyed by budget
+    '''
+    return {
+        budget: {attr: getattr(subpop, attr) for attr in SUBPOP_ATTRIBUTES
+                 if hasattr(subpop, attr)}
+        for budget, subpop in de.items()
+    }
+
+
+def set_subpop_state(de, state):
+    '''Restores the state of a dict of DE subpopulations keyed by budget
+    '''
+    for budget, attributes in state.items():
+        for attr, value in attributes.items():
+            setattr(de[budget], attr, value)
@@ -0,0 +1,128 @@
+import os
+import pickle
+import bisect
+import hashlib
+import tempfile
+import numpy as np
+
+
+def trial_id(x):
+    '''Returns the ID of the vector x, which is the same for the copies of x promoted to higher
+    budgets
+    '''
+    return hashlib.sha1(np.asarray(x, dtype=np.float64).tobytes()).hexdigest()[:16]
+
+
+class ContinuationStore():
+    '''Checkpoints of the objective function, keyed on trial ID and budget
+
+    With a store set, the optimizers call the objective function as
+
+        f(config, budget=budget, trial_id=trial_id, previous_budget=previous_budget, store=store)
+
+    where previous_budget is the largest budget below budget that the trial (the vector) was
+    evaluated on, None if there is none. An objective function can then restore the state it
+    saved on that budget with store.load(trial_id, previous_budget), train for the difference of
+    the budgets only and store.save(trial_id, budget, state) for a later promotion. The cost it
+    returns is the cost of the continued training. Batch objective functions receive lists of
+    trial IDs and previous budgets, one per configuration.
+
+    The checkpoints are files in the directory path (a temporary directory if None), such that
+    workers on the same machine (or sharing the file system) can read and write them. Which
+    budgets a trial was evaluated on is recorded by the optimizer only, and only the checkpoints
+    of the trials recorded are removed by clear(), other files in path are left untouched.
+
+    Parameters
+    ----------
+    path : str
+        Directory the checkpoints are written to
+    '''
+    def __init__(self, path=None):
+        if path is None:
+            path = tempfile.mkdtemp(prefix="dehb_continuation_")
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.budgets = {}  # sorted budgets each trial was evaluated on, by trial ID
+
+    def __getstate__(self):
+        d = dict(self.__dict__)
+        # the workers only need the path, the records stay with the optimizer
+        d["budgets"] = {}
+        return d
+
+    def record(self, trial_id, budget):
+        '''Records that the trial was evaluated on budget
+        '''
+        if budget is None:
+            return
+        budgets = self.budgets.setdefault(trial_id, [])
+        i = bisect.bisect_left(budgets, budget)
+        if i == len(budgets) or budgets[i] != budget:
+            budgets.insert(i, budget)
+
+    def previous_budget(self, trial_id, budget):
+        '''Returns the largest budget below budget that the trial was evaluated on, or None
+        '''
+        budgets = self.budgets.get(trial_id, [])
+        if budget is None or len(budgets) == 0:
+            return None
+        i = bisect.bisect_left(budgets, budget)
+        return budgets[i - 1] if i > 0 else None
+
+    def file(self, trial_id, budget):
+        return os.path.join(self.path, "{}_{}.pkl".format(trial_id, float(budget)))
+
+    def save(self, trial_id, budget, state):
+        '''Saves the state of the objective function for the trial on budget
+        '''
+        file = self.file(trial_id, budget)
+        tmp_file = "{}.{}.tmp".format(file, os.getpid())
+        with open(tmp_file, "wb") as fh:
+            pickle.dump(state, fh)
+        # replaced atomically, such that a reader never sees a partial checkpoint
+        os.replace(tmp_file, file)
+
+    def load(self, trial_id, budget):
+        '''Returns the state saved for the trial on budget, None if there is none
+        '''
+        if budget is None:
+            return None
+        try:
+            with open(self.file(trial_id, budget), "rb") as fh:
+                return pickle.load(fh)
+        except FileNotFoundError:
+            return None
+
+    def clear(self):
+        '''Forgets all trials and removes the checkpoints of the budgets recorded for them
+        '''
+        for trial_id, budgets in self.budgets.items():
+            for budget in budgets:
+                try:
+                    os.remove(self.file(trial_id, budget))
+                except FileNotFoundError:
+                    pass
+        self.budgets = {}
+
+
+def get_continuation(continuation=None):
+    '''Returns the continuation store an optimizer passes to the objective function
+
+    Parameters
+    ----------
+    continuation : bool, str or ContinuationStore
+        None or False - the objective function is called with the configuration and budget only
+        True - a store in a temporary directory
+        str - a store in that directory
+        An instance of ContinuationStore is returned as is.
+    '''
+    if isinstance(continuation, ContinuationStore):
+        return continuation
+    if continuation is None or continuation is False:
+        return None
+    if continuation is True:
+        return ContinuationStore()
+    if isinstance(continuation, (str, os.PathLike)):
+        return ContinuationStore(continuation)
+    raise ValueError("{} is not a valid choice of continuation, pass a bool, a path or a "
+                     "ContinuationStore".format(continuation))
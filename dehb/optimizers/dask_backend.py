@@ -0,0 +1,97 @@
+from distributed import Client, wait
+from distributed.diagnostics.plugin import SchedulerPlugin, WorkerPlugin
+
+from .backends import WorkerBackend
+from .executor import _install, _uninstall
+
+
+class WorkerCountPlugin(SchedulerPlugin):
+    """ Publishes an event to the clients subscribed when a worker joins or leaves the cluster
+    """
+    topic = "dehb-worker-count"
+    name = "dehb-worker-count"
+
+    def add_worker(self, scheduler=None, worker=None, **kwargs):
+        scheduler.log_event(self.topic, {"action": "add-worker", "worker": worker})
+
+    def remove_worker(self, scheduler=None, worker=None, **kwargs):
+        scheduler.log_event(self.topic, {"action": "remove-worker", "worker": worker})
+
+
+class InstallPlugin(WorkerPlugin):
+    """ Calls a factory once on every worker, including workers joining later or restarted, and
+    keeps the result in the worker process under a name
+    """
+    def __init__(self, name, factory):
+        self.name = "dehb-install-{}".format(name)  # registering the same name again replaces it
+        self.key = name
+        self.factory = factory
+
+    def setup(self, worker=None):
+        _install(self.key, self.factory)
+
+    def teardown(self, worker=None):
+        _uninstall(self.key)
+
+
+class DaskBackend(WorkerBackend):
+    """ Runs jobs on a Dask cluster, local with n_workers processes unless a client is passed
+    """
+    def __init__(self, n_workers=1, client=None):
+        self.n_workers = n_workers
+        # clients passed are left for the caller to close
+        self._owns_client = client is None
+        if client is None:
+            client = Client(
+                n_workers=self.n_workers, processes=True, threads_per_worker=1, scheduler_port=0
+            )  # port 0 makes Dask select a random free port
+        self.client = client
+        # the cached worker count is refreshed only when workers join or leave the cluster
+        self._n_slots = None
+        self._count_stale = True
+        self.client.register_plugin(WorkerCountPlugin())
+        self.client.subscribe_topic(WorkerCountPlugin.topic, self._on_cluster_event)
+
+    def _on_cluster_event(self, event):
+        """ Marks the cached worker count as stale when a worker joins or leaves the cluster
+
+        Called by the Dask client for every event published by the WorkerCountPlugin.
+        """
+        _, msg = event
+        if isinstance(msg, dict) and msg.get("action") in ["add-worker", "remove-worker"]:
+            self._count_stale = True
+
+    def submit(self, fn, *args):
+        return self.client.submit(fn, *args, pure=False)
+
+    def capacity(self):
+        if self._count_stale:
+            # flag is reset before querying so that an event during the query is not lost
+            self._count_stale = False
+            self._n_slots = sum(self.client.nthreads().values())
+        return self._n_slots
+
+    def wait(self, futures, timeout=None, return_when="FIRST_COMPLETED"):
+        try:
+            wait(futures, timeout=timeout, return_when=return_when)
+        except TimeoutError:
+            pass
+
+    def cancel(self, futures):
+        self.client.cancel(futures)
+
+    def scatter(self, data):
+        # the scattered data is referenced by all jobs through a Dask future
+        [future] = self.client.scatter([data], broadcast=True, hash=False)
+        return future
+
+    def install(self, name, factory):
+        self.client.register_plugin(InstallPlugin(name, factory))
+
+    def restart(self):
+        self.client.restart()
+        self._count_stale = True
+
+    def close(self):
+        if self._owns_client:
+            self.client.close()
@@ -1,5 +1,12 @@
 import numpy as np
-import ConfigSpace
+from itertools import repeat
+
+from .cache import get_cache
+from .continuation import get_continuation, trial_id
+from .decoder import ConfigDecoder
+from .executor import _call_objective
+from .history import History
+from .profiler import get_profiler, profiled
 
 
 class DEBase():
@@ -7,7 +14,8 @@ class DEBase():
     '''
     def __init__(self, cs=None, f=None, dimensions=None, pop_size=None, max_age=None,
                  mutation_factor=None, crossover_prob=None, strategy=None, budget=None,
-                 configspace=True, boundary_fix_type='random', **kwargs):
+                 configspace=True, boundary_fix_type='random', decoder=None, rng=None, seed=None,
+                 profiler=None, **kwargs):
         # Benchmark related variables
         self.cs = cs
         self.f = f
@@ -15,6 +23,8 @@ class DEBase():
             self.dimensions = len(self.cs.get_hyperparameters())
         else:
             self.dimensions = dimensions
+        # precompiled mapping from [0, 1] vectors to configurations, can be shared across objects
+        self.decoder = decoder
 
         # DE related variables
         self.pop_size = pop_size
@@ -25,8 +35,18 @@ class DEBase():
         self.budget = budget
         self.fix_type = boundary_fix_type
 
+        # numpy Generator that all random numbers of the DE are drawn from
+        ## a Generator passed is used as is, else one is created from seed at every reset
+        self.seed = seed
+        self._owns_rng = rng is None
+        self.rng = rng
+        if self._owns_rng:
+            self._init_rng()
+
         # Miscellaneous
         self.configspace = configspace
+        # a Profiler timing the phases of the optimizer, see profiler.Profiler
+        self.profiler = get_profiler(profiler)
         self.output_path = kwargs['output_path'] if 'output_path' in kwargs else ''
 
         # Global trackers
@@ -35,7 +55,16 @@ class DEBase():
         self.population = None
         self.fitness = None
         self.age = None
-        self.history = []
+        self.history = History(self.dimensions)
+
+    def _init_rng(self):
+        '''Creates the Generator of the DE from seed
+
+        If no seed was passed, it is drawn from the global numpy random state at every reset,
+        such that np.random.seed() before a run keeps making the run reproducible.
+        '''
+        seed = np.random.randint(2 ** 31) if self.seed is None else self.seed
+        self.rng = np.random.default_rng(seed)
 
     def reset(self):
         self.inc_score = np.inf
@@ -43,18 +72,20 @@ class DEBase():
         self.population = None
         self.fitness = None
         self.age = None
-        self.history = []
+        self.history = History(self.dimensions)
+        if self._owns_rng:
+            self._init_rng()
 
     def _shuffle_pop(self):
         pop_order = np.arange(len(self.population))
-        np.random.shuffle(pop_order)
+        self.rng.shuffle(pop_order)
         self.population = self.population[pop_order]
         self.fitness = self.fitness[pop_order]
         self.age = self.age[pop_order]
 
     def _sort_pop(self):
         pop_order = np.argsort(self.fitness)
-        np.random.shuffle(pop_order)
+        self.rng.shuffle(pop_order)
         self.population = self.population[pop_order]
         self.fitness = self.fitness[pop_order]
         self.age = self.age[pop_order]
@@ -74,7 +105,7 @@ class DEBase():
         return self._min_pop_size
 
     def init_population(self, pop_size=10):
-        population = np.random.uniform(low=0.0, high=1.0, size=(pop_size, self.dimensions))
+        population = self.rng.uniform(low=0.0, high=1.0, size=(pop_size, self.dimensions))
         return population
 
     def sample_population(self, size=3, alt_pop=None):
@@ -86,18 +117,69 @@ class DEBase():
         if isinstance(alt_pop, list) or isinstance(alt_pop, np.ndarray):
             idx = [indv is None for indv in alt_pop]
             if any(idx):
-                selection = np.random.choice(np.arange(len(self.population)), size, replace=False)
+                selection = self.rng.choice(len(self.population), size, replace=False)
                 return self.population[selection]
             else:
                 if len(alt_pop) < 3:
                     alt_pop = np.vstack((alt_pop, self.population))
-                selection = np.random.choice(np.arange(len(alt_pop)), size, replace=False)
+                selection = self.rng.choice(len(alt_pop), size, replace=False)
                 alt_pop = np.stack(alt_pop)
                 return alt_pop[selection]
         else:
-            selection = np.random.choice(np.arange(len(self.population)), size, replace=False)
+            selection = self.rng.choice(len(self.population), size, replace=False)
             return self.population[selection]
 
+    def _sample_indices(self, n, size):
+        '''Draws 'size' distinct indices from range(n), in a uniformly random order
+
+        Robert Floyd's sampling algorithm (in its permutation variant), which needs only 'size'
+        random numbers and never materializes range(n).
+        '''
+        if size > n:
+            raise ValueError("Cannot sample {} individuals from a population of "
+                             "{}".format(size, n))
+        selected = []
+        for j, u in zip(range(n - size, n), self.rng.random(size)):
+            t = int(u * (j + 1))
+            if t in selected:
+                selected.insert(selected.index(t) + 1, j)
+            else:
+                selected.insert(0, t)
+        return np.array(selected)
+
+    def _choice_batch(self, keys, size):
+        '''Returns 'size' distinct column indices per row of 'keys' in order of increasing key
+
+        With 'keys' drawn i.i.d. uniformly, each row is a random sample without replacement,
+        with masked out columns (set to np.inf) never chosen unless unavoidable
+        '''
+        if size < keys.shape[1]:
+            part = np.argpartition(keys, size - 1, axis=1)[:, :size]
+        else:
+            part = np.tile(np.arange(keys.shape[1]), (len(keys), 1))
+        order = np.argsort(np.take_along_axis(keys, part, axis=1), axis=1)
+        return np.take_along_axis(part, order, axis=1)
+
+    def sample_population_batch(self, size=3, alt_pop=None, targets=None):
+        '''Samples 'size' individuals for each of the targets passed, in one batch
+
+        Batched equivalent of calling sample_population() once per target.
+        Returns an array of shape (size, len(targets), dimensions).
+        '''
+        population = self.population
+        if isinstance(alt_pop, list) or isinstance(alt_pop, np.ndarray):
+            idx = [indv is None for indv in alt_pop]
+            if not any(idx):
+                population = np.stack(alt_pop)
+                if len(population) < 3:
+                    population = np.vstack((population, self.population))
+        if size > len(population):
+            raise ValueError("Cannot sample {} individuals from a population of "
+                             "{}".format(size, len(population)))
+        keys = self.rng.uniform(low=0.0, high=1.0, size=(len(targets), len(population)))
+        selection = self._choice_batch(keys, size)
+        return population[selection.T]
+
     def boundary_check(self, vector):
         '''
         Checks whether each of the dimensions of the input vector are within [0, 1].
@@ -109,44 +191,39 @@ class DEBase():
         Parameters
         ----------
         vector : array
+            a single individual or a 2D array of individuals
 
         Returns
         -------
         array
         '''
-        violations = np.where((vector > 1) | (vector < 0))[0]
-        if len(violations) == 0:
+        violations = (vector > 1) | (vector < 0)
+        n_violations = np.sum(violations)
+        if n_violations == 0:
             return vector
         if self.fix_type == 'random':
-            vector[violations] = np.random.uniform(low=0.0, high=1.0, size=len(violations))
+            vector[violations] = self.rng.uniform(low=0.0, high=1.0, size=n_violations)
         else:
             vector[violations] = np.clip(vector[violations], a_min=0, a_max=1)
         return vector
 
+    @profiled("decode")
     def vector_to_configspace(self, vector):
         '''Converts numpy array to ConfigSpace object
 
         Works when self.cs is a ConfigSpace object and the input vector is in the domain [0, 1].
         '''
-        new_config = self.cs.sample_configuration()
-        for i, hyper in enumerate(self.cs.get_hyperparameters()):
-            if type(hyper) == ConfigSpace.OrdinalHyperparameter:
-                ranges = np.arange(start=0, stop=1, step=1/len(hyper.sequence))
-                param_value = hyper.sequence[np.where((vector[i] < ranges) == False)[0][-1]]
-            elif type(hyper) == ConfigSpace.CategoricalHyperparameter:
-                ranges = np.arange(start=0, stop=1, step=1/len(hyper.choices))
-                param_value = hyper.choices[np.where((vector[i] < ranges) == False)[0][-1]]
-            else:  # handles UniformFloatHyperparameter & UniformIntegerHyperparameter
-                # rescaling continuous values
-                if hyper.log:
-                    log_range = np.log(hyper.upper) - np.log(hyper.lower)
-                    param_value = np.exp(np.log(hyper.lower) + vector[i] * log_range)
-                else:
-                    param_value = hyper.lower + (hyper.upper - hyper.lower) * vector[i]
-                if type(hyper) == ConfigSpace.UniformIntegerHyperparameter:
-                    param_value = np.round(param_value).astype(int)   # converting to discrete (int)
-            new_config[hyper.name] = param_value
-        return new_config
+        if self.decoder is None:
+            self.decoder = ConfigDecoder(self.cs)
+        return self.decoder.to_configuration(vector)
+
+    @profiled("decode")
+    def vectors_to_configspace(self, vectors):
+        '''Converts a 2D numpy array (population) to a list of ConfigSpace objects
+        '''
+        if self.decoder is None:
+            self.decoder = ConfigDecoder(self.cs)
+        return self.decoder.to_configurations(vectors)
 
     def f_objective(self):
         raise NotImplementedError("The function needs to be defined in the sub class.")
@@ -167,7 +244,9 @@ class DEBase():
 class DE(DEBase):
     def __init__(self, cs=None, f=None, dimensions=None, pop_size=20, max_age=np.inf,
                  mutation_factor=None, crossover_prob=None, strategy='rand1_bin',
-                 budget=None, encoding=False, dim_map=None, **kwargs):
+                 budget=None, encoding=False, dim_map=None, vectorized=False,
+                 batch_objective=False, executor=None, cache=None, continuation=None,
+                 **kwargs):
         super().__init__(cs=cs, f=f, dimensions=dimensions, pop_size=pop_size, max_age=max_age,
                          mutation_factor=mutation_factor, crossover_prob=crossover_prob,
                          strategy=strategy, budget=budget, **kwargs)
@@ -178,13 +257,30 @@ class DE(DEBase):
             self.mutation_strategy = self.crossover_strategy = None
         self.encoding = encoding
         self.dim_map = dim_map
+        # if True, trials for a generation are created in a batch and not one target at a time
+        self.vectorized = vectorized
+        # if True, the objective is called with a list of configurations and one budget and
+        # returns arrays of fitness and cost, allowing a whole population to be evaluated at once
+        self.batch_objective = batch_objective
+        # a concurrent.futures.Executor that independent evaluations are dispatched through
+        self.executor = executor
+        # an EvaluationCache that evaluations are looked up in before calling the objective
+        self.cache = get_cache(cache)
+        # a ContinuationStore passed to the objective function with the trial ID and the budget
+        # the trial was last evaluated on, see continuation.ContinuationStore
+        self.continuation = get_continuation(continuation)
         self._set_min_pop_size()
 
     def reset(self):
         super().reset()
+        if self.cache is not None:
+            # evaluations of a previous run are not reused by the next
+            self.cache.clear()
+        if self.continuation is not None:
+            self.continuation.clear()
         self.traj = []
         self.runtime = []
-        self.history = []
+        self.history = History(self.dimensions)
 
     def _set_min_pop_size(self):
         if self.mutation_strategy in ['rand1', 'rand2dir', 'randtobest1']:
@@ -202,25 +298,167 @@ class DE(DEBase):
 
     def map_to_original(self, vector):
         dimensions = len(self.dim_map.keys())
-        new_vector = np.random.uniform(size=dimensions)
+        new_vector = self.rng.uniform(size=dimensions)
         for i in range(dimensions):
             new_vector[i] = np.max(np.array(vector)[self.dim_map[i]])
         return new_vector
 
+    @profiled("evaluation")
     def f_objective(self, x, budget=None):
         if self.f is None:
             raise NotImplementedError("An objective function needs to be passed.")
+        if self.batch_objective or self.cache is not None:
+            fitness, cost = self.f_objective_batch(np.array([x]), budget)
+            return fitness[0], cost[0]
+        self._evaluation_events("evaluation_start", [x], budget)
+        fitness, cost = self._f_objective(x, budget)
+        self._evaluation_events("evaluation_end", [x], budget, [fitness], [cost])
+        return fitness, cost
+
+    def _evaluation_events(self, event, X, budget=None, fitness=None, cost=None):
+        if not self.profiler.enabled:
+            return
+        for i, x in enumerate(X):
+            if fitness is None:
+                self.profiler.event(event, config=x, budget=budget)
+            else:
+                self.profiler.event(event, config=x, budget=budget, fitness=fitness[i],
+                                    cost=cost[i])
+
+    def _f_objective(self, x, budget=None):
+        kwargs = self._continuation_kwargs([x], budget)
+        if kwargs is not None:
+            kwargs["trial_id"], kwargs["previous_budget"] = \
+                kwargs["trial_id"][0], kwargs["previous_budget"][0]
         if self.encoding:
             x = self.map_to_original(x)
-        if self.configspace:
-            # converts [0, 1] vector to a ConfigSpace object
-            config = self.vector_to_configspace(x)
-        if budget is not None:  # to be used when called by multi-fidelity based optimizers
-            fitness, cost = self.f(config, budget=budget)
+        # converts [0, 1] vector to a ConfigSpace object
+        config = self.vector_to_configspace(x) if self.configspace else x
+        # budget is not None when called by multi-fidelity based optimizers
+        fitness, cost = _call_objective(self.f, config, budget, kwargs)
+        if kwargs is not None:
+            self._record_trials([kwargs["trial_id"]], budget)
+        return fitness, cost
+
+    def _continuation_kwargs(self, X, budget=None):
+        '''Returns the keyword arguments of the continuation protocol for the vectors X, None if
+        no ContinuationStore is set
+        '''
+        if self.continuation is None:
+            return None
+        trial_ids = [trial_id(x) for x in X]
+        return {
+            "trial_id": trial_ids,
+            "previous_budget": [self.continuation.previous_budget(t, budget) for t in trial_ids],
+            "store": self.continuation
+        }
+
+    def _record_trials(self, trial_ids, budget=None):
+        if self.continuation is not None:
+            for _trial_id in trial_ids:
+                self.continuation.record(_trial_id, budget)
+
+    def _vectors_to_configs(self, X):
+        '''Converts a population of vectors to the list of inputs for the objective function
+        '''
+        if self.encoding:
+            X = np.array([self.map_to_original(x) for x in X])
+        # converts the [0, 1] population to a list of ConfigSpace objects
+        return self.vectors_to_configspace(X) if self.configspace else list(X)
+
+    @profiled("evaluation")
+    def f_objective_batch(self, X, budget=None):
+        '''Evaluates a population of vectors on the same budget
+
+        If batch_objective is True, the objective function is called once with the list of all
+        configurations and the budget, and must return array-likes of fitness and cost values.
+        Else, the objective function is called once for each individual, through the executor
+        if one is set, in which case the results are collected in the order of the population.
+        If a cache is set, only the individuals not found in it are evaluated.
+
+        Returns
+        -------
+        fitness : list
+        cost : list
+        '''
+        if self.f is None:
+            raise NotImplementedError("An objective function needs to be passed.")
+        self._evaluation_events("evaluation_start", X, budget)
+        if self.cache is not None:
+            fitness, cost = self._f_objective_cached(X, budget)
         else:
-            fitness, cost = self.f(config)
+            fitness, cost = self._f_objective_batch(X, budget)
+        self._evaluation_events("evaluation_end", X, budget, fitness, cost)
+        return fitness, cost
+
+    def _f_objective_batch(self, X, budget=None):
+        if not self.batch_objective:
+            if self.executor is None:
+                results = [self._f_objective(x, budget) for x in X]
+            else:
+                kwargs = self._continuation_kwargs(X, budget)
+                if kwargs is None:
+                    kwargs = [None] * len(X)
+                else:
+                    kwargs = [{"trial_id": _trial_id, "previous_budget": previous_budget,
+                               "store": self.continuation}
+                              for _trial_id, previous_budget in
+                              zip(kwargs["trial_id"], kwargs["previous_budget"])]
+                results = self.executor.map(
+                    _call_objective, repeat(self.f), self._vectors_to_configs(X), repeat(budget),
+                    kwargs
+                )
+                results = list(results)
+                self._record_trials([_kwargs["trial_id"] for _kwargs in kwargs
+                                     if _kwargs is not None], budget)
+            return [res[0] for res in results], [res[1] for res in results]
+        kwargs = self._continuation_kwargs(X, budget)
+        fitness, cost = _call_objective(self.f, self._vectors_to_configs(X), budget, kwargs)
+        fitness, cost = np.asarray(fitness).tolist(), np.asarray(cost).tolist()
+        if len(fitness) != len(X) or len(cost) != len(X):
+            raise ValueError("The batch objective returned {} fitness and {} cost values for {} "
+                             "configurations.".format(len(fitness), len(cost), len(X)))
+        if kwargs is not None:
+            self._record_trials(kwargs["trial_id"], budget)
+        return fitness, cost
+
+    def _cache_key(self, x, budget=None):
+        # one-hot encoded vectors are keyed as they are, as mapping them draws random numbers
+        if self.encoding or not self.configspace or self.cs is None:
+            return self.cache.key(x, budget)
+        if self.decoder is None:
+            self.decoder = ConfigDecoder(self.cs)
+        return self.cache.key(x, budget, self.decoder)
+
+    def _f_objective_cached(self, X, budget=None):
+        '''Evaluates only the vectors of X whose configuration on budget is not in the cache
+
+        Vectors of X that decode to the same configuration are evaluated once.
+        '''
+        fitness, cost = [None] * len(X), [None] * len(X)
+        missing = {}  # indices of the vectors by the key of their configuration
+        for i, x in enumerate(X):
+            key = self._cache_key(x, budget)
+            if key in missing:
+                missing[key].append(i)
+                continue
+            result = self.cache.get(key)
+            if result is None:
+                missing[key] = [i]
+            else:
+                fitness[i], cost[i] = result
+        if len(missing) > 0:
+            first = [idx[0] for idx in missing.values()]
+            new_fitness, new_cost = self._f_objective_batch(np.asarray(X)[first], budget)
+            for (key, idx), _fitness, _cost in zip(missing.items(), new_fitness, new_cost):
+                self.cache.put(key, _fitness, _cost)
+                fitness[idx[0]], cost[idx[0]] = _fitness, _cost
+                for i in idx[1:]:
+                    # duplicates within X count as hits
+                    fitness[i], cost[i] = self.cache.get(key) or (_fitness, _cost)
         return fitness, cost
 
+    @profiled("selection")
     def init_eval_pop(self, budget=None, eval=True):
         '''Creates new population of 'pop_size' and evaluates individuals.
         '''
@@ -230,23 +468,25 @@ class DE(DEBase):
 
         traj = []
         runtime = []
-        history = []
+        history = History(self.dimensions)
 
         if not eval:
             return traj, runtime, history
 
+        fitness_values, cost_values = self.f_objective_batch(self.population, budget)
         for i in range(self.pop_size):
             config = self.population[i]
-            self.fitness[i], cost = self.f_objective(config, budget)
+            self.fitness[i], cost = fitness_values[i], cost_values[i]
             if self.fitness[i] < self.inc_score:
                 self.inc_score = self.fitness[i]
                 self.inc_config = config
             traj.append(self.inc_score)
             runtime.append(cost)
-            history.append((config.tolist(), float(self.fitness[i]), float(budget or 0)))
+            history.append(config, self.fitness[i], budget, cost)
 
         return traj, runtime, history
 
+    @profiled("selection")
     def eval_pop(self, population=None, budget=None):
         '''Evaluates a population
 
@@ -257,12 +497,13 @@ class DE(DEBase):
         pop_size = self.pop_size if population is None else len(pop)
         traj = []
         runtime = []
-        history = []
+        history = History(self.dimensions)
         fitnesses = []
         costs = []
         ages = []
+        fitness_values, cost_values = self.f_objective_batch(pop[:pop_size], budget)
         for i in range(pop_size):
-            fitness, cost = self.f_objective(pop[i], budget)
+            fitness, cost = fitness_values[i], cost_values[i]
             if population is None:
                 self.fitness[i] = fitness
             if fitness <= self.inc_score:
@@ -270,7 +511,7 @@ class DE(DEBase):
                 self.inc_config = pop[i]
             traj.append(self.inc_score)
             runtime.append(cost)
-            history.append((pop[i].tolist(), float(fitness), float(budget or 0)))
+            history.append(pop[i], fitness, budget, cost)
             fitnesses.append(fitness)
             costs.append(cost)
             ages.append(self.max_age)
@@ -306,6 +547,7 @@ class DE(DEBase):
         mutant = r1 + self.mutation_factor * diff / 2
         return mutant
 
+    @profiled("mutation")
     def mutation(self, current=None, best=None, alt_pop=None):
         '''Performs DE mutation
         '''
@@ -347,26 +589,68 @@ class DE(DEBase):
 
         return mutant
 
+    @profiled("mutation")
+    def mutation_batch(self, current, best=None, alt_pop=None):
+        '''Performs DE mutation for a batch of targets
+
+        Vectorized equivalent of calling mutation() once for each row of 'current'
+        '''
+        if best is None and self.mutation_strategy in \
+                ['best1', 'best2', 'currenttobest1', 'randtobest1']:
+            best = self.population[np.argmin(self.fitness)]
+
+        if self.mutation_strategy == 'rand1':
+            r1, r2, r3 = self.sample_population_batch(size=3, alt_pop=alt_pop, targets=current)
+            mutants = self.mutation_rand1(r1, r2, r3)
+
+        elif self.mutation_strategy == 'rand2':
+            r1, r2, r3, r4, r5 = \
+                self.sample_population_batch(size=5, alt_pop=alt_pop, targets=current)
+            mutants = self.mutation_rand2(r1, r2, r3, r4, r5)
+
+        elif self.mutation_strategy == 'rand2dir':
+            r1, r2, r3 = self.sample_population_batch(size=3, alt_pop=alt_pop, targets=current)
+            mutants = self.mutation_rand2dir(r1, r2, r3)
+
+        elif self.mutation_strategy == 'best1':
+            r1, r2 = self.sample_population_batch(size=2, alt_pop=alt_pop, targets=current)
+            mutants = self.mutation_rand1(best, r1, r2)
+
+        elif self.mutation_strategy == 'best2':
+            r1, r2, r3, r4 = self.sample_population_batch(size=4, alt_pop=alt_pop, targets=current)
+            mutants = self.mutation_rand2(best, r1, r2, r3, r4)
+
+        elif self.mutation_strategy == 'currenttobest1':
+            r1, r2 = self.sample_population_batch(size=2, alt_pop=alt_pop, targets=current)
+            mutants = self.mutation_currenttobest1(current, best, r1, r2)
+
+        elif self.mutation_strategy == 'randtobest1':
+            r1, r2, r3 = self.sample_population_batch(size=3, alt_pop=alt_pop, targets=current)
+            mutants = self.mutation_currenttobest1(r1, best, r2, r3)
+
+        return mutants
+
     def crossover_bin(self, target, mutant):
         '''Performs the binomial crossover of DE
         '''
-        cross_points = np.random.rand(self.dimensions) < self.crossover_prob
+        cross_points = self.rng.random(self.dimensions) < self.crossover_prob
         if not np.any(cross_points):
-            cross_points[np.random.randint(0, self.dimensions)] = True
+            cross_points[self.rng.integers(0, self.dimensions)] = True
         offspring = np.where(cross_points, mutant, target)
         return offspring
 
     def crossover_exp(self, target, mutant):
         '''Performs the exponential crossover of DE
         '''
-        n = np.random.randint(0, self.dimensions)
+        n = self.rng.integers(0, self.dimensions)
         L = 0
-        while ((np.random.rand() < self.crossover_prob) and L < self.dimensions):
+        while ((self.rng.random() < self.crossover_prob) and L < self.dimensions):
             idx = (n+L) % self.dimensions
             target[idx] = mutant[idx]
             L = L + 1
         return target
 
+    @profiled("crossover")
     def crossover(self, target, mutant):
         '''Performs DE crossover
         '''
@@ -376,15 +660,66 @@ class DE(DEBase):
             offspring = self.crossover_exp(target, mutant)
         return offspring
 
+    def crossover_bin_batch(self, targets, mutants):
+        '''Performs the binomial crossover of DE for a batch of targets and mutants
+        '''
+        n = len(targets)
+        cross_points = self.rng.random((n, self.dimensions)) < self.crossover_prob
+        # each offspring inherits at least one dimension from its mutant
+        no_cross = np.where(~np.any(cross_points, axis=1))[0]
+        cross_points[no_cross, self.rng.integers(0, self.dimensions, size=len(no_cross))] = True
+        offsprings = np.where(cross_points, mutants, targets)
+        return offsprings
+
+    def crossover_exp_batch(self, targets, mutants):
+        '''Performs the exponential crossover of DE for a batch of targets and mutants
+        '''
+        n = len(targets)
+        starts = self.rng.integers(0, self.dimensions, size=n)
+        # length of the copied segment is the number of leading successful Bernoulli trials
+        successes = self.rng.random((n, self.dimensions)) < self.crossover_prob
+        L = np.sum(np.cumprod(successes, axis=1), axis=1)
+        offsets = (np.arange(self.dimensions) - starts.reshape(-1, 1)) % self.dimensions
+        offsprings = np.where(offsets < L.reshape(-1, 1), mutants, targets)
+        return offsprings
+
+    @profiled("crossover")
+    def crossover_batch(self, targets, mutants):
+        '''Performs DE crossover for a batch of targets and mutants
+        '''
+        if self.crossover_strategy == 'bin':
+            offsprings = self.crossover_bin_batch(targets, mutants)
+        elif self.crossover_strategy == 'exp':
+            offsprings = self.crossover_exp_batch(targets, mutants)
+        return offsprings
+
+    def generate_trials(self, best=None, alt_pop=None):
+        '''Creates the trial population for a generation in a batch: mutation -> crossover
+
+        Vectorized equivalent of looping over the population with each individual as the target
+        '''
+        targets = self.population[:self.pop_size]
+        mutants = self.mutation_batch(current=targets, best=best, alt_pop=alt_pop)
+        trials = self.crossover_batch(targets, mutants)
+        trials = self.boundary_check(trials)
+        return trials
+
+    @profiled("selection")
     def selection(self, trials, budget=None):
         '''Carries out a parent-offspring competition given a set of trial population
         '''
+        # evaluation of the newly created individuals
+        fitness_values, cost_values = self.f_objective_batch(trials, budget)
+        return self._select(trials, fitness_values, cost_values, budget)
+
+    def _select(self, trials, fitness_values, cost_values, budget=None):
+        '''Parent-offspring competition given the fitness and cost of the trial population
+        '''
         traj = []
         runtime = []
-        history = []
+        history = History(self.dimensions)
         for i in range(len(trials)):
-            # evaluation of the newly created individuals
-            fitness, cost = self.f_objective(trials[i], budget)
+            fitness, cost = fitness_values[i], cost_values[i]
             # selection -- competition between parent[i] -- child[i]
             ## equality is important for landscape exploration
             if fitness <= self.fitness[i]:
@@ -401,20 +736,23 @@ class DE(DEBase):
                 self.inc_config = self.population[i]
             traj.append(self.inc_score)
             runtime.append(cost)
-            history.append((trials[i].tolist(), float(fitness), float(budget or 0)))
+            history.append(trials[i], fitness, budget, cost)
         return traj, runtime, history
 
     def evolve_generation(self, budget=None, best=None, alt_pop=None):
         '''Performs a complete DE evolution: mutation -> crossover -> selection
         '''
-        trials = []
-        for j in range(self.pop_size):
-            target = self.population[j]
-            donor = self.mutation(current=target, best=best, alt_pop=alt_pop)
-            trial = self.crossover(target, donor)
-            trial = self.boundary_check(trial)
-            trials.append(trial)
-        trials = np.array(trials)
+        if self.vectorized:
+            trials = self.generate_trials(best=best, alt_pop=alt_pop)
+        else:
+            trials = []
+            for j in range(self.pop_size):
+                target = self.population[j]
+                donor = self.mutation(current=target, best=best, alt_pop=alt_pop)
+                trial = self.crossover(target, donor)
+                trial = self.boundary_check(trial)
+                trials.append(trial)
+            trials = np.array(trials)
         traj, runtime, history = self.selection(trials, budget)
         return traj, runtime, history
 
@@ -428,7 +766,7 @@ class DE(DEBase):
 
         old_strategy = self.mutation_strategy
         self.mutation_strategy = 'rand1'
-        mutants = np.random.uniform(low=0.0, high=1.0, size=(size, self.dimensions))
+        mutants = self.rng.uniform(low=0.0, high=1.0, size=(size, self.dimensions))
         for i in range(size):
             mutant = self.mutation(current=None, best=None, alt_pop=population)
             mutants[i] = self.boundary_check(mutant)
@@ -457,7 +795,7 @@ class DE(DEBase):
         if verbose:
             print("\nRun complete!")
 
-        return (np.array(self.traj), np.array(self.runtime), np.array(self.history))
+        return (np.array(self.traj), np.array(self.runtime), self.history)
 
 
 class AsyncDE(DE):
@@ -513,57 +851,107 @@ class AsyncDE(DE):
     def _init_mutant_population(self, pop_size, population, target=None, best=None):
         '''Generates pop_size mutants from the passed population
         '''
-        mutants = np.random.uniform(low=0.0, high=1.0, size=(pop_size, self.dimensions))
+        mutants = self.rng.uniform(low=0.0, high=1.0, size=(pop_size, self.dimensions))
         for i in range(pop_size):
             mutants[i] = self.mutation(current=target, best=best, alt_pop=population)
         return mutants
 
-    def _sample_population(self, size=3, alt_pop=None, target=None):
+    def _sample_population(self, size=3, alt_pop=None, target=None, target_idx=None):
         '''Samples 'size' individuals
 
         If alt_pop is None or a list/array of None, sample from own population
         Else sample from the specified alternate population
+        The target is not a candidate for mutation: it is excluded by its index target_idx in the
+        own population, or else by looking up the first individual equal to target in the pool.
+        Indices are drawn around the excluded one, such that the pool is never copied.
+        '''
+        own_population = True
+        population = self.population
+        if isinstance(alt_pop, np.ndarray) or \
+                (isinstance(alt_pop, list) and not any(indv is None for indv in alt_pop)):
+            # choose the passed population
+            own_population = False
+            population = np.asarray(alt_pop)
+        pool_size = len(population)
+
+        exclude = None
+        if pool_size > 1:
+            if own_population and target_idx is not None:
+                exclude = target_idx
+            elif target is not None:
+                # eliminating target from mutation sampling pool
+                matches = np.flatnonzero(np.all(population == target, axis=1))
+                if len(matches) > 0:
+                    exclude = matches[0]
+        n_candidates = pool_size - (exclude is not None)
+        # compensate with uniformly random individuals if the pool is short
+        filler = max(0, self._min_pop_size - n_candidates)
+
+        selection = self._sample_indices(n_candidates + filler, size)
+        padded = selection >= n_candidates
+        if exclude is not None:
+            # skipping over the index of the target
+            selection[~padded & (selection >= exclude)] += 1
+        individuals = np.empty((size, self.dimensions))
+        individuals[~padded] = population[selection[~padded]]
+        if np.any(padded):
+            individuals[padded] = self.rng.uniform(low=0.0, high=1.0,
+                                                   size=(np.sum(padded), self.dimensions))
+        return individuals
+
+    def sample_population_batch(self, size=3, alt_pop=None, targets=None):
+        '''Samples 'size' individuals for each of the targets passed, in one batch
+
+        Batched equivalent of calling _sample_population() once per target, including the
+        elimination of the target from its own sampling pool and the random padding of pools
+        smaller than the minimum population size for the mutation strategy.
+        Returns an array of shape (size, len(targets), dimensions).
         '''
         population = None
         if isinstance(alt_pop, list) or isinstance(alt_pop, np.ndarray):
             idx = [indv is None for indv in alt_pop]  # checks if all individuals are valid
-            if any(idx):
-                # default to the object's initialized population
-                population = self.population
-            else:
-                # choose the passed population
-                population = alt_pop
+            population = self.population if any(idx) else np.stack(alt_pop)
         else:
-            # default to the object's initialized population
             population = self.population
-
-        if target is not None and len(population) > 1:
-            # eliminating target from mutation sampling pool
-            # the target individual should not be a part of the candidates for mutation
-            for i, pop in enumerate(population):
-                if all(target == pop):
-                    population = np.concatenate((population[:i], population[i + 1:]))
-                    break
-        if len(population) < self._min_pop_size:
-            # compensate if target was part of the population and deleted earlier
-            filler = self._min_pop_size - len(population)
-            new_pop = self.init_population(pop_size=filler)  # chosen in a uniformly random manner
-            population = np.concatenate((population, new_pop))
-
-        selection = np.random.choice(np.arange(len(population)), size, replace=False)
-        return population[selection]
-
+        n = len(targets)
+        pool_size = len(population)
+
+        keys = self.rng.uniform(low=0.0, high=1.0, size=(n, pool_size))
+        # eliminating the first occurrence of each target from its mutation sampling pool
+        found = np.zeros(n, dtype=bool)
+        if pool_size > 1:
+            matches = np.all(population[np.newaxis, :, :] == targets[:, np.newaxis, :], axis=2)
+            found = np.any(matches, axis=1)
+            keys[found, np.argmax(matches[found], axis=1)] = np.inf
+
+        # compensating with uniformly random individuals if a pool falls short
+        filler = np.clip(self._min_pop_size - (pool_size - found), a_min=0, a_max=None)
+        if np.max(filler) == 0:
+            selection = self._choice_batch(keys, size)
+            return population[selection.T]
+        pad = np.max(filler)
+        pad_keys = self.rng.uniform(low=0.0, high=1.0, size=(n, pad))
+        pad_keys[np.arange(pad) >= filler.reshape(-1, 1)] = np.inf
+        keys = np.hstack((keys, pad_keys))
+        pools = np.concatenate((np.broadcast_to(population, (n, pool_size, self.dimensions)),
+                                self.init_population(pop_size=n * pad).reshape(n, pad, -1)),
+                               axis=1)
+        selection = self._choice_batch(keys, size)
+        return pools[np.arange(n), selection.T]
+
+    @profiled("selection")
     def eval_pop(self, population=None, budget=None):
         pop = self.population if population is None else population
         pop_size = self.pop_size if population is None else len(pop)
         traj = []
         runtime = []
-        history = []
+        history = History(self.dimensions)
         fitnesses = []
         costs = []
         ages = []
+        fitness_values, cost_values = self.f_objective_batch(pop[:pop_size], budget)
         for i in range(pop_size):
-            fitness, cost = self.f_objective(pop[i], budget)
+            fitness, cost = fitness_values[i], cost_values[i]
             if population is None:
                 self.fitness[i] = fitness
             if fitness <= self.inc_score:
@@ -571,47 +959,64 @@ class AsyncDE(DE):
                 self.inc_config = pop[i]
             traj.append(self.inc_score)
             runtime.append(cost)
-            history.append((pop[i].tolist(), float(fitness), float(budget or 0)))
+            history.append(pop[i], fitness, budget, cost)
             fitnesses.append(fitness)
             costs.append(cost)
             ages.append(self.max_age)
         return traj, runtime, history, np.array(fitnesses), np.array(ages)
 
-    def mutation(self, current=None, best=None, alt_pop=None):
+    @profiled("mutation")
+    def mutation(self, current=None, best=None, alt_pop=None, current_idx=None):
         '''Performs DE mutation
+
+        current_idx is the index of current in the population, if it was taken from there
         '''
         if self.mutation_strategy == 'rand1':
-            r1, r2, r3 = self._sample_population(size=3, alt_pop=alt_pop, target=current)
+            r1, r2, r3 = self._sample_population(
+                size=3, alt_pop=alt_pop, target=current, target_idx=current_idx
+            )
             mutant = self.mutation_rand1(r1, r2, r3)
 
         elif self.mutation_strategy == 'rand2':
-            r1, r2, r3, r4, r5 = self._sample_population(size=5, alt_pop=alt_pop, target=current)
+            r1, r2, r3, r4, r5 = self._sample_population(
+                size=5, alt_pop=alt_pop, target=current, target_idx=current_idx
+            )
             mutant = self.mutation_rand2(r1, r2, r3, r4, r5)
 
         elif self.mutation_strategy == 'rand2dir':
-            r1, r2, r3 = self._sample_population(size=3, alt_pop=alt_pop, target=current)
+            r1, r2, r3 = self._sample_population(
+                size=3, alt_pop=alt_pop, target=current, target_idx=current_idx
+            )
             mutant = self.mutation_rand2dir(r1, r2, r3)
 
         elif self.mutation_strategy == 'best1':
-            r1, r2 = self._sample_population(size=2, alt_pop=alt_pop, target=current)
+            r1, r2 = self._sample_population(
+                size=2, alt_pop=alt_pop, target=current, target_idx=current_idx
+            )
             if best is None:
                 best = self.population[np.argmin(self.fitness)]
             mutant = self.mutation_rand1(best, r1, r2)
 
         elif self.mutation_strategy == 'best2':
-            r1, r2, r3, r4 = self._sample_population(size=4, alt_pop=alt_pop, target=current)
+            r1, r2, r3, r4 = self._sample_population(
+                size=4, alt_pop=alt_pop, target=current, target_idx=current_idx
+            )
             if best is None:
                 best = self.population[np.argmin(self.fitness)]
             mutant = self.mutation_rand2(best, r1, r2, r3, r4)
 
         elif self.mutation_strategy == 'currenttobest1':
-            r1, r2 = self._sample_population(size=2, alt_pop=alt_pop, target=current)
+            r1, r2 = self._sample_population(
+                size=2, alt_pop=alt_pop, target=current, target_idx=current_idx
+            )
             if best is None:
                 best = self.population[np.argmin(self.fitness)]
             mutant = self.mutation_currenttobest1(current, best, r1, r2)
 
         elif self.mutation_strategy == 'randtobest1':
-            r1, r2, r3 = self._sample_population(size=3, alt_pop=alt_pop, target=current)
+            r1, r2, r3 = self._sample_population(
+                size=3, alt_pop=alt_pop, target=current, target_idx=current_idx
+            )
             if best is None:
                 best = self.population[np.argmin(self.fitness)]
             mutant = self.mutation_currenttobest1(r1, best, r2, r3)
@@ -624,49 +1029,60 @@ class AsyncDE(DE):
         if population is None:
             population = self.population
 
-        mutants = np.random.uniform(low=0.0, high=1.0, size=(size, self.dimensions))
+        mutants = self.rng.uniform(low=0.0, high=1.0, size=(size, self.dimensions))
         for i in range(size):
-            j = np.random.choice(np.arange(len(population)))
+            j = self.rng.integers(len(population))
             mutant = self.mutation(current=population[j], best=self.inc_config, alt_pop=population)
             mutants[i] = self.boundary_check(mutant)
 
         return mutants
 
+    def generate_trial(self, i, best=None, alt_pop=None):
+        '''Creates the trial of the i-th individual as the target: mutation -> crossover
+        '''
+        target = self.population[i]
+        donor = self.mutation(current=target, best=best, alt_pop=alt_pop, current_idx=i)
+        trial = self.crossover(target, donor)
+        return self.boundary_check(trial)
+
+    def generate_deferred_trials(self, best=None, alt_pop=None):
+        '''Creates the trials of all targets of a generation of the 'deferred' strategy
+        '''
+        if self.vectorized:
+            return self.generate_trials(best=best, alt_pop=alt_pop)
+        return np.array([self.generate_trial(j, best=best, alt_pop=alt_pop)
+                         for j in range(self.pop_size)])
+
+    def select_trial(self, i, trial, fitness):
+        '''One-vs-one selection of the asynchronous strategies
+
+        The trial replaces the i-th individual right away, despite not completing one iteration.
+        '''
+        if fitness <= self.fitness[i]:
+            self.population[i] = trial
+            self.fitness[i] = fitness
+
     def evolve_generation(self, budget=None, best=None, alt_pop=None):
         '''Performs a complete DE evolution, mutation -> crossover -> selection
         '''
         traj = []
         runtime = []
-        history = []
+        history = History(self.dimensions)
 
         if self.async_strategy == 'deferred':
-            trials = []
-            for j in range(self.pop_size):
-                target = self.population[j]
-                donor = self.mutation(current=target, best=best, alt_pop=alt_pop)
-                trial = self.crossover(target, donor)
-                trial = self.boundary_check(trial)
-                trials.append(trial)
+            trials = self.generate_deferred_trials(best=best, alt_pop=alt_pop)
             # selection takes place on a separate trial population only after
             # one iteration through the population has taken place
-            trials = np.array(trials)
             traj, runtime, history = self.selection(trials, budget)
             return traj, runtime, history
 
         elif self.async_strategy == 'immediate':
             for i in range(self.pop_size):
-                target = self.population[i]
-                donor = self.mutation(current=target, best=best, alt_pop=alt_pop)
-                trial = self.crossover(target, donor)
-                trial = self.boundary_check(trial)
+                trial = self.generate_trial(i, best=best, alt_pop=alt_pop)
                 # evaluating a single trial population for the i-th individual
                 de_traj, de_runtime, de_history, fitnesses, costs = \
                     self.eval_pop(trial.reshape(1, self.dimensions), budget=budget)
-                # one-vs-one selection
-                ## can replace the i-the population despite not completing one iteration
-                if fitnesses[0] <= self.fitness[i]:
-                    self.population[i] = trial
-                    self.fitness[i] = fitnesses[0]
+                self.select_trial(i, trial, fitnesses[0])
                 traj.extend(de_traj)
                 runtime.extend(de_runtime)
                 history.extend(de_history)
@@ -676,21 +1092,14 @@ class AsyncDE(DE):
             for count in range(self.pop_size):
                 # choosing target individual
                 if self.async_strategy == 'random':
-                    i = np.random.choice(np.arange(self.pop_size))
+                    i = self.rng.integers(self.pop_size)
                 else:  # async_strategy == 'worst'
                     i = np.argsort(-self.fitness)[0]
-                target = self.population[i]
-                mutant = self.mutation(current=target, best=best, alt_pop=alt_pop)
-                trial = self.crossover(target, mutant)
-                trial = self.boundary_check(trial)
+                trial = self.generate_trial(i, best=best, alt_pop=alt_pop)
                 # evaluating a single trial population for the i-th individual
                 de_traj, de_runtime, de_history, fitnesses, costs = \
                     self.eval_pop(trial.reshape(1, self.dimensions), budget=budget)
-                # one-vs-one selection
-                ## can replace the i-the population despite not completing one iteration
-                if fitnesses[0] <= self.fitness[i]:
-                    self.population[i] = trial
-                    self.fitness[i] = fitnesses[0]
+                self.select_trial(i, trial, fitnesses[0])
                 traj.extend(de_traj)
                 runtime.extend(de_runtime)
                 history.extend(de_history)
@@ -718,4 +1127,4 @@ class AsyncDE(DE):
         if verbose:
             print("\nRun complete!")
 
-        return (np.array(self.traj), np.array(self.runtime), np.array(self.history))
+        return (np.array(self.traj), np.array(self.runtime), self.history)
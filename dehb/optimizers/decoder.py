@@ -0,0 +1,135 @@
+import numpy as np
+
+
+class ConfigDecoder():
+    '''Maps vectors in the domain [0, 1] to configurations of a ConfigSpace
+
+    Everything the mapping needs per hyperparameter (the bins of ordinal and categorical
+    hyperparameters, the rescaling bounds, the log transformation and the integer rounding) is
+    computed once on creation. Decoding then neither samples from nor walks the ConfigSpace, and a
+    whole population can be decoded in one call.
+    '''
+    def __init__(self, cs):
+        # imported here, such that importing the package does not pay for ConfigSpace
+        import ConfigSpace
+        from ConfigSpace.util import deactivate_inactive_hyperparameters
+        self._configuration = ConfigSpace.Configuration
+        self._deactivate = deactivate_inactive_hyperparameters
+
+        self.cs = cs
+        self.hyperparameters = self.cs.get_hyperparameters()
+        self.names = [hyper.name for hyper in self.hyperparameters]
+        self.dimensions = len(self.names)
+        self.has_conditions = len(self.cs.get_conditions()) > 0
+
+        # ordinal & categorical hyperparameters: bin edges and the values they map to
+        self._choice_idx = []
+        self._choice_bins = []
+        self._choice_values = []
+        # UniformFloatHyperparameter & UniformIntegerHyperparameter: rescaling constants
+        self._numeric_idx = []
+        lowers, uppers, logs, integers = [], [], [], []
+
+        for i, hyper in enumerate(self.hyperparameters):
+            if type(hyper) == ConfigSpace.OrdinalHyperparameter:
+                values = hyper.sequence
+            elif type(hyper) == ConfigSpace.CategoricalHyperparameter:
+                values = hyper.choices
+            else:
+                self._numeric_idx.append(i)
+                lowers.append(hyper.lower)
+                uppers.append(hyper.upper)
+                logs.append(hyper.log)
+                integers.append(type(hyper) == ConfigSpace.UniformIntegerHyperparameter)
+                continue
+            self._choice_idx.append(i)
+            self._choice_bins.append(np.arange(start=0, stop=1, step=1/len(values)))
+            choices = np.empty(len(values), dtype=object)
+            choices[:] = list(values)
+            self._choice_values.append(choices)
+
+        self._numeric_idx = np.array(self._numeric_idx, dtype=int)
+        self._lower = np.array(lowers, dtype=float)
+        self._upper = np.array(uppers, dtype=float)
+        self._log = np.array(logs, dtype=bool)
+        self._integer = np.array(integers, dtype=bool)
+        # the log-scaled hyperparameters are rescaled linearly in the log space
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self._offset = np.where(self._log, np.log(self._lower), self._lower)
+            self._range = np.where(self._log, np.log(self._upper), self._upper) - self._offset
+
+    @staticmethod
+    def _bin_index(bins, values, n_choices):
+        # index of the last bin edge that is <= the vector value
+        bin_idx = np.searchsorted(bins, values, side='right') - 1
+        return np.clip(bin_idx, a_min=0, a_max=n_choices - 1)
+
+    def _rescale(self, vectors):
+        # values of the numeric hyperparameters, in their ranges
+        numeric = self._offset + self._range * vectors[:, self._numeric_idx]
+        numeric[:, self._log] = np.exp(numeric[:, self._log])
+        return np.clip(numeric, a_min=self._lower, a_max=self._upper)
+
+    def decode(self, vectors):
+        '''Decodes a 2D array of vectors into a list of values per hyperparameter (column)
+        '''
+        vectors = np.asarray(vectors, dtype=float).reshape(-1, self.dimensions)
+        columns = [None] * self.dimensions
+
+        for i, bins, values in zip(self._choice_idx, self._choice_bins, self._choice_values):
+            columns[i] = values[self._bin_index(bins, vectors[:, i], len(values))].tolist()
+
+        if len(self._numeric_idx) > 0:
+            numeric = self._rescale(vectors)
+            for j, i in enumerate(self._numeric_idx):
+                if self._integer[j]:
+                    # converting to discrete (int)
+                    columns[i] = np.round(numeric[:, j]).astype(int).tolist()
+                else:
+                    columns[i] = numeric[:, j].tolist()
+        return columns
+
+    def discretize(self, vectors):
+        '''Maps a 2D array of vectors to an array with equal rows for vectors that decode equally
+
+        Ordinal and categorical values are replaced by the index of the choice and integer values
+        are rounded, without creating the configurations. Conditions are not taken into account.
+        '''
+        vectors = np.asarray(vectors, dtype=float).reshape(-1, self.dimensions)
+        discrete = np.empty_like(vectors)
+
+        for i, bins, values in zip(self._choice_idx, self._choice_bins, self._choice_values):
+            discrete[:, i] = self._bin_index(bins, vectors[:, i], len(values))
+
+        if len(self._numeric_idx) > 0:
+            numeric = self._rescale(vectors)
+            numeric[:, self._integer] = np.round(numeric[:, self._integer])
+            discrete[:, self._numeric_idx] = numeric
+        return discrete
+
+    def to_dict(self, vector):
+        '''Converts a single vector to a dict of hyperparameter names and values
+        '''
+        return self.to_dicts(vector)[0]
+
+    def to_dicts(self, vectors):
+        '''Converts a population of vectors to a list of dicts
+        '''
+        columns = self.decode(vectors)
+        return [dict(zip(self.names, values)) for values in zip(*columns)]
+
+    def _dict_to_configuration(self, values):
+        if self.has_conditions:
+            # hyperparameters made inactive by the decoded values are dropped
+            return self._deactivate(values, self.cs)
+        return self._configuration(self.cs, values=values)
+
+    def to_configuration(self, vector):
+        '''Converts a single vector to a ConfigSpace Configuration
+        '''
+        return self._dict_to_configuration(self.to_dict(vector))
+
+    def to_configurations(self, vectors):
+        '''Converts a population of vectors to a list of ConfigSpace Configurations
+        '''
+        return [self._dict_to_configuration(values) for values in self.to_dicts(vectors)]
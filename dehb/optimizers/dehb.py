@@ -1,13 +1,23 @@
+import time
 import numpy as np
 
 from .de import DE, AsyncDE
+from .cache import get_cache
+from .continuation import get_continuation, trial_id
+from .decoder import ConfigDecoder
+from .executor import get_executor
+from .history import History
+from .checkpoint import Checkpointer, get_subpop_state, set_subpop_state
+from .profiler import get_profiler, profiled
 
 
 class DEHBBase():
     def __init__(self, cs=None, f=None, dimensions=None, mutation_factor=None,
                  crossover_prob=None, strategy=None, min_budget=None,
                  max_budget=None, eta=None, min_clip=None, max_clip=None, configspace=True,
-                 boundary_fix_type='random', max_age=np.inf, **kwargs):
+                 boundary_fix_type='random', max_age=np.inf, vectorized=False,
+                 batch_objective=False, seed=None, cache=None, continuation=None, profiler=None,
+                 **kwargs):
         # Benchmark related variables
         self.cs = cs
         if dimensions is None and self.cs is not None:
@@ -23,6 +33,18 @@ class DEHBBase():
         self.configspace = configspace
         self.fix_type = boundary_fix_type
         self.max_age = max_age
+        self.vectorized = vectorized
+        self.batch_objective = batch_objective
+        # a single vector to configuration decoder is shared by all subpopulations
+        self.decoder = None
+        if self.cs is not None and self.configspace:
+            self.decoder = ConfigDecoder(self.cs)
+        # a single evaluation cache is shared by all subpopulations and brackets
+        self.cache = get_cache(cache)
+        # checkpoints of the objective function that promoted configurations are continued from
+        self.continuation = get_continuation(continuation)
+        # a single profiler times the phases of DEHB and of all subpopulations
+        self.profiler = get_profiler(profiler)
         self.de_params = {
             "mutation_factor": self.mutation_factor,
             "crossover_prob": self.crossover_prob,
@@ -32,6 +54,12 @@ class DEHBBase():
             "max_age": self.max_age,
             "cs": self.cs,
             "dimensions": self.dimensions,
+            "vectorized": self.vectorized,
+            "batch_objective": self.batch_objective,
+            "decoder": self.decoder,
+            "cache": self.cache,
+            "continuation": self.continuation,
+            "profiler": self.profiler,
             "f": f
         }
 
@@ -61,7 +89,28 @@ class DEHBBase():
         self.fitness = None
         self.inc_score = np.inf
         self.inc_config = None
-        self.history = []
+        self.history = History()
+        self.iteration_counter = -1
+        self._checkpointer = None
+
+        # Random number generation
+        self.seed = seed
+        self._init_rng()
+
+    def _init_rng(self):
+        '''Creates the SeedSequence that the streams of the subpopulations are spawned from
+
+        If no seed was passed, it is drawn from the global numpy random state at every reset,
+        such that np.random.seed() before a run keeps making the run reproducible.
+        '''
+        seed = np.random.randint(2 ** 31) if self.seed is None else self.seed
+        self._seed_seq = np.random.SeedSequence(seed)
+        self.rng = np.random.default_rng(self._seed_seq.spawn(1)[0])
+
+    def _spawn_rng(self):
+        '''Returns a Generator for an independent stream, e.g., for a subpopulation
+        '''
+        return np.random.default_rng(self._seed_seq.spawn(1)[0])
 
     def reset(self):
         self.inc_score = np.inf
@@ -70,10 +119,17 @@ class DEHBBase():
         self.fitness = None
         self.traj = []
         self.runtime = []
-        self.history = []
+        self.history = History()
+        self.iteration_counter = -1
+        if self.cache is not None:
+            # evaluations of a previous run are not reused by the next
+            self.cache.clear()
+        if self.continuation is not None:
+            self.continuation.clear()
+        self._init_rng()
 
     def init_population(self, pop_size=10):
-        population = np.random.uniform(low=0.0, high=1.0, size=(pop_size, self.dimensions))
+        population = self.rng.uniform(low=0.0, high=1.0, size=(pop_size, self.dimensions))
         return population
 
     def get_next_iteration(self, iteration):
@@ -114,10 +170,87 @@ class DEHBBase():
     def f_objective(self):
         raise NotImplementedError("The function needs to be defined in the sub class.")
 
+    def _get_checkpoint_state(self):
+        '''Returns the state of the run to be checkpointed, except for the history
+        '''
+        return {
+            "inc_score": self.inc_score,
+            "inc_config": self.inc_config,
+            "traj": list(self.traj),
+            "runtime": list(self.runtime),
+            "iteration_counter": self.iteration_counter,
+            "de": get_subpop_state(self.de),
+            "rng": self.rng,
+            "seed_seq": self._seed_seq,
+            "continuation": None if self.continuation is None else self.continuation.budgets
+        }
+
+    def _set_checkpoint_state(self, state):
+        '''Restores the state returned by _get_checkpoint_state()
+        '''
+        self.inc_score = state["inc_score"]
+        self.inc_config = state["inc_config"]
+        self.traj = state["traj"]
+        self.runtime = state["runtime"]
+        self.iteration_counter = state["iteration_counter"]
+        set_subpop_state(self.de, state["de"])
+        self.rng = state["rng"]
+        self._seed_seq = state["seed_seq"]
+        if self.continuation is not None and state.get("continuation") is not None:
+            self.continuation.budgets = state["continuation"]
+
+    def _get_checkpointer(self, path):
+        if self._checkpointer is None or self._checkpointer.path != path:
+            self._checkpointer = Checkpointer(path)
+        return self._checkpointer
+
+    @profiled("serialization")
+    def save_checkpoint(self, path):
+        '''Saves the state of the run to the directory path
+
+        Only the function evaluations made since the last checkpoint to the same path are written.
+        '''
+        self._get_checkpointer(path).save(self._get_checkpoint_state(), self.history)
+
+    def load_checkpoint(self, path):
+        '''Restores the state of a run saved to the directory path
+
+        The object needs to be created with the same parameters as the one that saved the run.
+        Returns False if there is no checkpoint in path.
+        '''
+        checkpointer = self._get_checkpointer(path)
+        if not checkpointer.exists():
+            return False
+        state, self.history = checkpointer.load()
+        self._set_checkpoint_state(state)
+        return True
+
     def run(self):
         raise NotImplementedError("The function needs to be defined in the sub class.")
 
 
+class _AskTellRung():
+    '''Jobs of the SH rung of DEHB being evaluated through ask() and tell()
+
+    step is how the subpopulation of the rung is evaluated, see DEHB._prepare_rung().
+    '''
+    def __init__(self, iteration, i_sh, num_configs, budgets, step, alt_population, n_jobs):
+        self.iteration = iteration
+        self.i_sh = i_sh
+        self.num_configs = num_configs
+        self.budgets = budgets
+        self.budget = budgets[i_sh]
+        self.step = step
+        self.alt_population = alt_population
+        self.n_jobs = n_jobs
+        self.n_asked = 0
+        self.n_told = 0
+        self.running = {}  # index of the target and vector of the jobs not told, by job ID
+        self.dropped = []  # those of the jobs dropped by close(), to be asked for again
+        self.trials = None  # created all at once by the 'deferred' strategy
+        self.results = {}  # fitness and cost of the 'deferred' trials, by index
+
+
 class DEHB(DEHBBase):
     '''Differential Evolution Hyperband
 
@@ -134,20 +267,57 @@ class DEHB(DEHBBase):
         'worst' - the worst individual will be chosen as the target
             the winner of the selection step is included in the population right away
         {immediate, worst, random} implement Asynchronous-DE
+    executor : str or concurrent.futures.Executor
+        None - evaluations run one after the other in the calling process
+        'serial', 'thread', 'process' - see executor.get_executor()
+        The independent evaluations of a population (initialization, promotions and the
+        selection of the 'deferred' strategy) are dispatched through the executor.
+    n_workers : int
+        Number of threads or processes used by the 'thread' and 'process' executors
+
+    Instead of run(), which calls f, the optimisation can be driven with ask() and tell(),
+    till close() ends the ask/tell session.
     '''
-    def __init__(self, async_strategy='immediate', **kwargs):
+    def __init__(self, async_strategy='immediate', executor=None, n_workers=1, **kwargs):
         super().__init__(**kwargs)
         self.max_age = np.inf
         self.min_clip = 0
         self.async_strategy = async_strategy
         self.de_params['async_strategy'] = self.async_strategy
 
+        self.n_workers = n_workers
+        self.executor = None
+        self._owns_executor = False
+        if executor is not None:
+            self.executor = get_executor(executor, n_workers=self.n_workers)
+            # executors passed as instances are left for the caller to shut down
+            self._owns_executor = self.executor is not executor
+        self.de_params['executor'] = self.executor
+        self._session = False  # True from the first call to ask() till close()
+        self._rung = None  # _AskTellRung that ask() hands out the jobs of
+        self._job_counter = 0
+
         self.reset()
         self._get_pop_sizes()
 
+    def __del__(self):
+        '''Ensures that the pool of workers created by DEHB is shut down
+        '''
+        if getattr(self, "_owns_executor", False) and self.executor is not None:
+            self.executor.shutdown(wait=False)
+
     def reset(self):
+        self._check_no_session("reset")
         super().reset()
         self.de = {}
+        self._rung = None
+
+    def _check_no_session(self, method):
+        '''Raises if an ask/tell session is active, whose state the method would discard
+        '''
+        if self._session:
+            raise RuntimeError("{}() can not be called while an ask/tell session is active, "
+                               "call close() first".format(method))
 
     def _get_pop_sizes(self):
         '''Determines maximum pop size for each budget
@@ -163,7 +333,8 @@ class DEHB(DEHBBase):
         # List of DE objects corresponding to the budgets (fidelities)
         self.de = {}
         for i, b in enumerate(self._max_pop_size.keys()):
-            self.de[b] = AsyncDE(**self.de_params, budget=b, pop_size=self._max_pop_size[b])
+            self.de[b] = AsyncDE(**self.de_params, budget=b, pop_size=self._max_pop_size[b],
+                                 rng=self._spawn_rng())
 
     def _concat_pops(self, exclude_budget=None):
         '''Concatenates all subpopulations
@@ -181,11 +352,394 @@ class DEHB(DEHBBase):
         self.inc_config = self.de[budget].inc_config
         self.traj.extend(traj)
         self.runtime.extend(runtime)
-        self.history.extend(history)
+        self.history.extend(history, bracket=self.iteration_counter)
+
+    def ask(self, n=1):
+        '''Returns up to n job records to be evaluated and reported back with tell()
+
+        The jobs are those of the SH rung being evaluated: the trials of a DE generation are
+        created when asked for, from the subpopulation as updated by the results told so far.
+        As Successive Halving promotes configurations only once all results of a rung are in,
+        fewer than n jobs are returned at the end of a rung, none if all jobs of the rung
+        were handed out and need to be told first. The first call starts an ask/tell session
+        from the state left by run(), or from scratch.
+
+        Each job record is a dict with the keys 'job_id', 'config' (the vector in [0, 1]),
+        'configuration' (the decoded configuration to evaluate), 'budget', 'bracket_id' and
+        'parent_id' (the index of the individual in the subpopulation of the budget). If a
+        ContinuationStore is set, the records also hold the 'trial_id' and the
+        'previous_budget' of the continuation protocol.
+        '''
+        if not self._session:
+            self._session = True
+            if len(self.de) == 0:
+                self._init_subpop()
+        jobs = []
+        while len(jobs) < n:
+            if self._rung is None:
+                self._rung = self._start_rung(self.iteration_counter + 1, 0)
+            if self._rung.n_asked == self._rung.n_jobs and len(self._rung.dropped) == 0:
+                break
+            jobs.append(self._ask_job())
+        return jobs
+
+    def _ask_job(self):
+        '''Creates the next job of the rung being evaluated
+        '''
+        rung = self._rung
+        de = self.de[rung.budget]
+        if len(rung.dropped) > 0:
+            # asked for before close() and not told
+            i, x = rung.dropped.pop(0)
+        else:
+            i, x = self._next_target(rung), None
+            if rung.step != 'evolve':
+                x = de.population[i]
+            elif self.async_strategy == 'deferred':
+                x = rung.trials[i]
+            else:
+                x = de.generate_trial(i, best=self.inc_config, alt_pop=rung.alt_population)
+            x = np.array(x)
+            rung.n_asked += 1
+        job = {
+            "job_id": self._job_counter,
+            "config": x.copy(),
+            "configuration": de._vectors_to_configs(x.reshape(1, -1))[0],
+            "budget": rung.budget,
+            "parent_id": int(i),
+            "bracket_id": rung.iteration
+        }
+        if de.continuation is not None:
+            job["trial_id"] = trial_id(x)
+            job["previous_budget"] = de.continuation.previous_budget(job["trial_id"],
+                                                                     rung.budget)
+        rung.running[self._job_counter] = (i, x)
+        self._job_counter += 1
+        self.profiler.event("evaluation_start", config=x, budget=rung.budget)
+        return job
+
+    def _next_target(self, rung):
+        '''Returns the index of the individual that the next job of the rung evaluates or is
+        the target of
+        '''
+        de = self.de[rung.budget]
+        if rung.step != 'evolve' or self.async_strategy in ['deferred', 'immediate']:
+            return rung.n_asked
+        if self.async_strategy == 'random':
+            return de.rng.integers(de.pop_size)
+        # async_strategy == 'worst': the worst individual that is not the target of a job running
+        targets = [target for target, _ in rung.running.values()]
+        return next(i for i in np.argsort(-de.fitness) if i not in targets)
+
+    def tell(self, job, fitness, cost):
+        '''Reports the fitness and cost of a job record returned by ask()
+
+        Carries out the DE selection of the job's trial, or of the whole generation for the
+        'deferred' strategy once all its jobs are told, and the Successive Halving book-keeping.
+        '''
+        rung = self._rung
+        if rung is None or job["job_id"] not in rung.running:
+            raise ValueError("Job {} is not a job of the rung being evaluated that was asked "
+                             "for and not told yet.".format(job["job_id"]))
+        i, x = rung.running.pop(job["job_id"])
+        budget = rung.budget
+        de = self.de[budget]
+        self.profiler.event("evaluation_end", config=x, budget=budget, fitness=fitness,
+                            cost=cost)
+        if de.continuation is not None:
+            de.continuation.record(trial_id(x), budget)
+        if de.cache is not None:
+            de.cache.put(de._cache_key(x, budget), fitness, cost)
+        if rung.step == 'evolve' and self.async_strategy == 'deferred':
+            rung.results[i] = (fitness, cost)
+        else:
+            # the updates of init_eval_pop(), eval_pop() and evolve_generation() for one job
+            if rung.step != 'evolve':
+                de.fitness[i] = fitness
+            if fitness < de.inc_score or (rung.step != 'init' and fitness <= de.inc_score):
+                de.inc_score = fitness
+                de.inc_config = x
+            if rung.step == 'evolve':
+                de.select_trial(i, x, fitness)
+            history = History(self.dimensions)
+            history.append(x, fitness, budget, cost)
+            self._update_trackers(de.inc_score, de.inc_config, [de.inc_score], [cost], history,
+                                  budget)
+        rung.n_told += 1
+        if rung.n_told == rung.n_jobs:
+            self._finish_rung()
+
+    def _start_rung(self, iteration, i_sh, num_configs=None, budgets=None, alt_population=None):
+        '''Prepares the rung i_sh of the SH bracket of index iteration for ask()
+        '''
+        if i_sh == 0:
+            num_configs, budgets = self._start_bracket(iteration)
+        budget = budgets[i_sh]
+        step, alt_population = self._prepare_rung(iteration, i_sh, budget, alt_population)
+        de = self.de[budget]
+        rung = _AskTellRung(iteration, i_sh, num_configs, budgets, step, alt_population,
+                            n_jobs=de.pop_size)
+        if step == 'init':
+            de.init_eval_pop(budget, eval=False)
+        elif step == 'evolve' and self.async_strategy == 'deferred':
+            rung.trials = de.generate_deferred_trials(best=self.inc_config,
+                                                      alt_pop=alt_population)
+        return rung
+
+    def _finish_rung(self):
+        '''Promotes the configurations of the rung all results of which were told
+        '''
+        rung = self._rung
+        de = self.de[rung.budget]
+        if rung.step == 'evolve' and self.async_strategy == 'deferred':
+            fitness, cost = zip(*[rung.results[i] for i in range(rung.n_jobs)])
+            de_traj, de_runtime, de_history = de._select(rung.trials, fitness, cost, rung.budget)
+            self._update_trackers(de.inc_score, de.inc_config, de_traj, de_runtime, de_history,
+                                  rung.budget)
+        alt_population = self._promote(rung.iteration, rung.i_sh, rung.num_configs, rung.budgets)
+        if rung.i_sh + 1 < len(rung.budgets):
+            self._rung = self._start_rung(rung.iteration, rung.i_sh + 1, rung.num_configs,
+                                          rung.budgets, alt_population)
+        else:
+            self.profiler.event("bracket_end", bracket_id=rung.iteration)
+            # the next bracket is started by the next call to ask()
+            self._rung = None
 
-    def run(self, iterations=1, verbose=False, debug=False, reset=True):
+    def close(self):
+        '''Ends the ask/tell session
+
+        The jobs handed out and not told are dropped, such that run() and reset() can be called
+        again. A new session hands them out again and continues the bracket, unless run() or
+        reset() were called meanwhile. The history of the session is kept till the next reset.
+        '''
+        self._session = False
+        if self._rung is not None:
+            self._rung.dropped.extend(self._rung.running.values())
+            self._rung.running = {}
+
+    def _start_bracket(self, iteration, debug=False):
+        '''Starts the SH bracket of index iteration and returns its numbers of configurations
+        and budgets
+        '''
+        self.profiler.count("brackets")
+        self.iteration_counter = iteration
+        # Retrieves budgets and number of configurations for the SH bracket
+        num_configs, budgets = self.get_next_iteration(iteration=iteration)
+        self.profiler.event("bracket_start", bracket_id=iteration, budgets=budgets,
+                            n_configs=num_configs)
+
+        # Sets budget and population size for first iteration in the SH bracket
+        pop_size = num_configs[0]
+        budget = budgets[0]
+        self.de[budget].pop_size = pop_size
+
+        if iteration > 0 and iteration < self.max_SH_iter and \
+                len(self.de[budget].population) < self._max_pop_size[budget]:
+            # the previous iteration should have filled up the population slots
+            # for certain budget spacings, this slot may be empty by one or two slots
+            filler = self._max_pop_size[budget] - len(self.de[budget].population)
+            if debug:
+                print("Adding {} individual(s) for the budget {}".format(filler, budget))
+            self.de[budget].population, self.de[budget].fitness, self.de[budget].age = \
+                self.de[budget]._add_random_population(pop_size=filler)
+        return num_configs, budgets
+
+    def _prepare_rung(self, iteration, i_sh, budget, alt_population=None, debug=False):
+        '''Returns how the subpopulation of the rung i_sh is evaluated, and the population that
+        its mutants are created from
+
+        'init' - a new population is created and evaluated (first rung of the first bracket)
+        'eval' - the individuals promoted from the lower rung are evaluated
+        'evolve' - the subpopulation is evolved for one generation
+        '''
+        # warmstart DE incumbents with global incumbents
+        ## significant for iteration==0 when DEHB optimisation is continued
+        self.de[budget].inc_score = self.inc_score
+        self.de[budget].inc_config = self.inc_config
+
+        if iteration == 0:  # first HB bracket's first iteration (first SH bracket)
+            # the first rung is initialized and evaluated, the others are filled by promotions
+            return ('init' if i_sh == 0 else 'eval'), alt_population
+
+        if iteration < self.max_SH_iter:  # first HB bracket, second iteration onwards
+            if i_sh > 0 and alt_population is None:
+                if debug:
+                    print("Evaluating {} on {}".format(self.de[budget].pop_size, budget))
+                return 'eval', alt_population
+            if debug:
+                print("Evolving {} on {}".format(self.de[budget].pop_size, budget))
+            return 'evolve', alt_population
+
+        # second HB bracket onwards (DEHB brackets)
+        if debug:
+            print("Evolving {} for {}".format(self.de[budget].pop_size, budget))
+        # when the size of mutation candidate population is lesser than that required
+        ## for the chosen mutation strategy, new individuals of infinite fitness are
+        ## introduced by creating mutants from the total global population formed
+        ## by concatenating all the subpopulations associated with all the budgets
+        if alt_population is not None and \
+                len(alt_population) < self.de[budget]._min_pop_size:
+            filler = self.de[budget]._min_pop_size - len(alt_population) + 1
+            if debug:
+                print("Adding {} individuals for mutation on "
+                      "budget {}".format(filler, budget))
+            new_pop = \
+                self.de[budget]._init_mutant_population(filler, self._concat_pops(),
+                                                        target=None,
+                                                        best=self.inc_config)
+            alt_population = np.concatenate((alt_population, new_pop))
+            if debug:
+                print("Mutation population size: {}".format(filler, budget))
+        return 'evolve', alt_population
+
+    def _promote(self, iteration, i_sh, num_configs, budgets):
+        '''Fills the subpopulation of the rung after i_sh with the top individuals of rung i_sh
+
+        Returns the population that the mutants of the next rung are created from, None if they
+        are created from its own subpopulation.
+        '''
+        if i_sh == len(budgets) - 1:  # final SH iteration
+            return None
+        pop_size = num_configs[i_sh + 1]
+        budget = budgets[i_sh]
+        next_budget = budgets[i_sh + 1]
+        # finding the top individuals for the pop_size required
+        rank = np.sort(np.argsort(self.de[budget].fitness)[:pop_size])
+
+        if iteration == 0:
+            # initializing the required pop_size for the higher budget populations
+            ## remaining population slots to be filled in subsequent iterations
+            self.de[next_budget].population = self.de[budget].population[rank]
+            self.de[next_budget].fitness = self.de[budget].fitness[rank]
+            self.de[next_budget].age = self.de[budget].age[rank]
+            self.de[next_budget].pop_size = pop_size
+            return None
+
+        if iteration < self.max_SH_iter:
+            # checking if slots available
+            if len(self.de[next_budget].population) < self._max_pop_size[next_budget]:
+                # appending top individuals from the lower budget as part of next_budget
+                ## population of pop_size is appended to the front so they are evaluated
+                ## in the next iteration -- if size exceeds, weakest individuals
+                ## are dropped from the current population
+                required = self._max_pop_size[next_budget] - \
+                    len(self.de[next_budget].population)
+                extra = required - pop_size
+                if extra < 0:
+                    # removing weakest individuals from current population
+                    extra = np.abs(extra)
+                    top_rank = \
+                        np.sort(np.argsort(self.de[next_budget].fitness)[:-extra])
+                    self.de[next_budget].population = \
+                        self.de[next_budget].population[top_rank]
+                    self.de[next_budget].fitness = \
+                        self.de[next_budget].fitness[top_rank]
+                    self.de[next_budget].age = \
+                        self.de[next_budget].age[top_rank]
+                self.de[next_budget].population = \
+                    np.concatenate((self.de[budget].population[rank],
+                                    self.de[next_budget].population))
+                # the individuals are evaluated on a lower budget
+                ## for a fair comparison during selection, all individuals should be
+                ## evaluated on the same budget level
+                ## the fitness values are set as infinity to not waste function
+                ## evaluations -- this is not a problem since the individuals will
+                ## participate in mutation and the new trial will replace it
+                self.de[next_budget].fitness = \
+                    np.concatenate((np.array([np.inf] * pop_size),
+                                    self.de[next_budget].fitness))
+                self.de[next_budget].age = \
+                    np.concatenate((np.array([self.max_age] * pop_size),
+                                    self.de[next_budget].age))
+                alt_population = None
+            else:
+                # the top individuals from the current budget are the candidates for
+                ## mutation in the next higher budget
+                alt_population = self.de[budget].population[rank]
+            self.de[next_budget].pop_size = pop_size
+            return alt_population
+
+        # the top individuals from the current 'budget' serve as mutation
+        ## candidates for the DE evolution in the higher next_budget
+        alt_population = self.de[budget].population[rank]
+        self.de[next_budget].pop_size = pop_size
+        budget = next_budget
+        if self.async_strategy in ['deferred', 'immediate'] and \
+                pop_size < len(self.de[budget].population):
+            # reordering to have the top individuals in front
+            rank_include = np.sort(np.argsort(self.de[budget].fitness)[:pop_size])
+            rank_exclude = list(set(np.arange(len(self.de[budget].population))) - \
+                                set(rank_include))
+            self.de[budget].population = \
+                np.concatenate((self.de[budget].population[rank_include],
+                                self.de[budget].population[rank_exclude]))
+            self.de[budget].fitness = \
+                np.concatenate((self.de[budget].fitness[rank_include],
+                                self.de[budget].fitness[rank_exclude]))
+            self.de[budget].age = \
+                np.concatenate((self.de[budget].age[rank_include],
+                                self.de[budget].age[rank_exclude]))
+        return alt_population
+
+    def _run_bracket(self, iteration, start=0, verbose=False, debug=False):
+        '''Runs the SH bracket of index iteration, start is the index of the first bracket run
+        '''
+        num_configs, budgets = self._start_bracket(iteration, debug=debug)
+        if verbose:
+            print('Iteration #{:>3}\n{}'.format(iteration - start, '-' * 15))
+            print(num_configs, budgets, self.inc_score)
+
+        alt_population = None
+        for i_sh, budget in enumerate(budgets):
+            step, alt_population = self._prepare_rung(iteration, i_sh, budget, alt_population,
+                                                      debug=debug)
+            if step == 'init':
+                # initializes population and evaluates them on the 'budget'
+                # evaluations are counted as function evaluations for this iteration
+                de_traj, de_runtime, de_history = self.de[budget].init_eval_pop(budget)
+            elif step == 'eval':
+                # population is evaluated for pop_size on the 'budget'
+                # pop_size can be < len(population)
+                de_traj, de_runtime, de_history, _, _ = self.de[budget].eval_pop(budget=budget)
+            else:
+                # evolving subpopulation on 'budget' for one generation
+                ## the targets in the evolution process are the individuals themselves
+                ## the mutants are created from the alt_population that is passed
+                de_traj, de_runtime, de_history = \
+                    self.de[budget].evolve_generation(budget=budget, best=self.inc_config,
+                                                      alt_pop=alt_population)
+            self._update_trackers(self.de[budget].inc_score, self.de[budget].inc_config,
+                                  de_traj, de_runtime, de_history, budget)
+            alt_population = self._promote(iteration, i_sh, num_configs, budgets)
+        self.profiler.event("bracket_end", bracket_id=iteration)
+
+    def run(self, iterations=1, verbose=False, debug=False, reset=True, checkpoint_dir=None,
+            checkpoint_interval=0):
+        '''Runs DEHB for a number of SH brackets (iterations)
+
+        If checkpoint_dir is not None, the state of the run is saved to it after every SH bracket,
+        or at most once every checkpoint_interval seconds, and at the end of the run. If a
+        checkpoint exists in checkpoint_dir, the run resumes from it and runs the brackets
+        left of the total of 'iterations' brackets.
+        '''
+        self._check_no_session("run")
+        # a bracket left by an ask/tell session is not continued
+        self._rung = None
         # Book-keeping variables
-        if reset or len(self.traj) < 1:
+        if checkpoint_dir is not None and self._get_checkpointer(checkpoint_dir).exists():
+            if self.continuation is not None:
+                # the checkpoints of the objective function are part of the run resumed, their
+                # records are restored from the checkpoint instead of cleared with the files
+                self.continuation.budgets = {}
+            self.reset()
+            self._init_subpop()
+            self.load_checkpoint(checkpoint_dir)
+            start = self.iteration_counter + 1
+            # only the remaining brackets of the interrupted run are run
+            iterations = max(0, iterations - start)
+            if debug:
+                print("Resuming from bracket {} checkpointed in {}".format(start, checkpoint_dir))
+        elif reset or len(self.traj) < 1:
             if debug and not reset:
                 print("No existing run detected. Resetting and resuming clean.")
             self.reset()
@@ -196,215 +750,21 @@ class DEHB(DEHBBase):
         else:
             raise Exception("Unresolved starting point. Set reset=True to resume clean.")
 
+        last_checkpoint = time.time()
         # Performs DEHB iterations
         for iteration in range(start, iterations + start):
-            # Retrieves budgets and number of configurations for the SH bracket
-            num_configs, budgets = self.get_next_iteration(iteration=iteration)
-            if verbose:
-                print('Iteration #{:>3}\n{}'.format(iteration - start, '-' * 15))
-                print(num_configs, budgets, self.inc_score)
-
-            # Sets budget and population size for first iteration in the SH bracket
-            pop_size = num_configs[0]
-            budget = budgets[0]
-            self.de[budget].pop_size = pop_size
-
-            # Number of SH iterations in this DEHB iteration
-            num_SH_iters = len(budgets)
-
-            if iteration > 0 and iteration < self.max_SH_iter and \
-                    len(self.de[budget].population) < self._max_pop_size[budget]:
-                # the previous iteration should have filled up the population slots
-                # for certain budget spacings, this slot may be empty by one or two slots
-                filler = self._max_pop_size[budget] - len(self.de[budget].population)
-                if debug:
-                    print("Adding {} individual(s) for the budget {}".format(filler, budget))
-                self.de[budget].population, self.de[budget].fitness, self.de[budget].age = \
-                    self.de[budget]._add_random_population(pop_size=filler)
-
-            if iteration == 0:  # first HB bracket's first iteration (first SH bracket)
-                for i_sh in range(num_SH_iters):
-                    # warmstart DE incumbents with global incumbents
-                    ## significant for iteration==0 when DEHB optimisation is continued
-                    self.de[budget].inc_score = self.inc_score
-                    self.de[budget].inc_config = self.inc_config
-                    if i_sh == 0:
-                        # initializes population and evaluates them on the 'budget'
-                        # evaluations are counted as function evaluations for this iteration
-                        de_traj, de_runtime, de_history = self.de[budget].init_eval_pop(budget)
-                    else:
-                        # population is evaluated for pop_size on the 'budget'
-                        # pop_size can be < len(population)
-                        de_traj, de_runtime, de_history, _, _ = \
-                                self.de[budget].eval_pop(budget=budget)
-
-                    self._update_trackers(self.de[budget].inc_score, self.de[budget].inc_config,
-                                          de_traj, de_runtime, de_history, budget)
-
-                    if i_sh < (num_SH_iters - 1):  # when not final SH iteration
-                        pop_size = num_configs[i_sh + 1]
-                        next_budget = budgets[i_sh + 1]
-                        # finding the top individuals for the pop_size required
-                        rank = np.sort(np.argsort(self.de[budget].fitness)[:pop_size])
-
-                        # initializing the required pop_size for the higher budget populations
-                        ## remaining population slots to be filled in subsequent iterations
-                        self.de[next_budget].population = self.de[budget].population[rank]
-                        self.de[next_budget].fitness = self.de[budget].fitness[rank]
-                        self.de[next_budget].age = self.de[budget].age[rank]
-                        # print("Budget: ", next_budget, "Age: ", self.de[next_budget].age)
-                        self.de[next_budget].pop_size = pop_size
-
-                        # updating budget for next SH step
-                        budget = next_budget
-
-            elif iteration < self.max_SH_iter:  # first HB bracket, second iteration onwards
-                for i_sh in range(num_SH_iters):
-                    # warmstart DE incumbents with global incumbents
-                    self.de[budget].inc_score = self.inc_score
-                    self.de[budget].inc_config = self.inc_config
-
-                    if i_sh == 0:  # first iteration in the SH bracket
-                        if debug:
-                            print("Evolving {} on {}".format(self.de[budget].pop_size, budget))
-                        # evolves the subpopulation for 'budget' for one generation
-                        de_traj, de_runtime, de_history = \
-                                self.de[budget].evolve_generation(budget=budget,
-                                                                  best=self.inc_config)
-                    else:
-                        if alt_population is None:
-                            if debug:
-                                print("Evaluating {} on {}".format(self.de[budget].pop_size,
-                                                                    budget))
-                            de_traj, de_runtime, de_history, _, _ = \
-                                self.de[budget].eval_pop(budget=budget)
-                        else:
-                            if debug:
-                                print("Evolving {} on {}".format(self.de[budget].pop_size, budget))
-
-                            de_traj, de_runtime, de_history = \
-                                self.de[budget].evolve_generation(budget=budget,
-                                                                  best=self.inc_config,
-                                                                  alt_pop=alt_population)
-
-                    self._update_trackers(self.de[budget].inc_score, self.de[budget].inc_config,
-                                          de_traj, de_runtime, de_history, budget)
-
-                    if i_sh < (num_SH_iters - 1):  # when not final SH iteration
-                        pop_size = num_configs[i_sh + 1]
-                        next_budget = budgets[i_sh + 1]
-                        # finding the top individuals for the pop_size required
-                        rank = np.sort(np.argsort(self.de[budget].fitness)[:pop_size])
-                        # checking if slots available
-                        if len(self.de[next_budget].population) < self._max_pop_size[next_budget]:
-                            # appending top individuals from the lower budget as part of next_budget
-                            ## population of pop_size is appended to the front so they are evaluated
-                            ## in the next iteration -- if size exceeds, weakest individuals
-                            ## are dropped from the current population
-                            required = self._max_pop_size[next_budget] - \
-                                len(self.de[next_budget].population)
-                            extra = required - pop_size
-                            if extra < 0:
-                                # removing weakest individuals from current population
-                                extra = np.abs(extra)
-                                top_rank = \
-                                    np.sort(np.argsort(self.de[next_budget].fitness)[:-extra])
-                                self.de[next_budget].population = \
-                                    self.de[next_budget].population[top_rank]
-                                self.de[next_budget].fitness = \
-                                    self.de[next_budget].fitness[top_rank]
-                                self.de[next_budget].age = \
-                                    self.de[next_budget].age[top_rank]
-                            self.de[next_budget].population = \
-                                np.concatenate((self.de[budget].population[rank],
-                                                self.de[next_budget].population))
-                            # the individuals are evaluated on a lower budget
-                            ## for a fair comparison during selection, all individuals should be
-                            ## evaluated on the same budget level
-                            ## the fitness values are set as infinity to not waste function
-                            ## evaluations -- this is not a problem since the individuals will
-                            ## participate in mutation and the new trial will replace it
-                            self.de[next_budget].fitness = \
-                                np.concatenate((np.array([np.inf] * pop_size),
-                                                self.de[next_budget].fitness))
-                            self.de[next_budget].age = \
-                                np.concatenate((np.array([self.max_age] * pop_size),
-                                                self.de[next_budget].age))
-                            alt_population = None
-                        else:
-                            # the top individuals from the current budget are the candidates for
-                            ## mutation in the next higher budget
-                            alt_population = self.de[budget].population[rank]
-                        postlen = len(self.de[next_budget].population)
-                        self.de[next_budget].pop_size = pop_size
-                        budget = next_budget
+            with self.profiler.phase("bracket"):
+                self._run_bracket(iteration, start, verbose=verbose, debug=debug)
 
-            else:  # second HB bracket onwards (DEHB brackets)
-                alt_population = None
-                for i_sh in range(num_SH_iters):
-                    # warmstart DE with global incumbents
-                    self.de[budget].inc_score = self.inc_score
-                    self.de[budget].inc_config = self.inc_config
-                    if debug:
-                        print("Evolving {} for {}".format(self.de[budget].pop_size, budget))
-
-                    # when the size of mutation candidate population is lesser than that required
-                    ## for the chosen mutation strategy, new individuals of infinite fitness are
-                    ## introduced by creating mutants from the total global population formed
-                    ## by concatenating all the subpopulations associated with all the budgets
-                    if alt_population is not None and \
-                            len(alt_population) < self.de[budget]._min_pop_size:
-                        filler = self.de[budget]._min_pop_size - len(alt_population) + 1
-                        if debug:
-                            print("Adding {} individuals for mutation on "
-                                  "budget {}".format(filler, budget))
-                        new_pop = \
-                            self.de[budget]._init_mutant_population(filler, self._concat_pops(),
-                                                                    target=None,
-                                                                    best=self.inc_config)
-                        alt_population = np.concatenate((alt_population, new_pop))
-                        if debug:
-                            print("Mutation population size: {}".format(filler, budget))
-
-                    # evolving subpopulation on 'budget' for one generation
-                    ## the targets in the evolution process are the individuals themselves
-                    ## the mutants are created from the alt_population that is passed
-                    de_traj, de_runtime, de_history = \
-                            self.de[budget].evolve_generation(budget=budget,
-                                                              best=self.inc_config,
-                                                              alt_pop=alt_population)
-
-                    self._update_trackers(self.de[budget].inc_score, self.de[budget].inc_config,
-                                          de_traj, de_runtime, de_history, budget)
-
-                    if i_sh < (num_SH_iters - 1):  # when not final SH iteration
-                        pop_size = num_configs[i_sh + 1]
-                        next_budget = budgets[i_sh + 1]
-                        rank = np.sort(np.argsort(self.de[budget].fitness)[:pop_size])
-                        # the top individuals from the current 'budget' serve as mutation
-                        ## candidates for the DE evolution in the higher next_budget
-                        alt_population = self.de[budget].population[rank]
-                        self.de[next_budget].pop_size = pop_size
-
-                        budget = next_budget
-
-                        if self.async_strategy in ['deferred', 'immediate'] and \
-                                pop_size < len(self.de[budget].population):
-                            # reordering to have the top individuals in front
-                            rank_include = np.sort(np.argsort(self.de[budget].fitness)[:pop_size])
-                            rank_exclude = list(set(np.arange(len(self.de[budget].population))) - \
-                                                set(rank_include))
-                            self.de[budget].population = \
-                                np.concatenate((self.de[budget].population[rank_include],
-                                                self.de[budget].population[rank_exclude]))
-                            self.de[budget].fitness = \
-                                np.concatenate((self.de[budget].fitness[rank_include],
-                                                self.de[budget].fitness[rank_exclude]))
-                            self.de[budget].age = \
-                                np.concatenate((self.de[budget].age[rank_include],
-                                                self.de[budget].age[rank_exclude]))
+            # the end of a SH bracket is a consistent state to resume from
+            if checkpoint_dir is not None and \
+                    time.time() - last_checkpoint >= checkpoint_interval:
+                self.save_checkpoint(checkpoint_dir)
+                last_checkpoint = time.time()
 
-        return np.array(self.traj), np.array(self.runtime), np.array(self.history)
+        if checkpoint_dir is not None:
+            self.save_checkpoint(checkpoint_dir)
+        return np.array(self.traj), np.array(self.runtime), self.history
 
 
 class DEHBEncoding(DEHBBase):
@@ -479,7 +839,8 @@ class DEHBEncoding(DEHBBase):
         # List of DE objects corresponding to the budgets (fidelities)
         self.de = {}
         for i, b in enumerate(self._max_pop_size.keys()):
-            self.de[b] = AsyncDE(**self.de_params, budget=b, pop_size=self._max_pop_size[b])
+            self.de[b] = AsyncDE(**self.de_params, budget=b, pop_size=self._max_pop_size[b],
+                                 rng=self._spawn_rng())
 
     def _concat_pops(self, exclude_budget=None):
         '''Concatenates all subpopulations
@@ -720,7 +1081,7 @@ class DEHBEncoding(DEHBBase):
                                 np.concatenate((self.de[budget].age[rank_include],
                                                 self.de[budget].age[rank_exclude]))
 
-        return np.array(self.traj), np.array(self.runtime), np.array(self.history)
+        return np.array(self.traj), np.array(self.runtime), self.history
 
 
 class DEHB_0(DEHB):
@@ -0,0 +1,98 @@
+import concurrent.futures
+
+
+_installed = {}  # objects installed in this process, by name, see _install()
+
+
+def _install(name, factory):
+    """ Calls factory() and keeps the result in this process under name
+
+    Used to create large read-only objects, e.g. an objective function with its benchmark tables,
+    once per worker process, such that jobs refer to them by name instead of carrying them.
+    """
+    _installed[name] = factory()
+
+
+def _install_all(factories):
+    """ Installs the factories of a dict by name, the initializer of worker process pools
+    """
+    for name, factory in factories.items():
+        _install(name, factory)
+
+
+def _uninstall(name):
+    _installed.pop(name, None)
+
+
+def _constant(value):
+    """ Factory installing value as it is, see ProcessBackend.scatter()
+    """
+    return value
+
+
+class _Installed():
+    """ Reference to an object installed in the worker processes under name
+    """
+    def __init__(self, name):
+        self.name = name
+
+
+def _get_installed(name):
+    """ Returns the object installed under name in this process
+    """
+    try:
+        return _installed[name]
+    except KeyError:
+        raise KeyError("Nothing is installed as {} in this process, it needs to be installed "
+                       "through the worker backend first".format(name)) from None
+
+
+def _call_objective(f, config, budget=None, kwargs=None):
+    """ Calls the objective function on a decoded configuration.
+
+    kwargs are further keyword arguments, e.g., those of a ContinuationStore. Kept at the module
+    level so that it can be pickled and sent to worker processes.
+    """
+    kwargs = {} if kwargs is None else kwargs
+    if budget is not None:
+        return f(config, budget=budget, **kwargs)
+    return f(config, **kwargs)
+
+
+class SerialExecutor(concurrent.futures.Executor):
+    """ Executor that runs every submitted call right away in the calling thread
+    """
+    def submit(self, fn, *args, **kwargs):
+        future = concurrent.futures.Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+def get_executor(executor=None, n_workers=1):
+    """ Returns an executor to evaluate independent configurations with
+
+    Parameters
+    ----------
+    executor : str or concurrent.futures.Executor
+        'serial' - evaluations run one after the other in the calling process
+        'thread' - evaluations run on a pool of n_workers threads, suitable for objectives that
+            release the GIL or wait on I/O
+        'process' - evaluations run on a pool of n_workers processes, the objective function
+            needs to be picklable
+        An instance of concurrent.futures.Executor is returned as is.
+    n_workers : int
+        Number of threads or processes for the pool based executors
+    """
+    if isinstance(executor, concurrent.futures.Executor):
+        return executor
+    if executor is None or executor == 'serial':
+        return SerialExecutor()
+    if executor == 'thread':
+        return concurrent.futures.ThreadPoolExecutor(max_workers=n_workers)
+    if executor == 'process':
+        return concurrent.futures.ProcessPoolExecutor(max_workers=n_workers)
+    raise ValueError("{} is not a valid choice of executor, choose from "
+                     "{{'serial', 'thread', 'process'}}".format(executor))
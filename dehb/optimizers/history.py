@@ -0,0 +1,164 @@
+import time
+import numpy as np
+
+
+class History():
+    '''Columnar store of the function evaluations of a run
+
+    The configurations are rows of a float64 matrix while fitness, budget, cost, bracket ID and
+    timestamp are typed columns. The storage doubles in size when full, such that appending is
+    amortized constant time, and the properties return views on the filled part (no copies).
+
+    Indexing and iterating yield (config, fitness, budget) tuples, as the list of tuples this
+    store replaces did, with config being a view on the configuration's row.
+    '''
+    _columns = {
+        "fitness": np.float64,
+        "budgets": np.float64,
+        "costs": np.float64,
+        "brackets": np.int64,
+        "timestamps": np.float64
+    }
+
+    def __init__(self, dimensions=None, capacity=64):
+        self.dimensions = dimensions
+        self._size = 0
+        self._capacity = 0
+        self._configs = None
+        self._data = {}
+        if self.dimensions is not None:
+            self._allocate(capacity)
+
+    @classmethod
+    def from_arrays(cls, configs, fitness, budgets, costs, brackets, timestamps):
+        '''Creates a History holding the evaluations given column-wise
+        '''
+        configs = np.asarray(configs, dtype=np.float64)
+        history = cls(dimensions=configs.shape[1], capacity=len(configs))
+        history._configs[:] = configs
+        columns = [fitness, budgets, costs, brackets, timestamps]
+        for (name, dtype), column in zip(cls._columns.items(), columns):
+            history._data[name][:] = np.asarray(column, dtype=dtype)
+        history._size = len(configs)
+        return history
+
+    def _allocate(self, capacity):
+        '''Grows the storage to capacity, keeping the filled part
+        '''
+        configs = np.empty((capacity, self.dimensions), dtype=np.float64)
+        data = {name: np.empty(capacity, dtype=dtype) for name, dtype in self._columns.items()}
+        if self._size > 0:
+            configs[:self._size] = self._configs[:self._size]
+            for name in self._columns:
+                data[name][:self._size] = self._data[name][:self._size]
+        self._configs = configs
+        self._data = data
+        self._capacity = capacity
+
+    def _reserve(self, n):
+        '''Makes room for n more evaluations
+        '''
+        if self._size + n <= self._capacity:
+            return
+        self._allocate(max(2 * self._capacity, self._size + n, 64))
+
+    def append(self, config, fitness, budget, cost=np.nan, bracket=-1, timestamp=None):
+        '''Adds a single evaluation
+        '''
+        if self.dimensions is None:
+            self.dimensions = len(config)
+        self._reserve(1)
+        i = self._size
+        self._configs[i] = config
+        self._data["fitness"][i] = fitness
+        self._data["budgets"][i] = 0 if budget is None else budget
+        self._data["costs"][i] = cost
+        self._data["brackets"][i] = bracket
+        self._data["timestamps"][i] = time.time() if timestamp is None else timestamp
+        self._size += 1
+
+    def extend(self, history, bracket=None):
+        '''Adds all evaluations of another History or of an iterable of (config, fitness, budget)
+
+        If bracket is not None, it overrides the bracket ID of the evaluations added.
+        '''
+        if not isinstance(history, History):
+            for config, fitness, budget in history:
+                self.append(config, fitness, budget, bracket=-1 if bracket is None else bracket)
+            return
+        n = len(history)
+        if n == 0:
+            return
+        if self.dimensions is None:
+            self.dimensions = history.dimensions
+        self._reserve(n)
+        self._configs[self._size:self._size + n] = history.configs
+        for name in self._columns:
+            self._data[name][self._size:self._size + n] = history._data[name][:n]
+        if bracket is not None:
+            self._data["brackets"][self._size:self._size + n] = bracket
+        self._size += n
+
+    def _column(self, name):
+        if self._size == 0:
+            return np.empty(0, dtype=self._columns[name])
+        return self._data[name][:self._size]
+
+    @property
+    def configs(self):
+        if self._size == 0:
+            return np.empty((0, self.dimensions or 0), dtype=np.float64)
+        return self._configs[:self._size]
+
+    @property
+    def fitness(self):
+        return self._column("fitness")
+
+    @property
+    def budgets(self):
+        return self._column("budgets")
+
+    @property
+    def costs(self):
+        return self._column("costs")
+
+    @property
+    def brackets(self):
+        return self._column("brackets")
+
+    @property
+    def timestamps(self):
+        return self._column("timestamps")
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._size))]
+        if i < 0:
+            i += self._size
+        if not 0 <= i < self._size:
+            raise IndexError("History index out of range")
+        return (self._configs[i], float(self._data["fitness"][i]),
+                float(self._data["budgets"][i]))
+
+    def __iter__(self):
+        for i in range(self._size):
+            yield self[i]
+
+    def tolist(self):
+        '''Returns the evaluations as a list of (config list, fitness, budget) tuples
+        '''
+        return [(config.tolist(), fitness, budget)
+                for config, fitness, budget in zip(self.configs, self.fitness.tolist(),
+                                                   self.budgets.tolist())]
+
+    def __getstate__(self):
+        '''Pickles only the filled part of the storage
+        '''
+        d = dict(self.__dict__)
+        d["_configs"] = None if self._configs is None else self.configs.copy()
+        d["_data"] = {name: self._column(name).copy() for name in self._data}
+        d["_capacity"] = self._size if self._configs is not None else 0
+        return d
@@ -1,21 +1,107 @@
 import time
+import uuid
+import heapq
 import numpy as np
-from distributed import client, Client
 
 from .de import DE, AsyncDE
 from .dehb import DEHB, DEHBBase
+from .executor import SerialExecutor, _Installed, _call_objective, _get_installed
+from .backends import get_backend
+from .history import History
+from .runtime_model import RuntimeModel
+from .scheduling import ScheduleLog, get_job_ordering, oldest_first
+from .continuation import trial_id
+from .profiler import profiled
 
-import psutil
+
+def _resolve(worker_state):
+    """ Returns the worker state, looked up in the worker process if it was installed there
+    """
+    if isinstance(worker_state, _Installed):
+        return _get_installed(worker_state.name)
+    return worker_state
+
+
+def _decode_job(worker_state, config):
+    """ Returns the input of the objective function for a job's vector
+    """
+    decoder = worker_state['decoder']
+    x = config if decoder is None else decoder.to_configuration(config)
+    if worker_state['batch_objective']:
+        # batch objective functions are called on a list of one configuration
+        return [x]
+    return x
+
+
+def _job_result(worker_state, result, config, budget, parent_id, bracket_id):
+    """ Packs the objective function's output with the job's information
+    """
+    fitness, cost = result
+    if worker_state['batch_objective']:
+        fitness, cost = fitness[0], cost[0]
+    run_info = {
+        'fitness': fitness,
+        'cost': cost,
+        'config': config,
+        'budget': budget,
+        'parent_id': parent_id,
+        'bracket_id': bracket_id
+    }
+    return run_info
+
+
+def _decode_kwargs(worker_state, kwargs):
+    """ Returns the keyword arguments of the continuation protocol for the objective function
+    """
+    if kwargs is not None and worker_state['batch_objective']:
+        kwargs = dict(kwargs, trial_id=[kwargs['trial_id']],
+                      previous_budget=[kwargs['previous_budget']])
+    return kwargs
+
+
+def _objective(worker_state):
+    """ Returns the objective function, looked up in the worker process if it was installed
+    """
+    if worker_state['objective'] is not None:
+        return _get_installed(worker_state['objective'])
+    return worker_state['f']
+
+
+def _evaluate_job(worker_state, config, budget, parent_id, bracket_id, kwargs=None):
+    """ Runs the objective function for a single job, on a worker or in the master process
+
+    worker_state holds the objective function (or the name it is installed under in the
+    workers) and the decoder (with the ConfigSpace) and is sent to the workers only once, such
+    that the payload of a job is just the vector, budget and IDs.
+    kwargs are the trial ID, previous budget and store if a ContinuationStore is used.
+    """
+    worker_state = _resolve(worker_state)
+    x = _decode_job(worker_state, config)
+    result = _call_objective(_objective(worker_state), x, budget,
+                             _decode_kwargs(worker_state, kwargs))
+    return _job_result(worker_state, result, config, budget, parent_id, bracket_id)
+
+
+async def _evaluate_job_async(worker_state, config, budget, parent_id, bracket_id, kwargs=None):
+    """ Same as _evaluate_job for objective functions that are coroutine functions
+    """
+    worker_state = _resolve(worker_state)
+    x = _decode_job(worker_state, config)
+    result = await _call_objective(_objective(worker_state), x, budget,
+                                   _decode_kwargs(worker_state, kwargs))
+    return _job_result(worker_state, result, config, budget, parent_id, bracket_id)
 
 
 class SHBracketManager(object):
     """ Synchronous Successive Halving utilities
     """
-    def __init__(self, n_configs, budgets, bracket_id=None):
+    def __init__(self, n_configs, budgets, bracket_id=None, rng=None):
         assert len(n_configs) == len(budgets)
         self.n_configs = n_configs
         self.budgets = budgets
         self.bracket_id = bracket_id
+        # random stream that the configurations of this bracket are generated from
+        self.rng = rng
         self.sh_bracket = {}
         self._sh_bracket = {}
         self._config_map = {}
@@ -30,6 +116,25 @@ class SHBracketManager(object):
             self._sh_bracket[budget] = 0  # each retrieved job does +=1
         self.n_rungs = len(budgets)
         self.current_rung = 0
+        self._rungs = {budget: i for i, budget in enumerate(budgets)}
+        self._init_counters()
+
+    def _init_counters(self):
+        """ Sums up the jobs of all rungs still to be allocated and allocated but not completed
+
+        The counters are updated by register_job() and complete_job(), such that the state of
+        the bracket is known without going over its rungs.
+        """
+        self._n_pending = int(sum(self.sh_bracket.values()))
+        self._n_running = int(sum(self.n_configs)) - self._n_pending - \
+            int(sum(self._sh_bracket.values()))
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if "_n_pending" not in state:
+            # brackets checkpointed before the counters were kept
+            self._rungs = {budget: i for i, budget in enumerate(self.budgets)}
+            self._init_counters()
 
     def get_budget(self, rung=None):
         """ Returns the exact budget that rung is pointing to.
@@ -75,24 +180,28 @@ class SHBracketManager(object):
         to continue job and budget allocation without waiting for jobs to finish and return
         results necessarily. This feature can be leveraged to run brackets asynchronously.
         """
-        assert budget in self.budgets
+        assert budget in self._rungs
         assert self.sh_bracket[budget] > 0
         self.sh_bracket[budget] -= 1
+        self._n_pending -= 1
+        self._n_running += 1
         if not self._is_rung_pending(self.current_rung):
             # increment current rung if no jobs left in the rung
             self.current_rung = (self.current_rung + 1) % self.n_rungs
 
-    def complete_job(self, budget):
+    def complete_job(self, budget, config=None, fitness=None):
         """ Notifies the bracket that a job for a budget has been completed
 
         This function must be called when a config for a budget has finished evaluation to inform
         the Bracket Manager that no job needs to be waited for and the next rung can begin for the
-        synchronous Successive Halving case.
+        synchronous Successive Halving case. The config and its fitness are only used by
+        AsyncSHBracketManager.
         """
-        assert budget in self.budgets
-        _max_configs = self.n_configs[list(self.budgets).index(budget)]
+        assert budget in self._rungs
+        _max_configs = self.n_configs[self._rungs[budget]]
         assert self._sh_bracket[budget] < _max_configs
         self._sh_bracket[budget] += 1
+        self._n_running -= 1
 
     def _is_rung_waiting(self, rung):
         """ Returns True if at least one job is still pending/running and waits for results
@@ -118,113 +227,345 @@ class SHBracketManager(object):
         return False
 
     def is_bracket_done(self):
-        """ Returns True if all configs in all rungs in the bracket have been allocated
+        """ Returns True if all configs in all rungs in the bracket have been allocated and
+        their results retrieved
         """
-        return ~self.is_pending() and ~self.is_waiting()
+        return not self.is_pending() and not self.is_waiting()
 
     def is_pending(self):
         """ Returns True if any of the rungs/budgets have still a configuration to submit
         """
-        return np.any([self._is_rung_pending(i) > 0 for i, _ in enumerate(self.budgets)])
+        return self._n_pending > 0
 
     def is_waiting(self):
         """ Returns True if any of the rungs/budgets have a configuration pending/running
         """
-        return np.any([self._is_rung_waiting(i) > 0 for i, _ in enumerate(self.budgets)])
+        return self._n_running > 0
+
+    def is_ready(self):
+        """ Returns True if a job of the bracket can be scheduled: a configuration is left to
+        submit and no lower rung waits for results (synchronous Successive Halving)
+        """
+        return self.is_pending() and not self.previous_rung_waits()
+
+
+class AsyncSHBracketManager(SHBracketManager):
+    """ Asynchronous Successive Halving (ASHA) utilities
+
+    Instead of waiting for all results of a rung, a configuration is promoted to the next rung
+    as soon as it is among the best 1/eta of the results of its rung returned so far (or among
+    the best n_configs of the next rung once all results of its rung are in). Higher rungs are
+    served first, such that max-budget results arrive early.
+    """
+    def __init__(self, n_configs, budgets, bracket_id=None, rng=None, eta=3):
+        super().__init__(n_configs, budgets, bracket_id=bracket_id, rng=rng)
+        self.eta = eta
+        # the vectors and fitness values returned on each rung, and which were promoted
+        self._results = [[] for _ in budgets]
+        self._fitness = [[] for _ in budgets]
+        self._promoted = [set() for _ in budgets]
+
+    def _promotable(self, rung):
+        """ Returns the index of the best result of rung that can be promoted, None if there
+        is none
+        """
+        if rung + 1 >= self.n_rungs:
+            return None
+        n_results = len(self._fitness[rung])
+        k = n_results // self.eta
+        if n_results == self.n_configs[rung]:
+            # all results are in, the top ones fill the next rung as synchronous SH does
+            k = max(k, self.n_configs[rung + 1])
+        k = min(k, self.n_configs[rung + 1])
+        if k <= len(self._promoted[rung]):
+            return None
+        for idx in np.argsort(self._fitness[rung], kind="stable")[:k]:
+            if idx not in self._promoted[rung]:
+                return idx
+        return None
+
+    def get_next_job_budget(self):
+        """ Returns the budget of the highest rung that a configuration can be promoted to, else
+        the lowest budget if configurations are left to sample, else None
+        """
+        for rung in range(self.n_rungs - 1, 0, -1):
+            budget = self.budgets[rung]
+            if self.sh_bracket[budget] > 0 and self._promotable(rung - 1) is not None:
+                return budget
+        if self.sh_bracket[self.budgets[0]] > 0:
+            return self.budgets[0]
+        return None
+
+    def get_promotion(self, budget):
+        """ Returns the vector that the next job on budget promotes
+        """
+        rung = self._rungs[budget]
+        return self._results[rung - 1][self._promotable(rung - 1)]
+
+    def register_job(self, budget):
+        rung = self._rungs[budget]
+        if rung > 0:
+            # the job consumes the promotion that get_promotion() returned
+            self._promoted[rung - 1].add(self._promotable(rung - 1))
+        super().register_job(budget)
+
+    def complete_job(self, budget, config=None, fitness=None):
+        super().complete_job(budget)
+        rung = self._rungs[budget]
+        self._results[rung].append(config)
+        self._fitness[rung].append(fitness)
+
+    def previous_rung_waits(self):
+        return False
+
+    def is_ready(self):
+        return self.get_next_job_budget() is not None
 
 
 class PDEHB(DEHBBase):
     def __init__(self, cs=None, f=None, dimensions=None, mutation_factor=0.5,
                  crossover_prob=0.5, strategy='rand1_bin', min_budget=None,
                  max_budget=None, eta=3, min_clip=None, max_clip=None, configspace=True,
-                 boundary_fix_type='random', max_age=np.inf, n_workers=1, **kwargs):
+                 boundary_fix_type='random', max_age=np.inf, n_workers=1, backend=None,
+                 promotion='sync', job_ordering='bracket', objective_factory=None, **kwargs):
+        """ Parallel DEHB running jobs asynchronously on n_workers through a worker backend
+
+        Parameters
+        ----------
+        n_workers : int
+            Number of jobs to run simultaneously
+        backend : str or WorkerBackend
+            Where the jobs run, one of 'serial', 'dask', 'process', 'thread', 'asyncio' or a
+            WorkerBackend instance. Defaults to 'dask' if n_workers > 1 else 'serial'. The
+            'asyncio' backend expects f to be a coroutine function. See backends.get_backend().
+            A WorkerBackend instance passed is not closed by PDEHB.
+        promotion : str
+            'sync' - synchronous Successive Halving in each bracket: the jobs of a rung start
+                only after all results of the lower rung are in (SHBracketManager)
+            'async' - a configuration is promoted as soon as it is among the best 1/eta of the
+                results of its rung so far and DE evolves from the lower budget subpopulation as
+                it is at that moment (AsyncSHBracketManager), which keeps more workers busy when
+                evaluation times vary
+        job_ordering : str or callable
+            Which bracket the next job is scheduled from when jobs of several brackets can be
+            scheduled: 'bracket' for the oldest bracket, 'longest' or 'shortest' for the bracket
+            whose next job has the longest or shortest cost predicted by runtime_model, or a
+            callable, see scheduling.get_job_ordering(). Submitting long jobs first shortens the
+            time workers are idle at the end of a run. The predicted and returned costs and the
+            submission and completion times of the jobs are recorded in schedule_log. Orderings
+            other than 'bracket' choose among the max_ordered_brackets oldest brackets ready.
+        objective_factory : callable
+            Function without arguments returning the objective function, used instead of f.
+            It is called once in every worker process (through a Dask WorkerPlugin or the
+            initializer of the process pool) and jobs refer to the objective function by name,
+            such that benchmark data loaded by the factory is neither sent with every job nor
+            needs to be picklable. For the 'process' backend, the factory itself needs to be
+            picklable, e.g. a function defined at the module level.
+        """
+        if promotion not in ['sync', 'async']:
+            raise ValueError("{} is not a valid choice of promotion, choose from "
+                             "{{'sync', 'async'}}".format(promotion))
         super().__init__(cs=cs, f=f, dimensions=dimensions, mutation_factor=mutation_factor,
                          crossover_prob=crossover_prob, strategy=strategy, min_budget=min_budget,
                          max_budget=max_budget, eta=eta, min_clip=min_clip, max_clip=max_clip,
                          configspace=configspace, boundary_fix_type=boundary_fix_type,
                          max_age=max_age, n_workers=1, **kwargs)
+        self.promotion = promotion
+        self.job_ordering = get_job_ordering(job_ordering)
+        # bounds the brackets the job ordering is called with, see _next_ready_bracket()
+        self.max_ordered_brackets = 32
+        self.objective_factory = objective_factory
+        # name the objective function is installed in the workers under
+        self._objective_name = None if objective_factory is None else \
+            "objective-{}".format(uuid.uuid4().hex)
+        self._objective_installed = False
         self.iteration_counter = -1
         self.de = {}
         self._max_pop_size = None
-        self.active_brackets = []  # list of SHBracketManager objects
+        self.active_brackets = {}  # SHBracketManager objects of the running brackets, by ID
+        self._ready = []  # heap of the IDs of the brackets a job can be scheduled from
+        self._ready_ids = set()
         self.traj = []
         self.runtime = []
-        self.history = []
+        self.history = History(self.dimensions)
 
-        # Dask variables
+        # worker variables
         self.n_workers = n_workers
-        if self.n_workers > 1:
-            self.client = Client(
-                n_workers=self.n_workers, processes=True, threads_per_worker=1, scheduler_port=0
-            )  # port 0 makes Dask select a random free port
-        else:
-            self.client = None
+        self.backend = get_backend(backend, n_workers=self.n_workers)
+        # backends passed as instances are left for the caller to close
+        self._owns_backend = self.backend is not backend
         self.futures = []
+        self._running_jobs = {}  # job information of the futures, by id of the future
+        self._submit_times = {}  # by id of the future
+        # costs returned on each budget, to predict if a job finishes before a deadline
+        self.runtime_model = RuntimeModel()
+        # jobs cancelled at the deadline of a total_cost run, see run()
+        self.censored = []
+        self._cancelled_jobs = []  # job information of the censored jobs not submitted again
+        self.schedule_log = ScheduleLog()
+        self._log_index = {}  # index in schedule_log of the jobs running, by id of the future
+        self._done_times = {}  # time the jobs finished, by id of the future
+        self._worker_state = None  # sent to the workers lazily, on the first job submission
 
         # Initializing DE subpopulations
         self._get_pop_sizes()
         self._init_subpop()
 
     def __getstate__(self):
-        """ Allows the object to picklable while having Dask client as a class attribute.
+        """ Allows the object to picklable while having the worker backend as a class attribute.
         """
         d = dict(self.__dict__)
-        d["client"] = None  # hack to allow Dask client to be a class attribute
+        d["backend"] = None  # Dask clients, pools and event loops can not be pickled
+        d["_owns_backend"] = False
+        d["futures"] = []
+        d["_running_jobs"] = {}
+        d["_submit_times"] = {}
+        d["_log_index"] = {}
+        d["_done_times"] = {}
+        d["_worker_state"] = None  # reference to data held by the workers
+        d["_objective_installed"] = False
         return d
 
     def __del__(self):
-        """ Ensures a clean kill of the Dask client and frees up a port.
-        """
-        if hasattr(self, "client") and isinstance(self, Client):
-            self.client.close()
-
-    def _f_objective(self, job_info):
-        """ Wrapper to call DE's objective function.
-        """
-        config, budget, parent_id = job_info['config'], job_info['budget'], job_info['parent_id']
-        bracket_id = job_info['bracket_id']
-        fitness, cost = self.de[budget].f_objective(config, budget)
-        run_info = {
-            'fitness': fitness,
-            'cost': cost,
-            'config': config,
-            'budget': budget,
-            'parent_id': parent_id,
-            'bracket_id': bracket_id
+        """ Ensures a clean kill of the workers created by PDEHB and frees up a port.
+        """
+        if getattr(self, "_owns_backend", False) and getattr(self, "backend", None) is not None:
+            self.backend.close()
+
+    @profiled("serialization")
+    def _distribute_worker_state(self):
+        """ Sends the objective function and the decoder to all workers once
+
+        Jobs run the module-level _evaluate_job() on the state returned, such that they do not
+        pickle the PDEHB object, with its subpopulations and ever growing history. With an
+        objective_factory, the objective function is installed in the workers instead, once per
+        backend as the workers keep it across restarts.
+        """
+        if self.objective_factory is not None and not self._objective_installed:
+            self.backend.install(self._objective_name, self.objective_factory)
+            self._objective_installed = True
+        worker_state = {
+            'f': self.f if self.objective_factory is None else None,
+            'objective': self._objective_name,
+            'decoder': self.decoder,
+            'batch_objective': self.batch_objective
+        }
+        self._worker_state = self.backend.scatter(worker_state)
+
+    def _continuation_kwargs(self, job_info):
+        """ Returns the keyword arguments of the continuation protocol for a job, None if no
+        ContinuationStore is set
+        """
+        if self.continuation is None:
+            return None
+        return {
+            'trial_id': job_info['trial_id'],
+            'previous_budget': job_info['previous_budget'],
+            'store': self.continuation
         }
-        return run_info
 
     def reset(self):
         super().reset()
-        if self.n_workers > 1 and hasattr(self, "client") and isinstance(self.client, Client):
-            self.client.restart()
-        else:
-            self.client = None
+        if getattr(self, "backend", None) is not None:
+            self.backend.restart()
         self.futures = []
+        self._running_jobs = {}
+        self._submit_times = {}
+        self.runtime_model.reset()
+        self.censored = []
+        self._cancelled_jobs = []
+        self.schedule_log.reset()
+        self._log_index = {}
+        self._done_times = {}
+        # restarting the workers drops the data scattered to them
+        self._worker_state = None
         self.iteration_counter = -1
         self.de = {}
         self._max_pop_size = None
-        self.active_brackets = []
+        self.active_brackets = {}
+        self._ready = []
+        self._ready_ids = set()
         self.traj = []
         self.runtime = []
-        self.history = []
+        self.history = History(self.dimensions)
         self._get_pop_sizes()
         self._init_subpop()
 
+    @profiled("bracket")
     def clean_inactive_brackets(self):
         """ Removes brackets from the active list if it is done as communicated by Bracket Manager
+
+        Brackets are retired as soon as their last result is processed, this only catches
+        brackets modified from outside of PDEHB.
         """
         if len(self.active_brackets) == 0:
             return
-        self.active_brackets = [
-            bracket for bracket in self.active_brackets if ~bracket.is_bracket_done()
-        ]
+        self.active_brackets = {
+            bracket_id: bracket for bracket_id, bracket in self.active_brackets.items()
+            if not bracket.is_bracket_done()
+        }
         return
 
+    def _update_ready(self, bracket):
+        """ Queues the bracket for scheduling if a job of it can be scheduled now
+
+        Whether a job can be scheduled from a bracket only changes when a job of it is
+        registered or completed, which is when this is called. Brackets that stopped being ready
+        are dropped lazily by _next_ready_bracket().
+        """
+        if bracket.bracket_id not in self._ready_ids and bracket.is_ready():
+            heapq.heappush(self._ready, bracket.bracket_id)
+            self._ready_ids.add(bracket.bracket_id)
+
+    def _next_ready_bracket(self, brackets=None):
+        """ Returns the active bracket that a job is scheduled from next, None if there is none
+
+        The oldest bracket ready is at the top of the heap. Other job orderings choose among the
+        brackets queued as ready, among the first brackets ones only if the run is bounded by
+        brackets, as the jobs of later brackets are not submitted by run(). Their priority, e.g.
+        the predicted cost of the next job, changes as costs are observed, so it is not kept in a
+        heap: each call costs time linear in the brackets queued, and the ordering is called with
+        the max_ordered_brackets oldest of them only.
+        """
+        if self.job_ordering is not oldest_first:
+            ready = self._prune_ready()
+            if brackets is not None:
+                ready = [bracket_id for bracket_id in ready if bracket_id < brackets] or ready
+            if len(ready) == 0:
+                return None
+            ready = heapq.nsmallest(self.max_ordered_brackets, ready)
+            return self.job_ordering([self.active_brackets[bracket_id] for bracket_id in ready],
+                                     self.runtime_model.predict)
+        while len(self._ready) > 0:
+            bracket = self.active_brackets.get(self._ready[0])
+            if bracket is not None and bracket.is_ready():
+                return bracket
+            self._ready_ids.discard(heapq.heappop(self._ready))
+        return None
+
+    def _prune_ready(self):
+        """ Drops the brackets no longer ready from the heap and returns the IDs of the others
+        """
+        ready = [bracket_id for bracket_id in self._ready
+                 if bracket_id in self.active_brackets and
+                 self.active_brackets[bracket_id].is_ready()]
+        if len(ready) < len(self._ready):
+            self._ready = ready
+            heapq.heapify(self._ready)
+            self._ready_ids = set(ready)
+        return ready
+
+    def _rebuild_ready(self):
+        self._ready = []
+        self._ready_ids = set()
+        for bracket in self.active_brackets.values():
+            self._update_ready(bracket)
+
     def _update_trackers(self, traj, runtime, history, budget):
         self.traj.append(traj)
         self.runtime.append(runtime)
-        self.history.append(history)
+        # history holds the arguments of History.append()
+        self.history.append(*history)
 
     def _get_pop_sizes(self):
         """Determines maximum pop size for each budget
@@ -242,7 +583,8 @@ class PDEHB(DEHBBase):
         """
         self.de = {}
         for i, b in enumerate(self._max_pop_size.keys()):
-            self.de[b] = AsyncDE(**self.de_params, budget=b, pop_size=self._max_pop_size[b])
+            self.de[b] = AsyncDE(**self.de_params, budget=b, pop_size=self._max_pop_size[b],
+                                 rng=self._spawn_rng())
             self.de[b].population = self.de[b].init_population(pop_size=self._max_pop_size[b])
             self.de[b].fitness = np.array([np.inf] * self._max_pop_size[b])
             # adding attributes to DEHB objects to allow communication across subpopulations
@@ -261,29 +603,46 @@ class PDEHB(DEHBBase):
             pop.extend(self.de[budget].population.tolist())
         return np.array(pop)
 
+    @profiled("bracket")
     def _start_new_bracket(self):
         """ Starts a new bracket based on Hyperband
         """
         # start new bracket
         self.iteration_counter += 1  # iteration counter gives the bracket count or bracket ID
         n_configs, budgets = self.get_next_iteration(self.iteration_counter)
-        bracket = SHBracketManager(
-            n_configs=n_configs, budgets=budgets, bracket_id=self.iteration_counter
-        )
-        self.active_brackets.append(bracket)
+        if self.promotion == 'async':
+            bracket = AsyncSHBracketManager(
+                n_configs=n_configs, budgets=budgets, bracket_id=self.iteration_counter,
+                rng=self._spawn_rng(), eta=self.eta
+            )
+        else:
+            bracket = SHBracketManager(
+                n_configs=n_configs, budgets=budgets, bracket_id=self.iteration_counter,
+                rng=self._spawn_rng()
+            )
+        self.active_brackets[bracket.bracket_id] = bracket
+        self._update_ready(bracket)
+        self.profiler.count("brackets")
+        self.profiler.event("bracket_start", bracket_id=bracket.bracket_id, budgets=budgets,
+                            n_configs=n_configs)
         return bracket
 
     def is_worker_available(self):
         """ Checks if at least one worker is available to run a job
         """
-        if self.n_workers == 1:
-            # in the synchronous case, one worker is always available
-            return True
-        if len(self.futures) >= sum(self.client.nthreads().values()):
+        if len(self.futures) >= self.backend.capacity():
             # pause/wait if active worker count greater allocated workers
             return False
         return True
 
+    @profiled("wait")
+    def _wait_for_results(self, timeout=None):
+        """ Blocks till at least one running job finishes or till timeout (in seconds) expires
+        """
+        if len(self.futures) == 0:
+            return
+        self.backend.wait(self.futures, timeout=timeout, return_when="FIRST_COMPLETED")
+
     def _get_promotion_candidate(self, low_budget, high_budget, n_configs):
         """ Manages the population to be promoted from the lower to the higher budget.
 
@@ -350,7 +709,11 @@ class PDEHB(DEHBBase):
         # identify lower budget/fidelity to transfer information from
         lower_budget, num_configs = bracket.get_lower_budget_promotions(budget)
 
-        if self.iteration_counter < self.max_SH_iter:
+        if self.promotion == 'async':
+            if bracket.bracket_id < self.max_SH_iter and budget != bracket.budgets[0]:
+                # the best configuration returned so far on the lower rung of the bracket
+                return np.array(bracket.get_promotion(budget)), parent_id
+        elif self.iteration_counter < self.max_SH_iter:
             # promotions occur only in the first set of SH brackets under Hyperband
             # for the first rung/budget in the current bracket, no promotion is possible and
             # evolution can begin straight away
@@ -365,114 +728,332 @@ class PDEHB(DEHBBase):
         # iteration_counter <= max_SH_iter but certainly never when iteration_counter > max_SH_iter
 
         # a single DE evolution --- (mutation + crossover) occurs here
-        mutation_pop_idx = np.argsort(self.de[lower_budget].fitness)[:num_configs]
-        mutation_pop = self.de[lower_budget].population[mutation_pop_idx]
-        # TODO: make global pop smarter --- select top configs from subpop?
-        # generate mutants from previous budget subpopulation or global population
-        if len(mutation_pop) < self.de[budget]._min_pop_size:
-            filler = self.de[budget]._min_pop_size - len(mutation_pop) + 1
-            new_pop = self.de[budget]._init_mutant_population(
-                pop_size=filler, population=self._concat_pops(),
-                target=None, best=self.inc_config
+        # the random numbers are drawn from the bracket's stream, such that the configurations
+        # of a bracket do not depend on how the jobs of other brackets interleave with them
+        subpop_rng, self.de[budget].rng = self.de[budget].rng, bracket.rng
+        try:
+            mutation_pop_idx = np.argsort(self.de[lower_budget].fitness)[:num_configs]
+            mutation_pop = self.de[lower_budget].population[mutation_pop_idx]
+            # TODO: make global pop smarter --- select top configs from subpop?
+            # generate mutants from previous budget subpopulation or global population
+            if len(mutation_pop) < self.de[budget]._min_pop_size:
+                filler = self.de[budget]._min_pop_size - len(mutation_pop) + 1
+                new_pop = self.de[budget]._init_mutant_population(
+                    pop_size=filler, population=self._concat_pops(),
+                    target=None, best=self.inc_config
+                )
+                mutation_pop = np.concatenate((mutation_pop, new_pop))
+            # generate mutant from among individuals in mutation_pop
+            mutant = self.de[budget].mutation(
+                current=target, best=self.inc_config, alt_pop=mutation_pop
             )
-            mutation_pop = np.concatenate((mutation_pop, new_pop))
-        # generate mutant from among individuals in mutation_pop
-        mutant = self.de[budget].mutation(
-            current=target, best=self.inc_config, alt_pop=mutation_pop
-        )
-        # perform crossover with selected parent
-        config = self.de[budget].crossover(target=target, mutant=mutant)
-        config = self.de[budget].boundary_check(config)
+            # perform crossover with selected parent
+            config = self.de[budget].crossover(target=target, mutant=mutant)
+            config = self.de[budget].boundary_check(config)
+        finally:
+            self.de[budget].rng = subpop_rng
         return config, parent_id
 
-    def _get_next_job(self):
+    def _acquire_config_outside_brackets(self, budget):
+        """ Generates a configuration by DE evolution of the subpopulation of budget, for a job
+        that does not belong to any bracket
+        """
+        parent_id = self._get_next_parent_for_subpop(budget)
+        target = self.de[budget].population[parent_id]
+        alt_pop = None
+        if len(self.de[budget].population) < self.de[budget]._min_pop_size:
+            alt_pop = self._concat_pops()
+        mutant = self.de[budget].mutation(current=target, best=self.inc_config, alt_pop=alt_pop)
+        config = self.de[budget].crossover(target=target, mutant=mutant)
+        return self.de[budget].boundary_check(config), parent_id
+
+    @profiled("scheduling")
+    def _get_next_job(self, brackets=None, time_left=None, admission=None):
         """ Loads a configuration and budget to be evaluated next by a free worker
+
+        Returns None if the job is not admitted, see _admissible_budget(). Admission is decided
+        on the budget before a configuration is acquired, such that a job not admitted draws no
+        random numbers and consumes no promotion of its bracket.
         """
-        bracket = None
-        if len(self.active_brackets) == 0 or \
-                np.all([bracket.is_bracket_done() for bracket in self.active_brackets]):
-            # start new bracket when no pending jobs from existing brackets or empty bracket list
+        # a bracket with a configuration left to submit and not waiting for the results of a
+        # lower rung, which allows DEHB to have a "synchronous" Successive Halving
+        bracket = self._next_ready_bracket(brackets)
+        if bracket is None:
+            # start new bracket when all active brackets are waiting or there are none
             bracket = self._start_new_bracket()
-        else:
-            for _bracket in self.active_brackets:
-                # check if _bracket is not waiting for previous rung results of same bracket
-                # _bracket is not waiting on the last rung results
-                # these 2 checks allow DEHB to have a "synchronous" Successive Halving
-                if not _bracket.previous_rung_waits() and _bracket.is_pending():
-                    # bracket eligible for job scheduling
-                    bracket = _bracket
-                    break
-            if bracket is None:
-                # start new bracket when existing list has all waiting brackets
-                bracket = self._start_new_bracket()
         # budget that the SH bracket allots
-        budget = bracket.get_next_job_budget()
-        config, parent_id = self._acquire_config(bracket, budget)
+        bracket_budget = bracket.get_next_job_budget()
+        budget = self._admissible_budget(bracket_budget, time_left, admission)
+        if budget is None:
+            return None
+        if budget == bracket_budget:
+            config, parent_id = self._acquire_config(bracket, budget)
+            bracket_id = bracket.bracket_id
+        else:
+            # a downgraded job leaves the bracket as it is, its job is scheduled again later
+            config, parent_id = self._acquire_config_outside_brackets(budget)
+            bracket_id = -1
         # notifies the Bracket Manager that a single config is to run for the budget chosen
         job_info = {
             "config": config,
             "budget": budget,
             "parent_id": parent_id,
-            "bracket_id": bracket.bracket_id
+            "bracket_id": bracket_id
         }
+        if self.continuation is not None:
+            # a promoted configuration keeps the trial ID it had on the lower budgets
+            job_info["trial_id"] = trial_id(config)
+            job_info["previous_budget"] = self.continuation.previous_budget(
+                job_info["trial_id"], budget
+            )
         return job_info
 
+    @profiled("bracket")
+    def _register_job(self, job_info):
+        """ Passes the information of a job submission to the Bracket Manager
+        """
+        bracket = self.active_brackets.get(job_info['bracket_id'])
+        if bracket is not None:
+            # registering is IMPORTANT for Bracket Manager to perform SH
+            bracket.register_job(job_info['budget'])
+            self._update_ready(bracket)
+
+    def _submit_to_backend(self, job_info):
+        if self._worker_state is None:
+            self._distribute_worker_state()
+        # the serial backend evaluates right away and returns a future that is already done
+        serial = isinstance(getattr(self.backend, "executor", None), SerialExecutor)
+        evaluate = _evaluate_job_async if self.backend.asynchronous else _evaluate_job
+        with self.profiler.phase("evaluation" if serial else "serialization"):
+            future = self.backend.submit(
+                evaluate, self._worker_state, job_info['config'], job_info['budget'],
+                job_info['parent_id'], job_info['bracket_id'],
+                self._continuation_kwargs(job_info)
+            )
+        self.futures.append(future)
+        self._running_jobs[id(future)] = job_info
+        self._submit_times[id(future)] = time.time()
+        self._log_index[id(future)] = self.schedule_log.submit(
+            job_info, self.runtime_model.predict(job_info['budget']), self._submit_times[id(future)]
+        )
+        future.add_done_callback(self._on_job_done)
+
+    def _on_job_done(self, future):
+        # called by the backend when the job finishes, which can be well before it is collected
+        if id(future) in self._log_index:
+            self._done_times[id(future)] = time.time()
+
     def submit_job(self, job_info):
         """ Asks a free worker to run the objective function on config and budget
+
+        If the configuration was evaluated on the budget before, the result is taken from the
+        cache and processed right away instead.
         """
-        # submit to to Dask client
-        if self.n_workers > 1:
-            self.futures.append(
-                self.client.submit(self._f_objective, job_info)
-            )
+        self.profiler.event("evaluation_start", config=job_info['config'],
+                            budget=job_info['budget'])
+        run_info = self._read_cache(job_info)
+        if run_info is None:
+            self._submit_to_backend(job_info)
+            self._register_job(job_info)
         else:
-            # skipping scheduling to Dask worker to avoid added overheads in the synchronous case
-            self.futures.append(self._f_objective(job_info))
-
-        # pass information of job submission to Bracket Manager
-        for bracket in self.active_brackets:
-            if bracket.bracket_id == job_info['bracket_id']:
-                # registering is IMPORTANT for Bracket Manager to perform SH
-                bracket.register_job(job_info['budget'])
-                break
+            self._register_job(job_info)
+            self._process_result(run_info)
+
+    def _read_cache(self, job_info):
+        """ Returns the result of the job from the cache, None if it is not cached
+        """
+        if self.cache is None:
+            return None
+        result = self.cache.get(self.cache.key(job_info['config'], job_info['budget'],
+                                               self.decoder))
+        if result is None:
+            return None
+        run_info = dict(job_info)
+        run_info['fitness'], run_info['cost'] = result
+        return run_info
+
+    def _write_cache(self, run_info):
+        if self.cache is not None:
+            key = self.cache.key(run_info['config'], run_info['budget'], self.decoder)
+            self.cache.put(key, run_info['fitness'], run_info['cost'])
+
+    @profiled("selection")
+    def _process_result(self, run_info):
+        """ Updates the brackets, the subpopulation and the trackers with a job's result
+        """
+        fitness, cost = run_info["fitness"], run_info["cost"]
+        budget, parent_id = run_info["budget"], run_info["parent_id"]
+        config = run_info["config"]
+        bracket_id = run_info["bracket_id"]
+        self.profiler.event("evaluation_end", config=config, budget=budget, fitness=fitness,
+                            cost=cost)
+        bracket = self.active_brackets.get(bracket_id)
+        if bracket is not None:
+            # bracket job complete
+            bracket.complete_job(budget, config, fitness)  # IMPORTANT to perform synchronous SH
+            if bracket.is_bracket_done():
+                # retired right away, such that only running brackets are kept
+                del self.active_brackets[bracket_id]
+                self.profiler.event("bracket_end", bracket_id=bracket_id)
+            else:
+                self._update_ready(bracket)
 
-    def _fetch_results_from_workers(self):
+        # carry out DE selection
+        if fitness <= self.de[budget].fitness[parent_id]:
+            self.de[budget].population[parent_id] = config
+            self.de[budget].fitness[parent_id] = fitness
+        # updating incumbents
+        if self.de[budget].fitness[parent_id] < self.inc_score:
+            self.inc_score = self.de[budget].fitness[parent_id]
+            self.inc_config = self.de[budget].population[parent_id]
+        if self.continuation is not None:
+            self.continuation.record(trial_id(config), budget)
+        # book-keeping
+        self._update_trackers(traj=self.inc_score, runtime=cost, budget=budget,
+                              history=(config, fitness, budget, cost, bracket_id))
+
+    @profiled("collection")
+    def _fetch_results_from_workers(self, finished_before=None):
         """ Iterate over futures and collect results from finished workers
+
+        If finished_before is given, only the jobs known to have finished before that time are
+        collected.
         """
-        if self.n_workers > 1:
-            done_list = [(i, future) for i, future in enumerate(self.futures) if future.done()]
-        else:
-            # Dask not invoked in the synchronous case
-            done_list = [(i, future) for i, future in enumerate(self.futures)]
-        for _, future in done_list:
-            if self.n_workers > 1:
-                run_info = future.result()
+        # a single pass, such that a future finishing meanwhile is either collected now or kept
+        # as running for the next call, never dropped from both
+        done_list, running = [], []
+        for future in self.futures:
+            done = future.done() and (finished_before is None or
+                                      self._done_times.get(id(future), np.inf) <= finished_before)
+            (done_list if done else running).append(future)
+        # retaining only the futures of jobs still running
+        self.futures = running
+        for future in done_list:
+            self._running_jobs.pop(id(future), None)
+            self._submit_times.pop(id(future), None)
+            run_info = future.result()
+            self.schedule_log.finish(self._log_index.pop(id(future)),
+                                     self._done_times.pop(id(future), time.time()),
+                                     run_info['cost'])
+            self._write_cache(run_info)
+            self.runtime_model.observe(run_info['budget'], run_info['cost'])
+            self._process_result(run_info)
+
+    def _cancel_running_jobs(self):
+        """ Cancels the jobs not collected and records them as censored
+
+        A censored job is its job information with the time it ran for till it was cancelled as
+        'elapsed', a lower bound of its cost. The jobs stay registered with their brackets and
+        are submitted again by the next run, or by the run resuming from a checkpoint.
+        """
+        self.backend.cancel(self.futures)
+        now = time.time()
+        for future in self.futures:
+            job_info = self._running_jobs.pop(id(future))
+            self._cancelled_jobs.append(job_info)
+            job_info = dict(job_info)
+            job_info['elapsed'] = now - self._submit_times.pop(id(future))
+            self._log_index.pop(id(future), None)
+            self._done_times.pop(id(future), None)
+            self.censored.append(job_info)
+        self.futures = []
+
+    def _admissible_budget(self, budget, time_left=None, admission=None):
+        """ Returns the budget a job of budget runs on, None if it is not admitted
+
+        A job is admitted if it is predicted to finish within time_left (seconds). With
+        admission 'downgrade', a job that does not fit runs on the largest lower budget that
+        fits, if any, outside of the brackets (bracket ID -1) against a parent of the
+        subpopulation of that budget.
+        """
+        if admission is None or time_left is None or self.runtime_model.fits(budget, time_left):
+            return budget
+        if admission == 'downgrade':
+            for lower_budget in self.budgets[::-1]:
+                if lower_budget < budget and self.runtime_model.fits(lower_budget, time_left):
+                    return lower_budget
+        return None
+
+    def ask(self, n=1):
+        """ Returns n job records to be evaluated outside of PDEHB and reported with tell()
+
+        Each job record is a dict with the keys 'config' (the vector in [0, 1]),
+        'configuration' (the decoded configuration to evaluate), 'budget', 'parent_id' and
+        'bracket_id', and the 'trial_id' and 'previous_budget' of the continuation protocol if a
+        ContinuationStore is set. The jobs are registered with their brackets as if submitted to
+        a worker, such that as many jobs can be asked for as there are workers to run them.
+        """
+        jobs = []
+        for _ in range(n):
+            job_info = self._get_next_job()
+            self._register_job(job_info)
+            self.profiler.event("evaluation_start", config=job_info['config'],
+                                budget=job_info['budget'])
+            if self.decoder is not None:
+                job_info['configuration'] = self.decoder.to_configuration(job_info['config'])
             else:
-                # Dask not invoked in the synchronous case
-                run_info = future
-            # update bracket information
-            fitness, cost = run_info["fitness"], run_info["cost"]
-            budget, parent_id = run_info["budget"], run_info["parent_id"]
-            config = run_info["config"]
-            bracket_id = run_info["bracket_id"]
-            for bracket in self.active_brackets:
-                if bracket.bracket_id == bracket_id:
-                    # bracket job complete
-                    bracket.complete_job(budget)  # IMPORTANT to perform synchronous SH
-
-            # carry out DE selection
-            if fitness <= self.de[budget].fitness[parent_id]:
-                self.de[budget].population[parent_id] = config
-                self.de[budget].fitness[parent_id] = fitness
-            # updating incumbents
-            if self.de[budget].fitness[parent_id] < self.inc_score:
-                self.inc_score = self.de[budget].fitness[parent_id]
-                self.inc_config = self.de[budget].population[parent_id]
-            # book-keeping
-            self._update_trackers(traj=self.inc_score, runtime=cost, budget=budget,
-                                  history=(config.tolist(), float(fitness), float(budget)))
-        # remove processed future
-        self.futures = np.delete(self.futures, [i for i, _ in done_list]).tolist()
+                job_info['configuration'] = job_info['config']
+            jobs.append(job_info)
+        return jobs
+
+    def tell(self, job, fitness, cost):
+        """ Reports the fitness and cost of a job record returned by ask()
+
+        Carries out the DE selection and the bracket book-keeping for the job.
+        """
+        run_info = dict(job)
+        run_info['fitness'] = fitness
+        run_info['cost'] = cost
+        self._write_cache(run_info)
+        self.runtime_model.observe(run_info['budget'], cost)
+        self._process_result(run_info)
+        self.clean_inactive_brackets()
+
+    def _get_checkpoint_state(self):
+        state = super()._get_checkpoint_state()
+        state["active_brackets"] = self.active_brackets
+        # jobs submitted and not collected yet, or cancelled, are submitted again when resuming
+        state["running_jobs"] = [self._running_jobs[id(future)] for future in self.futures] + \
+            self._cancelled_jobs
+        state["elapsed"] = time.time() - self.start if hasattr(self, "start") else 0
+        # the costs observed, such that admission keeps its predictions when resuming
+        state["runtime_model"] = self.runtime_model
+        state["censored"] = self.censored
+        state["schedule_log"] = self.schedule_log
+        return state
+
+    def _set_checkpoint_state(self, state):
+        super()._set_checkpoint_state(state)
+        self.active_brackets = state["active_brackets"]
+        if isinstance(self.active_brackets, list):
+            # checkpoints written when the brackets were kept in a list
+            self.active_brackets = {
+                bracket.bracket_id: bracket for bracket in self.active_brackets
+                if not bracket.is_bracket_done()
+            }
+        self._rebuild_ready()
+        self._resume_jobs = state["running_jobs"]
+        self._cancelled_jobs = []
+        self._resume_elapsed = state["elapsed"]
+        if "runtime_model" in state:
+            # checkpoints written before the scheduling state was saved keep it empty
+            self.runtime_model = state["runtime_model"]
+            self.censored = state["censored"]
+            self.schedule_log = state["schedule_log"]
+
+    def load_checkpoint(self, path):
+        """ Restores the state of a run saved to the directory path
+
+        The object needs to be created with the same parameters as the one that saved the run.
+        Jobs that were running when the checkpoint was saved are submitted again by run().
+        Returns False if there is no checkpoint in path.
+        """
+        if not self._get_checkpointer(path).exists():
+            return False
+        self.futures = []
+        self._running_jobs = {}
+        self._init_subpop()
+        return super().load_checkpoint(path)
 
     def _is_run_budget_exhausted(self, fevals=None, brackets=None, total_cost=None):
         """ Checks if the DEHB run should be terminated or continued
@@ -488,7 +1069,7 @@ class PDEHB(DEHBBase):
                 return True
         elif brackets is not None:
             if self.iteration_counter >= brackets:
-                for bracket in self.active_brackets:
+                for bracket in self.active_brackets.values():
                     # waits for all brackets < iteration_counter to finish by collecting results
                     if bracket.bracket_id < self.iteration_counter and \
                             not bracket.is_bracket_done():
@@ -501,7 +1082,15 @@ class PDEHB(DEHBBase):
                 return True
         return False
 
-    def run(self, fevals=None, brackets=None, total_cost=None, verbose=False):
+    def _time_left(self, fevals=None, brackets=None, total_cost=None):
+        """ Returns the seconds left if the run is bounded by total_cost, else None
+        """
+        if fevals is not None or brackets is not None or total_cost is None:
+            return None
+        return max(0, total_cost - (time.time() - self.start))
+
+    def run(self, fevals=None, brackets=None, total_cost=None, verbose=False,
+            checkpoint_dir=None, checkpoint_interval=0, admission=None, cancel_at_deadline=False):
         """ Main interface to run optimization by DEHB
 
         This function waits on workers and if a worker is free, asks for a configuration and a
@@ -514,14 +1103,66 @@ class PDEHB(DEHBBase):
         1) Number of function evaluations (fevals)
         2) Number of Successive Halving brackets run under Hyperband (brackets)
         3) Total computational cost aggregated by all function evaluations (total_cost)
+
+        If checkpoint_dir is not None, the state of the run is saved to it whenever results are
+        collected, at most once every checkpoint_interval seconds, and at the end of the run. If a
+        checkpoint exists in checkpoint_dir, the run resumes from it: the jobs that were running
+        are submitted again and the run budget counts what was spent before the interruption.
+
+        For total_cost runs, the end of the run is a deadline of total_cost seconds, and the cost
+        of a job on each budget is predicted from the costs returned so far (runtime_model):
+        admission : str
+            None - jobs are submitted till the deadline
+            'skip' - jobs predicted to not finish before the deadline are not submitted, and the
+                run ends early if no job is running and none fits
+            'downgrade' - such jobs are evaluated on the largest lower budget that fits, see
+                _admissible_budget(), or not submitted if none fits
+        cancel_at_deadline : bool
+            If True, the jobs still running at the deadline are cancelled and recorded in
+            self.censored, instead of waited for, as are jobs that finished after it. Their
+            brackets wait for them, such that they are submitted again by the next run.
+        Admission relies on predictions, which are only known once a cost was returned and can
+        be exceeded, such that jobs can still finish after the deadline. Only
+        cancel_at_deadline ensures that no result is collected after it.
         """
+        if admission not in [None, 'skip', 'downgrade']:
+            raise ValueError("{} is not a valid choice of admission, choose from "
+                             "{{None, 'skip', 'downgrade'}}".format(admission))
+        if verbose:
+            # only needed to report the memory usage
+            import psutil
         self.start = time.time()
+        if checkpoint_dir is not None and self.load_checkpoint(checkpoint_dir):
+            self.start -= self._resume_elapsed
+            for job_info in self._resume_jobs:
+                # the brackets restored have these jobs registered already
+                self._submit_to_backend(job_info)
+            if verbose:
+                print("Resuming with {} evaluations done and {} jobs resubmitted".format(
+                    len(self.traj), len(self._resume_jobs)
+                ))
+        for job_info in self._cancelled_jobs:
+            # cancelled at the deadline of the previous run, the jobs are registered already
+            self._submit_to_backend(job_info)
+        self._cancelled_jobs = []
+        last_checkpoint = time.time()
+        deadline = None
+        if cancel_at_deadline and self._time_left(fevals, brackets, total_cost) is not None:
+            # results of jobs finishing after the deadline are never collected
+            deadline = self.start + total_cost
         while True:
             if self._is_run_budget_exhausted(fevals, brackets, total_cost):
                 break
             if self.is_worker_available():
-                job_info = self._get_next_job()
-                if brackets is not None and job_info['bracket_id'] >= brackets:
+                job_info = self._get_next_job(
+                    brackets, self._time_left(fevals, brackets, total_cost), admission
+                )
+                if job_info is None:
+                    # the job would finish after the deadline, its result would be wasted
+                    if len(self.futures) == 0:
+                        break
+                    self._wait_for_results(timeout=self._time_left(fevals, brackets, total_cost))
+                elif brackets is not None and job_info['bracket_id'] >= brackets:
                     # ignore submission and only collect results
                     # when brackets are chosen as run budget, an extra bracket is created
                     # since iteration_counter is incremented in _get_next_job() and then checked
@@ -529,7 +1170,7 @@ class PDEHB(DEHBBase):
                     # coming from the extra allocated bracket
                     # _is_run_budget_exhausted() will not return True until all the lower brackets
                     # have finished computation and returned its results
-                    pass
+                    self._wait_for_results()
                 else:
                     self.submit_job(job_info)
                     if verbose:
@@ -538,19 +1179,38 @@ class PDEHB(DEHBBase):
                             job_info['bracket_id'], budget, self.inc_score,
                             psutil.Process().memory_info().rss / 1024 ** 3
                         ))
-                        for bracket in self.active_brackets:
+                        for bracket in self.active_brackets.values():
                             print('=> BracketID: {}; Submit: {}; Collect: {}'.format(
                                 bracket.bracket_id, bracket.sh_bracket, bracket._sh_bracket
                             ))
-            self._fetch_results_from_workers()
+            else:
+                # all workers are busy, block instead of polling till one of them returns
+                self._wait_for_results(timeout=self._time_left(fevals, brackets, total_cost))
+            n_collected = len(self.traj)
+            self._fetch_results_from_workers(finished_before=deadline)
             self.clean_inactive_brackets()
+            if checkpoint_dir is not None and len(self.traj) > n_collected and \
+                    time.time() - last_checkpoint >= checkpoint_interval:
+                self.save_checkpoint(checkpoint_dir)
+                last_checkpoint = time.time()
 
-        while len(self.futures) > 0:
-            self._fetch_results_from_workers()
-            time.sleep(self.min_budget)
+        if len(self.futures) > 0 and deadline is not None:
+            if verbose:
+                print("DEHB optimisation over! Cancelling {} jobs running...".format(
+                    len(self.futures)
+                ))
+            # jobs finishing between the deadline and now are censored as well
+            self._fetch_results_from_workers(finished_before=deadline)
+            self._cancel_running_jobs()
+        if len(self.futures) > 0:
             if verbose:
                 print("DEHB optimisation over! Waiting to collect results from workers running...")
+            with self.profiler.phase("wait"):
+                self.backend.wait(self.futures, return_when="ALL_COMPLETED")
+            self._fetch_results_from_workers()
+        if checkpoint_dir is not None:
+            self.save_checkpoint(checkpoint_dir)
         if verbose:
             print("End of optimisation!")
         self.runtime = np.array(self.runtime) - self.start
-        return np.array(self.traj), np.array(self.runtime), np.array(self.history)
+        return np.array(self.traj), np.array(self.runtime), self.history
@@ -0,0 +1,245 @@
+import csv
+import json
+import time
+import functools
+from collections import defaultdict
+
+
+PHASES = ["mutation", "crossover", "decode", "evaluation", "selection", "bracket",
+          "scheduling", "serialization", "collection", "wait"]
+EVENTS = ["evaluation_start", "evaluation_end", "bracket_start", "bracket_end"]
+
+
+class _Phase():
+    '''Context manager timing one entry into a phase of a Profiler
+    '''
+    __slots__ = ["profiler", "name", "start", "nested"]
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        stack = self.profiler._stack
+        # re-entering the phase on top of the stack, e.g. mutation() called by sample_mutants()
+        # inside a timed mutation, is part of the outer entry
+        self.nested = len(stack) > 0 and stack[-1][0] == self.name
+        if not self.nested:
+            self.start = time.perf_counter()
+            stack.append([self.name, 0.0])
+        return self
+
+    def __exit__(self, *exc):
+        if not self.nested:
+            self.profiler._exit(self.start)
+        return False
+
+
+class _NullPhase():
+    __slots__ = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class NullProfiler():
+    '''Profiler that records nothing, used by the optimizers when profiling is off
+    '''
+    enabled = False
+    _phase = _NullPhase()
+
+    def phase(self, name):
+        return self._phase
+
+    def count(self, name, n=1):
+        pass
+
+    def event(self, name, **info):
+        pass
+
+    def reset(self):
+        pass
+
+
+class Profiler():
+    '''Timers of the phases of an optimizer, counters and hooks for evaluation and bracket events
+
+    The optimizers time their phases, which are
+
+        mutation, crossover - creating trials (DE)
+        decode - converting vectors to configurations
+        evaluation - objective function calls made by the optimizer (waiting for them with an
+            executor), or cache lookups
+        selection - DE selection and the incumbent and trajectory updates
+        bracket - Successive Halving bookkeeping: bracket creation, promotions, clean-up
+        scheduling - choosing the configuration and budget of the next job (PDEHB)
+        serialization - sending jobs and data to the workers, writing checkpoints
+        collection - collecting and processing the results of the workers (PDEHB)
+        wait - waiting for a worker to be free or a result to arrive (PDEHB)
+
+    Phases nest, e.g. evaluation within selection, and the time of a phase is its self time,
+    excluding the phases nested in it. The time of the stacks of phases is kept as well and can
+    be written in the folded format of flamegraph tools with to_folded().
+
+    Hooks are functions called with the information of an event as keyword arguments:
+
+        evaluation_start - config, budget
+        evaluation_end - config, budget, fitness, cost
+        bracket_start - bracket_id, budgets, n_configs
+        bracket_end - bracket_id
+
+    Parameters
+    ----------
+    trace : bool
+        If True, every phase entry and event is recorded with its time, see to_json() and
+        to_csv(). The timers and counters are kept either way.
+    '''
+    enabled = True
+
+    def __init__(self, trace=False):
+        self.trace = trace
+        self.hooks = defaultdict(list)
+        self.reset()
+
+    def reset(self):
+        '''Clears the timers, counters and the trace, the hooks are kept
+        '''
+        self.times = defaultdict(float)  # self time of each phase
+        self.calls = defaultdict(int)  # number of entries into each phase
+        self.stacks = defaultdict(float)  # self time of each stack of phases, by "a;b;c"
+        self.counters = defaultdict(int)
+        self.records = []  # (kind, name, start, duration, info) if trace is True
+        self._stack = []  # [phase, time spent in the phases nested in it]
+        self._t0 = time.perf_counter()
+
+    def phase(self, name):
+        '''Returns a context manager timing the block as phase name
+        '''
+        return _Phase(self, name)
+
+    def _exit(self, start):
+        duration = time.perf_counter() - start
+        name, nested = self._stack[-1]
+        key = ";".join(entry[0] for entry in self._stack)
+        self._stack.pop()
+        self.times[name] += duration - nested
+        self.stacks[key] += duration - nested
+        self.calls[name] += 1
+        if len(self._stack) > 0:
+            self._stack[-1][1] += duration
+        if self.trace:
+            self.records.append(("phase", key, start - self._t0, duration, None))
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def add_hook(self, event, fn):
+        '''Calls fn(**info) on every event of the kind event
+        '''
+        if event not in EVENTS:
+            raise ValueError("{} is not an event, choose from {}".format(event, EVENTS))
+        self.hooks[event].append(fn)
+
+    def event(self, name, **info):
+        self.counters[name] += 1
+        if self.trace:
+            self.records.append(("event", name, time.perf_counter() - self._t0, 0.0, info))
+        for fn in self.hooks.get(name, []):
+            fn(**info)
+
+    def summary(self):
+        '''Returns the self time, number of calls and share of the total profiled time of every
+        phase, and the counters
+        '''
+        total = sum(self.times.values())
+        phases = {
+            name: {"time": t, "calls": self.calls[name],
+                   "fraction": t / total if total > 0 else 0}
+            for name, t in sorted(self.times.items(), key=lambda item: -item[1])
+        }
+        return {"total": total, "phases": phases, "counters": dict(self.counters)}
+
+    def to_folded(self, path):
+        '''Writes the self time of the stacks of phases, in microseconds, in the folded format
+        ("a;b;c <time>" per line) read by flamegraph.pl and speedscope
+        '''
+        with open(path, "w") as fh:
+            for key, t in sorted(self.stacks.items()):
+                fh.write("{} {}\n".format(key, int(round(t * 1e6))))
+
+    def _records(self):
+        for kind, name, start, duration, info in self.records:
+            yield {"kind": kind, "name": name, "start": start, "duration": duration,
+                   "info": _to_json(info) if info is not None else None}
+
+    def to_json(self, path):
+        '''Writes the summary and, if tracing, the records to the JSON file path
+        '''
+        with open(path, "w") as fh:
+            json.dump({"summary": self.summary(), "trace": list(self._records())}, fh)
+
+    def to_csv(self, path):
+        '''Writes the records (or the phase summary if not tracing) to the CSV file path
+        '''
+        with open(path, "w", newline="") as fh:
+            if self.trace:
+                writer = csv.DictWriter(fh, ["kind", "name", "start", "duration", "info"])
+                writer.writeheader()
+                for record in self._records():
+                    record["info"] = json.dumps(record["info"])
+                    writer.writerow(record)
+            else:
+                writer = csv.writer(fh)
+                writer.writerow(["phase", "time", "calls", "fraction"])
+                for name, phase in self.summary()["phases"].items():
+                    writer.writerow([name, phase["time"], phase["calls"], phase["fraction"]])
+
+
+def _to_json(info):
+    # numpy arrays and scalars of the event information are written as lists and floats
+    out = {}
+    for key, value in info.items():
+        if hasattr(value, "tolist"):
+            value = value.tolist()
+        elif not isinstance(value, (int, float, str, bool, type(None), list, dict)):
+            value = str(value)
+        out[key] = value
+    return out
+
+
+def profiled(name):
+    '''Decorator timing a method of an optimizer as phase name of its profiler
+    '''
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.profiler.phase(name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+NULL_PROFILER = NullProfiler()
+
+
+def get_profiler(profiler=None):
+    '''Returns the profiler an optimizer reports to
+
+    Parameters
+    ----------
+    profiler : bool or Profiler
+        None or False - nothing is recorded
+        True - a new Profiler
+        An instance of Profiler (or NullProfiler) is returned as is.
+    '''
+    if isinstance(profiler, (Profiler, NullProfiler)):
+        return profiler
+    if profiler is None or profiler is False:
+        return NULL_PROFILER
+    if profiler is True:
+        return Profiler()
+    raise ValueError("{} is not a valid choice of profiler, pass a bool or a "
+                     "Profiler".format(profiler))
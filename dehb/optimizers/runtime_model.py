@@ -0,0 +1,52 @@
+import numpy as np
+
+
+class RuntimeModel():
+    '''Online model of the cost of an evaluation on each budget
+
+    Keeps the running mean and variance of the costs returned on every budget. The cost on a
+    budget is predicted as its mean plus z standard deviations. A budget without observations is
+    predicted from the nearest budget observed, scaled linearly with the budget.
+
+    Parameters
+    ----------
+    z : float
+        Number of standard deviations added to the mean cost, the larger the more conservative
+    '''
+    def __init__(self, z=2.0):
+        self.z = z
+        self.stats = {}  # [count, mean, sum of squared deviations] of the costs, by budget
+
+    def observe(self, budget, cost):
+        if budget is None or cost is None or not np.isfinite(cost):
+            return
+        # Welford's update
+        stats = self.stats.setdefault(budget, [0, 0.0, 0.0])
+        stats[0] += 1
+        delta = cost - stats[1]
+        stats[1] += delta / stats[0]
+        stats[2] += delta * (cost - stats[1])
+
+    def _predict_observed(self, budget):
+        n, mean, m2 = self.stats[budget]
+        std = np.sqrt(m2 / (n - 1)) if n > 1 else 0
+        return mean + self.z * std
+
+    def predict(self, budget):
+        '''Returns the predicted cost of an evaluation on budget, None if nothing was observed
+        '''
+        if budget in self.stats:
+            return self._predict_observed(budget)
+        if len(self.stats) == 0 or budget is None:
+            return None
+        nearest = min(self.stats, key=lambda b: abs(np.log(b / budget)))
+        return self._predict_observed(nearest) * budget / nearest
+
+    def fits(self, budget, time_left):
+        '''Returns True if an evaluation on budget is predicted to finish within time_left
+        '''
+        cost = self.predict(budget)
+        return cost is None or cost <= time_left
+
+    def reset(self):
+        self.stats = {}
@@ -0,0 +1,119 @@
+import csv
+import numpy as np
+
+
+def _predicted_cost(predict, budget):
+    cost = predict(budget)
+    # without observations, the cost is taken to grow linearly with the budget
+    return budget if cost is None else cost
+
+
+def oldest_first(brackets, predict):
+    '''Chooses the bracket started first, the order of synchronous Hyperband
+    '''
+    return min(brackets, key=lambda bracket: bracket.bracket_id)
+
+
+def longest_first(brackets, predict):
+    '''Chooses the bracket whose next job is predicted to take longest, such that long jobs do not
+    start last and leave the other workers idle at the end of the run
+    '''
+    return max(brackets, key=lambda bracket: (
+        _predicted_cost(predict, bracket.get_next_job_budget()), -bracket.bracket_id
+    ))
+
+
+def shortest_first(brackets, predict):
+    '''Chooses the bracket whose next job is predicted to take shortest
+    '''
+    return min(brackets, key=lambda bracket: (
+        _predicted_cost(predict, bracket.get_next_job_budget()), bracket.bracket_id
+    ))
+
+
+JOB_ORDERINGS = {
+    "bracket": oldest_first,
+    "longest": longest_first,
+    "shortest": shortest_first
+}
+
+
+def get_job_ordering(job_ordering="bracket"):
+    '''Returns the policy choosing the bracket PDEHB schedules the next job from
+
+    Parameters
+    ----------
+    job_ordering : str or callable
+        "bracket" - the oldest bracket a job can be scheduled from
+        "longest" - the bracket whose next job is predicted to take longest
+        "shortest" - the bracket whose next job is predicted to take shortest
+        A callable is called with the list of brackets a job can be scheduled from and a function
+        returning the predicted cost of a job on a budget (None if unknown), and returns one of
+        the brackets.
+    '''
+    if callable(job_ordering):
+        return job_ordering
+    if job_ordering in JOB_ORDERINGS:
+        return JOB_ORDERINGS[job_ordering]
+    raise ValueError("{} is not a valid choice of job ordering, choose from {} or pass a "
+                     "callable".format(job_ordering, list(JOB_ORDERINGS)))
+
+
+class ScheduleLog():
+    '''Decisions of the scheduler of PDEHB, to compare job orderings
+
+    For every job submitted, the bracket and budget it was scheduled from, its predicted cost, the
+    times it was submitted and finished, and the cost it returned. Jobs cancelled or still running
+    have no finish time.
+    '''
+    columns = ["bracket_id", "budget", "predicted", "submitted", "finished", "cost"]
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.data = {column: [] for column in self.columns}
+
+    def __len__(self):
+        return len(self.data["budget"])
+
+    def submit(self, job_info, predicted, submitted):
+        '''Records the submission of a job and returns its index in the log
+        '''
+        self.data["bracket_id"].append(job_info["bracket_id"])
+        self.data["budget"].append(job_info["budget"])
+        self.data["predicted"].append(np.nan if predicted is None else predicted)
+        self.data["submitted"].append(submitted)
+        self.data["finished"].append(np.nan)
+        self.data["cost"].append(np.nan)
+        return len(self) - 1
+
+    def finish(self, index, finished, cost):
+        self.data["finished"][index] = finished
+        self.data["cost"][index] = cost
+
+    def summary(self, n_workers=1):
+        '''Returns the makespan of the jobs finished, the worker-seconds they kept n_workers busy
+        and idle, and the mean absolute error of the predicted costs
+        '''
+        data = {column: np.array(self.data[column], dtype=float)
+                for column in self.columns if column != "bracket_id"}
+        done = ~np.isnan(data["finished"])
+        if not np.any(done):
+            return {"jobs": 0, "makespan": 0, "busy_worker_seconds": 0,
+                    "idle_worker_seconds": 0, "utilization": 0, "prediction_mae": np.nan}
+        makespan = np.max(data["finished"][done]) - np.min(data["submitted"][done])
+        busy = np.sum(data["finished"][done] - data["submitted"][done])
+        predicted = done & ~np.isnan(data["predicted"])
+        mae = np.mean(np.abs(data["predicted"][predicted] - data["cost"][predicted])) \
+            if np.any(predicted) else np.nan
+        return {"jobs": int(np.sum(done)), "makespan": makespan, "busy_worker_seconds": busy,
+                "idle_worker_seconds": max(0, n_workers * makespan - busy),
+                "utilization": busy / (n_workers * makespan) if makespan > 0 else 1,
+                "prediction_mae": mae}
+
+    def to_csv(self, path):
+        with open(path, "w", newline="") as fh:
+            writer = csv.writer(fh)
+            writer.writerow(self.columns)
+            writer.writerows(zip(*[self.data[column] for column in self.columns]))
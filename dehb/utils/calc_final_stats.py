@@ -6,30 +6,52 @@ import json
 import sys
 import pickle
 import argparse
-import collections
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+from dehb.utils.results import load_run
 
 
-def fill_trajectory(performance_list, time_list, replace_nan=np.NaN):
-    frame_dict = collections.OrderedDict()
-    counter = np.arange(0, len(performance_list))
-    for p, t, c in zip(performance_list, time_list, counter):
+def fill_trajectory(performance_list, time_list, replace_nan=np.nan, n_points=None):
+    '''Merges runs into a (time x run) matrix, filling every run forward in time
+
+    The rows are the union of the timestamps of all runs, or n_points log-spaced timestamps from
+    the first positive to the last timestamp if n_points is given, which bounds the size of the
+    matrix irrespective of the lengths of the runs. The value of a run at a timestamp is its
+    last value recorded at or before it.
+    '''
+    runs = []
+    for c, (p, t) in enumerate(zip(performance_list, time_list)):
         if len(p) != len(t):
             raise ValueError("(%d) Array length mismatch: %d != %d" %
                              (c, len(p), len(t)))
-        frame_dict[str(c)] = pd.Series(data=p, index=t)
-
-    # creates a dataframe where the rows are indexed based on time
-    # fills with NA for missing values for the respective timesteps
-    merged = pd.DataFrame(frame_dict)
-    # ffill() acts like a fillna() wherein a forward fill happens
-    # only remaining NAs for in the beginning until a value is recorded
-    merged = merged.ffill()
-
-    performance = merged.values  # converts to a 2D numpy array
-    time_ = merged.index.values        # retrieves the timestamps
+        p = np.asarray(p, dtype=float)
+        t = np.asarray(t, dtype=float)
+        order = np.argsort(t, kind='stable')
+        runs.append((p[order], t[order]))
+
+    if n_points is None:
+        time_ = np.unique(np.concatenate([t for _, t in runs])) if len(runs) > 0 else np.empty(0)
+    else:
+        t_min = min([t[t > 0][0] for _, t in runs if np.any(t > 0)], default=1)
+        t_max = max([t[-1] for _, t in runs if len(t) > 0], default=t_min)
+        time_ = np.geomspace(t_min, max(t_min, t_max), n_points)
+
+    # filled run by run (row by row), the transpose is returned
+    performance = np.full((len(runs), len(time_)), np.nan)
+    for c, (p, t) in enumerate(runs):
+        if len(t) == 0:
+            continue
+        # index of the last entry of the run at or before each timestamp, -1 if there is none
+        if n_points is None:
+            # the timestamps of the run are in time_, the indices are carried forward in time
+            idx = np.full(len(time_), -1)
+            idx[np.searchsorted(time_, t)] = np.arange(len(t))
+            idx = np.maximum.accumulate(idx)
+        else:
+            idx = np.searchsorted(t, time_, side='right') - 1
+        recorded = idx >= 0
+        performance[c, recorded] = p[idx[recorded]]
+    performance = performance.T
 
     performance[np.isnan(performance)] = replace_nan
 
@@ -57,6 +79,9 @@ parser.add_argument('--n_runs', default=500, type=int, nargs='?',
 parser.add_argument('--output_path', default="./", type=str, nargs='?',
                     help='specifies the path where the plot will be saved')
 parser.add_argument('--limit', default=1e7, type=float, help='wallclock limit')
+parser.add_argument('--n_points', default=None, type=int, nargs='?',
+                    help='number of log-spaced timestamps the runs are merged on, '
+                         'all timestamps of all runs if not given')
 parser.add_argument('--regret', default='validation', type=str, choices=['validation', 'test'],
                     help='type of regret')
 
@@ -167,9 +192,9 @@ for index, (m, label) in enumerate(methods):
     for k, i in enumerate(np.arange(n_runs)):
         try:
             if benchmark in ['101', '201']:
-                res = json.load(open(os.path.join(path, m, "run_%d.json" % i)))
+                res = load_run(os.path.join(path, m), i)
             else:
-                res = json.load(open(os.path.join(path, m, str(ssp), "run_%d.json" % i)))
+                res = load_run(os.path.join(path, m, str(ssp)), i)
             no_runs_found = False
         except Exception as e:
             print(m, i, e)
@@ -185,9 +210,10 @@ for index, (m, label) in enumerate(methods):
     if not no_runs_found:
         # finds the latest time where the first measurement was made across runs
         t = np.max([runtimes[i][0] for i in range(len(runtimes))])
-        te, time = fill_trajectory(regret, runtimes, replace_nan=1)
+        te, time = fill_trajectory(regret, runtimes, replace_nan=1,
+                                   n_points=args.n_points)
 
-        idx = time.tolist().index(t)
+        idx = np.searchsorted(time, t)
         te = te[idx:, :]
         time = time[idx:]
 
@@ -6,8 +6,7 @@ import json
 import sys
 import pickle
 import argparse
-import collections
-import pandas as pd
+import functools
 import numpy as np
 import matplotlib.pyplot as plt
 #import seaborn
@@ -42,24 +41,47 @@ marker=['x', '^', 'D', 'o', 's', 'h', '*', 'v', '<', ">"]
 linestyles = ['-', '--', '-.', ':']
 
 
-def fill_trajectory(performance_list, time_list, replace_nan=np.NaN):
-    frame_dict = collections.OrderedDict()
-    counter = np.arange(0, len(performance_list))
-    for p, t, c in zip(performance_list, time_list, counter):
+def fill_trajectory(performance_list, time_list, replace_nan=np.nan, n_points=None):
+    '''Merges runs into a (time x run) matrix, filling every run forward in time
+
+    The rows are the union of the timestamps of all runs, or n_points log-spaced timestamps from
+    the first positive to the last timestamp if n_points is given, which bounds the size of the
+    matrix irrespective of the lengths of the runs. The value of a run at a timestamp is its
+    last value recorded at or before it.
+    '''
+    runs = []
+    for c, (p, t) in enumerate(zip(performance_list, time_list)):
         if len(p) != len(t):
             raise ValueError("(%d) Array length mismatch: %d != %d" %
                              (c, len(p), len(t)))
-        frame_dict[str(c)] = pd.Series(data=p, index=t)
-
-    # creates a dataframe where the rows are indexed based on time
-    # fills with NA for missing values for the respective timesteps
-    merged = pd.DataFrame(frame_dict)
-    # ffill() acts like a fillna() wherein a forward fill happens
-    # only remaining NAs for in the beginning until a value is recorded
-    merged = merged.ffill()
-
-    performance = merged.get_values()  # converts to a 2D numpy array
-    time_ = merged.index.values        # retrieves the timestamps
+        p = np.asarray(p, dtype=float)
+        t = np.asarray(t, dtype=float)
+        order = np.argsort(t, kind='stable')
+        runs.append((p[order], t[order]))
+
+    if n_points is None:
+        time_ = np.unique(np.concatenate([t for _, t in runs])) if len(runs) > 0 else np.empty(0)
+    else:
+        t_min = min([t[t > 0][0] for _, t in runs if np.any(t > 0)], default=1)
+        t_max = max([t[-1] for _, t in runs if len(t) > 0], default=t_min)
+        time_ = np.geomspace(t_min, max(t_min, t_max), n_points)
+
+    # filled run by run (row by row), the transpose is returned
+    performance = np.full((len(runs), len(time_)), np.nan)
+    for c, (p, t) in enumerate(runs):
+        if len(t) == 0:
+            continue
+        # index of the last entry of the run at or before each timestamp, -1 if there is none
+        if n_points is None:
+            # the timestamps of the run are in time_, the indices are carried forward in time
+            idx = np.full(len(time_), -1)
+            idx[np.searchsorted(time_, t)] = np.arange(len(t))
+            idx = np.maximum.accumulate(idx)
+        else:
+            idx = np.searchsorted(t, time_, side='right') - 1
+        recorded = idx >= 0
+        performance[c, recorded] = p[idx[recorded]]
+    performance = performance.T
 
     performance[np.isnan(performance)] = replace_nan
 
@@ -96,6 +118,9 @@ parser.add_argument('--name', default="comparison", type=str,
 parser.add_argument('--title', default="benchmark", type=str,
                     help='title name for the plot')
 parser.add_argument('--limit', default=1e7, type=float, help='wallclock limit')
+parser.add_argument('--n_points', default=None, type=int, nargs='?',
+                    help='number of log-spaced timestamps the runs are merged on, '
+                         'all timestamps of all runs if not given')
 parser.add_argument('--regret', default='test', type=str, choices=['validation', 'test'],
                     help='type of regret')
 parser.add_argument('--output', default='pdf', type=str, choices=['pdf', 'png'],
@@ -147,6 +172,10 @@ elif benchmark == 'bnn':
 elif benchmark == 'cc18':
     from dehb.examples.cc18 import create_plot
 
+if args.n_points is not None:
+    # the plotting functions of the benchmarks merge runs on the log-spaced timestamps
+    fill_trajectory = functools.partial(fill_trajectory, n_points=args.n_points)
+
 # Loading file for algo list
 with open(args.file, 'r') as f:
     methods = eval(f.readlines()[0])
@@ -0,0 +1,201 @@
+'''Binary store of the results of all runs of a method on a benchmark
+
+The store lives in the folder the runs used to be dumped to as run_{id}.json. Every column (e.g.,
+regret_test, runtime or the columns of the evaluation history) is one binary file the runs are
+appended to, and a small JSON manifest records the offset and the number of rows of every run in
+every column. Readers memory-map the column files, such that only the pages of the columns (and
+runs) accessed are read from disk.
+
+Writing takes a lock on the folder such that the processes running different seeds of the same
+method (see run_experiments.py) can append to one store. The manifest is replaced atomically
+after the columns are written, so rows of an interrupted write are never referenced.
+
+Numeric columns are stored as float64 (boolean ones as bool), such that the runs appended to a
+column share its type whatever the type of the values of the first run was.
+'''
+
+import os
+import json
+import numpy as np
+from collections import OrderedDict
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+MANIFEST_FILE = "results.json"
+LOCK_FILE = ".results.lock"
+# columns of the evaluation history stored with a run, see dehb.optimizers.History
+HISTORY_COLUMNS = ["configs", "fitness", "budgets", "costs", "brackets", "timestamps"]
+# readers kept open by load_run(), the least recently used is closed first
+MAX_READERS = 16
+
+
+def _column_file(path, column):
+    return os.path.join(path, "results.{}.bin".format(column))
+
+
+def _column_spec(array):
+    dtype = np.dtype(bool) if array.dtype.kind == "b" else np.dtype(np.float64)
+    return {"dtype": dtype.str, "width": int(np.prod(array.shape[1:]))}
+
+
+def _check_column(key, array, spec):
+    '''Raises if array can not be appended to the column of spec without losing values
+    '''
+    dtype = np.dtype(spec["dtype"])
+    if not np.can_cast(array.dtype, dtype, casting="same_kind"):
+        raise ValueError("Column {} is stored as {}, values of type {} can not be appended "
+                         "to it".format(key, dtype, array.dtype))
+    if int(np.prod(array.shape[1:])) != spec["width"]:
+        raise ValueError("Column {} has {} values per row, not {}".format(
+            key, spec["width"], int(np.prod(array.shape[1:]))
+        ))
+
+
+def _read_manifest(path):
+    manifest_file = os.path.join(path, MANIFEST_FILE)
+    if not os.path.isfile(manifest_file):
+        return {"columns": {}, "runs": {}}
+    with open(manifest_file, "r") as fh:
+        return json.load(fh)
+
+
+class ResultsWriter():
+    '''Appends runs to the store in the folder path
+    '''
+    def __init__(self, path):
+        self.path = path
+
+    def _lock(self):
+        fh = open(os.path.join(self.path, LOCK_FILE), "a")
+        if fcntl is not None:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+        return fh
+
+    def write(self, run_id, res, history=None):
+        '''Adds run run_id (replacing an earlier run of the same ID)
+
+        res is the dict of results which was dumped as JSON. Numeric lists and arrays are stored
+        as columns, anything else (e.g. strings) in the manifest. If history is given, its
+        columns are stored as history_configs, history_fitness, etc.
+        '''
+        os.makedirs(self.path, exist_ok=True)
+        columns, extra = {}, {}
+        for key, value in res.items():
+            array = np.asarray(value)
+            if array.ndim > 0 and array.dtype.kind in "biuf":
+                columns[key] = array
+            else:
+                extra[key] = value
+        if history is not None:
+            for name in HISTORY_COLUMNS:
+                columns["history_{}".format(name)] = np.asarray(getattr(history, name))
+
+        lock = self._lock()
+        try:
+            manifest = _read_manifest(self.path)
+            run = {"columns": {}, "extra": extra}
+            for key, array in columns.items():
+                spec = manifest["columns"].setdefault(key, _column_spec(array))
+                _check_column(key, array, spec)
+                array = np.ascontiguousarray(array, dtype=np.dtype(spec["dtype"]))
+                row_size = array.itemsize * max(spec["width"], 1)
+                column_file = _column_file(self.path, key)
+                open(column_file, "ab").close()
+                with open(column_file, "r+b") as fh:
+                    # a partial row left by an interrupted write is overwritten
+                    offset = os.path.getsize(column_file) // row_size
+                    fh.seek(offset * row_size)
+                    fh.truncate()
+                    fh.write(array.tobytes())
+                    fh.flush()
+                    os.fsync(fh.fileno())
+                run["columns"][key] = [offset, len(array)]
+            manifest["runs"][str(run_id)] = run
+            tmp_file = os.path.join(self.path, MANIFEST_FILE + ".tmp")
+            with open(tmp_file, "w") as fh:
+                json.dump(manifest, fh)
+                fh.flush()
+                os.fsync(fh.fileno())
+            os.replace(tmp_file, os.path.join(self.path, MANIFEST_FILE))
+        finally:
+            lock.close()
+
+
+class ResultsReader():
+    '''Reads runs from the store in the folder path
+
+    The arrays returned are read-only views on the memory-mapped column files.
+    '''
+    def __init__(self, path):
+        self.path = path
+        self.manifest = _read_manifest(path)
+        self._maps = {}
+
+    @property
+    def run_ids(self):
+        return sorted(int(run_id) for run_id in self.manifest["runs"])
+
+    def __contains__(self, run_id):
+        return str(run_id) in self.manifest["runs"]
+
+    def __len__(self):
+        return len(self.manifest["runs"])
+
+    def _column(self, key):
+        if key not in self._maps:
+            spec = self.manifest["columns"][key]
+            column = np.memmap(_column_file(self.path, key), dtype=np.dtype(spec["dtype"]),
+                               mode="r")
+            if spec["width"] != 1:
+                column = column[:len(column) - len(column) % spec["width"]]
+                column = column.reshape(-1, spec["width"])
+            self._maps[key] = column
+        return self._maps[key]
+
+    def load(self, run_id, columns=None):
+        '''Returns the results of run run_id as a dict, restricted to columns if given
+        '''
+        run = self.manifest["runs"][str(run_id)]
+        res = {}
+        for key, value in run["extra"].items():
+            if columns is None or key in columns:
+                res[key] = value
+        for key, (offset, n) in run["columns"].items():
+            if columns is None or key in columns:
+                res[key] = self._column(key)[offset:offset + n]
+        return res
+
+
+_readers = OrderedDict()  # (modification time of the manifest, reader) by path
+
+
+def load_run(path, run_id, columns=None):
+    '''Returns the results of run run_id of the method in the folder path
+
+    Falls back to the run_{id}.json of runs written before the binary store was used.
+    '''
+    manifest_file = os.path.join(path, MANIFEST_FILE)
+    if os.path.isfile(manifest_file):
+        # readers are reused till the manifest is replaced by a new write
+        mtime = os.stat(manifest_file).st_mtime_ns
+        if path not in _readers or _readers[path][0] != mtime:
+            # the reader of an older manifest is dropped, which closes its memory maps
+            _readers[path] = (mtime, ResultsReader(path))
+        _readers.move_to_end(path)
+        while len(_readers) > MAX_READERS:
+            _readers.popitem(last=False)
+        reader = _readers[path][1]
+        if run_id in reader:
+            return reader.load(run_id, columns)
+    with open(os.path.join(path, "run_{}.json".format(run_id)), "r") as fh:
+        return json.load(fh)
+
+
+def save_run(path, run_id, res, history=None):
+    '''Adds run run_id to the store in the folder path
+    '''
+    ResultsWriter(path).write(run_id, res, history)
@@ -0,0 +1,165 @@
+import os
+import re
+import sys
+import glob
+import argparse
+import itertools
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from dehb.utils.results import ResultsReader
+
+
+benchmarks = ['bnn', 'cartpole', 'cc18', 'countingones', 'nas101', 'nas1shot1', 'nas201', 'svm',
+              'paramnet']
+# the hyperparameters of the grid each optimizer's scripts take
+optimizer_params = {
+    'de': ['mutation_factor', 'crossover_prob', 'strategy'],
+    'dehb': ['mutation_factor', 'crossover_prob', 'strategy', 'eta'],
+    'pdehb': ['mutation_factor', 'crossover_prob', 'strategy', 'eta']
+}
+param_abbreviations = {
+    'mutation_factor': 'F', 'crossover_prob': 'Cr', 'strategy': '', 'eta': 'eta'
+}
+
+
+def get_script(benchmark, optimizer):
+    return os.path.join('dehb', 'examples', benchmark,
+                        'run_{}_{}.py'.format(optimizer, benchmark))
+
+
+def get_cells(args):
+    """ Returns the cells of the grid as (benchmark, optimizer, params) tuples
+    """
+    grid = {
+        'mutation_factor': args.F,
+        'crossover_prob': args.Cr,
+        'strategy': args.strategy,
+        'eta': args.eta
+    }
+    cells = []
+    for benchmark, optimizer in itertools.product(args.benchmarks, args.optimizers):
+        names = optimizer_params.get(optimizer, [])
+        for values in itertools.product(*[grid[name] for name in names]):
+            cells.append((benchmark, optimizer, dict(zip(names, values))))
+    return cells
+
+
+def get_folder(optimizer, params):
+    """ Name of the folder the runs of a cell are written to, e.g., dehb_F0.5_Cr0.5_rand1_bin_eta3
+    """
+    name = [optimizer]
+    for param, value in params.items():
+        name.append('{}{}'.format(param_abbreviations[param], value))
+    return '_'.join(name)
+
+
+def finished_runs(output_path, folder):
+    """ Returns the run IDs saved under output_path/**/folder, in a results store or run_{id}.json
+    """
+    runs = set()
+    for path in glob.glob(os.path.join(output_path, '**', folder), recursive=True):
+        runs.update(ResultsReader(path).run_ids)
+        for filename in glob.glob(os.path.join(path, 'run_*.json')):
+            match = re.match(r'run_(\d+)\.json$', os.path.basename(filename))
+            if match is not None:
+                runs.add(int(match.group(1)))
+    return runs
+
+
+def get_chunks(run_ids, chunk_size):
+    """ Splits run IDs into chunks of consecutive IDs of at most chunk_size
+    """
+    chunks = []
+    for run_id in sorted(run_ids):
+        if len(chunks) > 0 and chunks[-1][-1] == run_id - 1 and len(chunks[-1]) < chunk_size:
+            chunks[-1].append(run_id)
+        else:
+            chunks.append([run_id])
+    return chunks
+
+
+def get_jobs(args, extra_args):
+    """ Returns the command lines to run, one per chunk of seeds of every cell
+
+    Every command runs a chunk of consecutive seeds through the existing --runs/--run_start
+    interface of the scripts, such that the benchmark data is loaded once per chunk.
+    """
+    jobs = []
+    for benchmark, optimizer, params in get_cells(args):
+        script = get_script(benchmark, optimizer)
+        if not os.path.isfile(script):
+            print("Skipping {} on {}: {} not found".format(optimizer, benchmark, script))
+            continue
+        output_path = os.path.join(args.output_path, benchmark)
+        folder = get_folder(optimizer, params)
+        todo = set(range(args.run_start, args.run_start + args.runs))
+        todo -= finished_runs(output_path, folder)
+        for chunk in get_chunks(todo, args.chunk_size):
+            cmd = [sys.executable, script, '--output_path', output_path, '--folder', folder,
+                   '--run_start', str(chunk[0]), '--runs', str(len(chunk))]
+            for param, value in params.items():
+                cmd.extend(['--{}'.format(param), str(value)])
+            jobs.append(cmd + extra_args)
+    return jobs
+
+
+def run_job(cmd, log_path):
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    with open(log_path, 'w') as fh:
+        return subprocess.call(cmd, stdout=fh, stderr=subprocess.STDOUT)
+
+
+def get_log_path(cmd):
+    output_path = cmd[cmd.index('--output_path') + 1]
+    folder = cmd[cmd.index('--folder') + 1]
+    run_start = cmd[cmd.index('--run_start') + 1]
+    return os.path.join(output_path, 'logs', '{}_{}.log'.format(folder, run_start))
+
+
+parser = argparse.ArgumentParser(
+    description="Runs a grid of benchmarks x optimizers x hyperparameters x seeds in parallel. "
+                "Arguments not listed are passed on to all the scripts, e.g., --iter 10."
+)
+parser.add_argument('--benchmarks', default=['svm'], type=str, nargs='+', choices=benchmarks)
+parser.add_argument('--optimizers', default=['dehb'], type=str, nargs='+',
+                    help='runs dehb/examples/<benchmark>/run_<optimizer>_<benchmark>.py')
+parser.add_argument('--runs', default=10, type=int, help='number of seeds (runs) per cell')
+parser.add_argument('--run_start', default=0, type=int, help='run index (seed) to start with')
+parser.add_argument('--F', default=[0.5], type=float, nargs='+', help='mutation factor values')
+parser.add_argument('--Cr', default=[0.5], type=float, nargs='+', help='crossover prob values')
+parser.add_argument('--eta', default=[3], type=int, nargs='+', help='eta values')
+parser.add_argument('--strategy', default=['rand1_bin'], type=str, nargs='+',
+                    help='DE strategies')
+parser.add_argument('--n_processes', default=os.cpu_count(), type=int,
+                    help='number of runs executed simultaneously, each in its own process')
+parser.add_argument('--chunk_size', default=5, type=int,
+                    help='maximum number of seeds run by one process')
+parser.add_argument('--output_path', default="./results", type=str,
+                    help='results are written to <output_path>/<benchmark>/...')
+parser.add_argument('--dry_run', action='store_true', help='only prints the commands')
+
+
+if __name__ == "__main__":
+    args, extra_args = parser.parse_known_args()
+    jobs = get_jobs(args, extra_args)
+    print("{} processes to run".format(len(jobs)))
+    if args.dry_run:
+        for cmd in jobs:
+            print(' '.join(cmd))
+        sys.exit(0)
+
+    # every job is a process of its own, the threads only wait on them
+    failed = 0
+    with ThreadPoolExecutor(max_workers=args.n_processes) as pool:
+        futures = {pool.submit(run_job, cmd, get_log_path(cmd)): cmd for cmd in jobs}
+        for i, future in enumerate(as_completed(futures), start=1):
+            cmd = futures[future]
+            returncode = future.result()
+            failed += returncode != 0
+            print("[{}/{}] {} {}".format(
+                i, len(jobs), 'FAILED' if returncode != 0 else 'done', ' '.join(cmd[1:])
+            ))
+    if failed > 0:
+        print("{} processes failed, see the logs in <output_path>/<benchmark>/logs".format(failed))
+        sys.exit(1)
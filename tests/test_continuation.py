@@ -0,0 +1,51 @@
+import os
+
+import numpy as np
+
+from dehb import DEHB
+from dehb.optimizers import ContinuationStore
+
+
+def f(x, budget=None, trial_id=None, previous_budget=None, store=None):
+    store.save(trial_id, budget, {"budget": budget})
+    return float(np.sum((np.asarray(x) - 0.5) ** 2)), 1.0
+
+
+def make_dehb(path):
+    return DEHB(f=f, dimensions=2, min_budget=1, max_budget=9, eta=3, strategy="rand1_bin",
+                mutation_factor=0.5, crossover_prob=0.5, configspace=False, seed=0,
+                continuation=str(path))
+
+
+def test_clear_removes_only_recorded_checkpoints(tmp_path):
+    other = tmp_path / "configspace.pkl"
+    other.write_bytes(b"not a checkpoint")
+    store = ContinuationStore(str(tmp_path))
+    store.save("a", 1, {"x": 1})
+    store.record("a", 1)
+    store.clear()
+    assert other.exists()
+    assert not os.path.exists(store.file("a", 1))
+    assert store.budgets == {}
+
+
+def test_construction_keeps_files(tmp_path):
+    other = tmp_path / "configspace.pkl"
+    other.write_bytes(b"not a checkpoint")
+    make_dehb(tmp_path)
+    assert other.exists()
+
+
+def test_resume_keeps_checkpoints(tmp_path):
+    store_dir, checkpoint_dir = tmp_path / "store", tmp_path / "checkpoint"
+    dehb = make_dehb(store_dir)
+    dehb.run(iterations=1, checkpoint_dir=str(checkpoint_dir))
+    records = {trial: list(budgets) for trial, budgets in dehb.continuation.budgets.items()}
+    assert len(records) > 0
+    # the same object and a new one resume the run with the checkpoints of the objective
+    for resumed in [dehb, make_dehb(store_dir)]:
+        resumed.run(iterations=1, checkpoint_dir=str(checkpoint_dir))
+        for trial, budgets in records.items():
+            assert resumed.continuation.budgets[trial] == budgets
+            for budget in budgets:
+                assert os.path.exists(resumed.continuation.file(trial, budget))
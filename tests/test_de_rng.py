@@ -0,0 +1,36 @@
+import numpy as np
+
+from dehb import DE
+
+
+def f(x, budget=None):
+    return float(np.sum((np.asarray(x) - 0.5) ** 2)), 1.0
+
+
+def make_de(**kwargs):
+    return DE(f=f, dimensions=3, pop_size=10, mutation_factor=0.5, crossover_prob=0.5,
+              strategy="rand1_bin", configspace=False, **kwargs)
+
+
+def test_global_seed_before_run_reproduces_run():
+    de = make_de()
+    np.random.seed(0)
+    traj, _, _ = de.run(generations=3)
+    np.random.seed(0)
+    traj_again, _, _ = de.run(generations=3)
+    assert np.array_equal(traj, traj_again)
+
+
+def test_seed_reproduces_every_run():
+    de = make_de(seed=1)
+    traj, _, _ = de.run(generations=3)
+    traj_again, _, _ = de.run(generations=3)
+    assert np.array_equal(traj, make_de(seed=1).run(generations=3)[0])
+    assert np.array_equal(traj, traj_again)
+
+
+def test_generator_passed_is_not_reseeded():
+    rng = np.random.default_rng(1)
+    de = make_de(rng=rng)
+    de.run(generations=1)
+    assert de.rng is rng
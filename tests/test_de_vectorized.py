@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from dehb import DE, AsyncDE
+
+
+MUTATIONS = ["rand1", "rand2", "rand2dir", "best1", "best2", "currenttobest1", "randtobest1"]
+CROSSOVERS = ["bin", "exp"]
+DIMENSIONS = 4
+POP_SIZE = 10
+GENERATIONS = 400
+
+
+def make_de(cls, strategy, seed):
+    de = cls(dimensions=DIMENSIONS, pop_size=POP_SIZE, mutation_factor=0.5, crossover_prob=0.5,
+             strategy=strategy, configspace=False, seed=seed)
+    rng = np.random.default_rng(0)
+    de.population = rng.uniform(size=(POP_SIZE, DIMENSIONS))
+    de.fitness = rng.uniform(size=POP_SIZE)
+    return de
+
+
+def scalar_trials(de):
+    # the loop of evolve_generation() without the vectorized path
+    trials = []
+    for j in range(de.pop_size):
+        # crossover_exp() writes into the target, which is a view on the population
+        target = de.population[j].copy()
+        if isinstance(de, AsyncDE):
+            donor = de.mutation(current=target, current_idx=j)
+        else:
+            donor = de.mutation(current=target)
+        trial = de.crossover(target, donor)
+        trials.append(de.boundary_check(trial))
+    return np.array(trials)
+
+
+def sample(de, generate):
+    population = de.population.copy()
+    trials = []
+    for _ in range(GENERATIONS):
+        de.population = population.copy()
+        trials.append(generate(de))
+    # (generations, targets, dimensions)
+    return np.array(trials), population
+
+
+@pytest.mark.parametrize("cls", [DE, AsyncDE])
+@pytest.mark.parametrize("crossover", CROSSOVERS)
+@pytest.mark.parametrize("mutation", MUTATIONS)
+def test_batched_trials_match_scalar_distribution(cls, mutation, crossover):
+    strategy = "{}_{}".format(mutation, crossover)
+    scalar, population = sample(make_de(cls, strategy, seed=1), scalar_trials)
+    batched, _ = sample(make_de(cls, strategy, seed=2), lambda de: de.generate_trials())
+    assert batched.shape == scalar.shape
+
+    # per-dimension means and deviations over all targets
+    scalar_flat = scalar.reshape(-1, DIMENSIONS)
+    batched_flat = batched.reshape(-1, DIMENSIONS)
+    assert np.allclose(batched_flat.mean(axis=0), scalar_flat.mean(axis=0), atol=0.03)
+    assert np.allclose(batched_flat.std(axis=0), scalar_flat.std(axis=0), atol=0.03)
+    # per-target means, each target having its own mutation pool
+    assert np.allclose(batched.mean(axis=0), scalar.mean(axis=0), atol=0.1)
+    # share of the dimensions inherited from the target by crossover
+    inherited = np.mean(scalar == population)
+    assert abs(np.mean(batched == population) - inherited) < 0.03
+    assert np.all((batched >= 0) & (batched <= 1))
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from dehb import DEHB
+
+
+def f(x, budget=None):
+    return float(np.sum((np.asarray(x) - 0.5) ** 2)), 1.0
+
+
+def make_dehb(**kwargs):
+    return DEHB(f=f, dimensions=2, min_budget=1, max_budget=9, eta=3, strategy="rand1_bin",
+                mutation_factor=0.5, crossover_prob=0.5, configspace=False, seed=0, **kwargs)
+
+
+def ask_tell(dehb, n_jobs, n=4):
+    told = 0
+    while told < n_jobs:
+        jobs = dehb.ask(n)
+        assert len(jobs) > 0
+        for job in jobs:
+            dehb.tell(job, *f(job["configuration"], job["budget"]))
+            told += 1
+
+
+@pytest.mark.parametrize("async_strategy", ["deferred", "immediate", "random", "worst"])
+def test_ask_tell_one_job_at_a_time_matches_run(async_strategy):
+    _, _, history = make_dehb(async_strategy=async_strategy).run(iterations=6)
+    dehb = make_dehb(async_strategy=async_strategy)
+    ask_tell(dehb, len(history), n=1)
+    assert np.array_equal(dehb.history.configs, history.configs)
+    assert np.array_equal(dehb.history.fitness, history.fitness)
+    assert np.array_equal(dehb.history.budgets, history.budgets)
+    assert np.array_equal(dehb.history.brackets, history.brackets)
+
+
+def test_ask_hands_out_the_jobs_of_a_rung():
+    dehb = make_dehb()
+    # the first rung of the first bracket evaluates 9 configurations on budget 1
+    jobs = dehb.ask(4) + dehb.ask(10)
+    assert len(jobs) == 9
+    assert dehb.ask(1) == []
+    for job in jobs:
+        dehb.tell(job, *f(job["configuration"], job["budget"]))
+    # the 3 best are promoted to budget 3
+    promoted = dehb.ask(10)
+    assert [job["budget"] for job in promoted] == [3, 3, 3]
+    with pytest.raises(ValueError):
+        dehb.tell(jobs[0], 0.0, 1.0)
+    dehb.close()
+
+
+def test_run_and_reset_raise_during_session():
+    dehb = make_dehb()
+    ask_tell(dehb, 5)
+    with pytest.raises(RuntimeError):
+        dehb.run(iterations=1)
+    with pytest.raises(RuntimeError):
+        dehb.reset()
+    dehb.close()
+
+
+def test_run_after_ask_tell():
+    dehb = make_dehb()
+    ask_tell(dehb, 20)
+    dehb.close()
+    traj, runtime, history = dehb.run(iterations=2)
+    assert len(history) > 0
+    assert np.all(np.isfinite(traj))
+
+
+def test_new_session_after_close():
+    dehb = make_dehb()
+    ask_tell(dehb, 5)
+    dehb.close()
+    dehb.close()  # closing twice is a no-op
+    ask_tell(dehb, 5)
+    dehb.close()
+
+
+def test_jobs_dropped_by_close_are_asked_for_again():
+    _, _, history = make_dehb().run(iterations=3)
+    dehb = make_dehb()
+    ask_tell(dehb, 5, n=1)
+    dropped = dehb.ask(2)
+    dehb.close()
+    jobs = dehb.ask(2)
+    assert [job["parent_id"] for job in jobs] == [job["parent_id"] for job in dropped]
+    for job in jobs:
+        dehb.tell(job, *f(job["configuration"], job["budget"]))
+    ask_tell(dehb, len(history) - 7, n=1)
+    assert np.array_equal(dehb.history.fitness, history.fitness)
@@ -0,0 +1,111 @@
+import time
+
+import numpy as np
+
+from dehb import PDEHB
+
+
+def f(x, budget=None):
+    return float(np.sum((np.asarray(x) - 0.5) ** 2)), float(budget)
+
+
+def f_sleep(x, budget=None):
+    time.sleep(0.01 * budget)
+    return f(x, budget)[0], 0.01 * budget
+
+
+def make_pdehb(objective=f, **kwargs):
+    pdehb = PDEHB(f=objective, dimensions=2, min_budget=1, max_budget=27, eta=3,
+                  strategy="rand1_bin", mutation_factor=0.5, crossover_prob=0.5,
+                  configspace=False, seed=0, **kwargs)
+    return pdehb
+
+
+def observe_costs(pdehb):
+    # the cost of a job is its budget
+    for budget in pdehb.budgets:
+        pdehb.runtime_model.observe(budget, budget)
+
+
+def next_jobs(pdehb, n):
+    jobs = []
+    for _ in range(n):
+        job_info = pdehb._get_next_job()
+        pdehb.submit_job(job_info)
+        jobs.append(job_info)
+    return jobs
+
+
+def test_rejected_promotion_is_not_lost():
+    # the first rung of bracket 0 (budget 1) is evaluated, the next jobs are promotions to 3
+    pdehb, twin = make_pdehb(), make_pdehb()
+    for optimizer in [pdehb, twin]:
+        observe_costs(optimizer)
+        next_jobs(optimizer, 27)
+        assert optimizer.active_brackets[0].get_next_job_budget() == 3
+    # a promotion to budget 3 does not fit 2 seconds and is not admitted
+    assert pdehb._get_next_job(time_left=2, admission="skip") is None
+    for job, twin_job in zip(next_jobs(pdehb, 6), next_jobs(twin, 6)):
+        assert job["budget"] == twin_job["budget"]
+        assert job["bracket_id"] == twin_job["bracket_id"]
+        assert job["parent_id"] == twin_job["parent_id"]
+        assert np.array_equal(job["config"], twin_job["config"])
+
+
+def test_downgrade_leaves_bracket_unchanged():
+    pdehb = make_pdehb()
+    observe_costs(pdehb)
+    # bracket 2 starts on budget 9
+    pdehb.iteration_counter = 1
+    bracket = pdehb._start_new_bracket()
+    assert bracket.get_next_job_budget() == 9
+    rng_state = bracket.rng.bit_generator.state
+    pending = dict(bracket.sh_bracket)
+
+    job_info = pdehb._get_next_job(time_left=5, admission="downgrade")
+    assert job_info["budget"] == 3
+    assert job_info["bracket_id"] == -1
+    assert bracket.rng.bit_generator.state == rng_state
+    assert bracket.sh_bracket == pending
+    assert pdehb._get_next_job(time_left=0.5, admission="downgrade") is None
+
+
+def test_no_result_after_deadline_when_cancelling():
+    total_cost = 1.0
+    for admission in [None, "downgrade"]:
+        pdehb = make_pdehb(f_sleep, n_workers=4, backend="thread")
+        _, _, history = pdehb.run(total_cost=total_cost, admission=admission,
+                                  cancel_at_deadline=True)
+        finished = np.array(pdehb.schedule_log.data["finished"])
+        finished = finished[~np.isnan(finished)]
+        assert len(finished) == len(history)
+        assert np.all(finished <= pdehb.start + total_cost)
+        pdehb.backend.close()
+
+
+def test_resume_after_cancelled_deadline(tmp_path):
+    pdehb = make_pdehb(f_sleep, n_workers=4, backend="thread")
+    pdehb.run(total_cost=0.5, cancel_at_deadline=True, checkpoint_dir=str(tmp_path))
+    pdehb.backend.close()
+    assert len(pdehb.censored) > 0
+
+    resumed = make_pdehb(f_sleep, n_workers=4, backend="thread")
+    resumed.run(fevals=len(pdehb.history) + 30, checkpoint_dir=str(tmp_path))
+    resumed.backend.close()
+    # the cancelled jobs are evaluated, such that no bracket waits for a job not running
+    assert len(resumed.futures) == 0
+    assert not any(bracket.is_waiting() for bracket in resumed.active_brackets.values())
+
+
+def test_checkpoint_keeps_scheduling_state(tmp_path):
+    pdehb = make_pdehb(f_sleep, n_workers=4, backend="thread")
+    pdehb.run(total_cost=0.5, cancel_at_deadline=True, checkpoint_dir=str(tmp_path))
+    pdehb.backend.close()
+
+    resumed = make_pdehb()
+    assert resumed.load_checkpoint(str(tmp_path))
+    assert resumed.runtime_model.stats == pdehb.runtime_model.stats
+    assert len(resumed.censored) == len(pdehb.censored)
+    for column in ["budget", "predicted", "submitted", "finished", "cost"]:
+        assert np.array_equal(resumed.schedule_log.data[column], pdehb.schedule_log.data[column],
+                              equal_nan=True)
@@ -0,0 +1,74 @@
+import pickle
+
+import numpy as np
+
+from dehb import PDEHB
+from dehb.optimizers.backends import WorkerBackend, get_backend
+
+
+def f(x, budget=None):
+    return float(np.sum((np.asarray(x) - 0.5) ** 2)), float(budget)
+
+
+class RecordingBackend(WorkerBackend):
+    def __init__(self, backend):
+        self.backend = backend
+        self.closed = False
+
+    def submit(self, fn, *args):
+        return self.backend.submit(fn, *args)
+
+    def capacity(self):
+        return self.backend.capacity()
+
+    def wait(self, futures, timeout=None, return_when="FIRST_COMPLETED"):
+        return self.backend.wait(futures, timeout=timeout, return_when=return_when)
+
+    def close(self):
+        self.closed = True
+        self.backend.close()
+
+
+def make_pdehb(backend, **kwargs):
+    return PDEHB(f=f, dimensions=2, min_budget=1, max_budget=9, eta=3, strategy="rand1_bin",
+                 mutation_factor=0.5, crossover_prob=0.5, configspace=False, seed=0,
+                 backend=backend, **kwargs)
+
+
+def test_backend_passed_is_not_closed():
+    backend = RecordingBackend(get_backend("serial"))
+    pdehb = make_pdehb(backend)
+    pdehb.run(fevals=5)
+    pdehb.__del__()
+    del pdehb
+    assert not backend.closed
+
+
+def test_backend_created_is_closed():
+    pdehb = make_pdehb("thread")
+    pdehb.run(fevals=5)
+    executor = pdehb.backend.executor
+    pdehb.__del__()
+    assert executor._shutdown
+
+
+def test_process_backend_jobs_reference_worker_state():
+    pdehb = make_pdehb("process", n_workers=2)
+    _, _, history = pdehb.run(fevals=5)
+    assert len(history) >= 5
+    # the objective and decoder are installed in the workers, jobs only carry their name
+    assert len(pickle.dumps(pdehb._worker_state)) < 200
+    pdehb.backend.close()
+
+
+async def f_async(x, budget=None):
+    return f(x, budget)
+
+
+def test_asyncio_backend_closes_its_loop():
+    backend = get_backend("asyncio", n_workers=2)
+    PDEHB(f=f_async, dimensions=2, min_budget=1, max_budget=9, eta=3, strategy="rand1_bin",
+          mutation_factor=0.5, crossover_prob=0.5, configspace=False, seed=0,
+          backend=backend).run(fevals=5)
+    backend.close()
+    assert backend.loop.is_closed()
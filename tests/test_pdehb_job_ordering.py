@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from dehb import PDEHB
+from dehb.optimizers.scheduling import shortest_first
+
+
+def f(x, budget=None):
+    return float(np.sum((np.asarray(x) - 0.5) ** 2)), float(budget)
+
+
+@pytest.mark.parametrize("max_ordered_brackets", [32, 2])
+def test_ordering_chooses_among_oldest_ready_brackets(max_ordered_brackets):
+    calls = []
+
+    def ordering(brackets, predict):
+        calls.append([bracket.bracket_id for bracket in brackets])
+        return shortest_first(brackets, predict)
+
+    pdehb = PDEHB(f=f, dimensions=2, min_budget=1, max_budget=27, eta=3, strategy="rand1_bin",
+                  mutation_factor=0.5, crossover_prob=0.5, configspace=False, seed=0,
+                  job_ordering=ordering)
+    pdehb.max_ordered_brackets = max_ordered_brackets
+    for _ in range(5):
+        pdehb._start_new_bracket()
+    # submits the first rung of bracket 0, which then waits for its results
+    while pdehb.active_brackets[0].is_ready():
+        bracket = pdehb.active_brackets[0]
+        job_info = {"config": pdehb._acquire_config(bracket, bracket.get_next_job_budget())[0],
+                    "budget": bracket.get_next_job_budget(), "parent_id": 0, "bracket_id": 0}
+        pdehb.submit_job(job_info)
+
+    pdehb._next_ready_bracket()
+    assert calls[-1] == [1, 2, 3, 4][:max_ordered_brackets]
+    # the bracket no longer ready is dropped from the heap
+    assert 0 not in pdehb._ready_ids
+    pdehb._next_ready_bracket(brackets=3)
+    assert calls[-1] == [1, 2][:max_ordered_brackets]
+    pdehb.backend.close()
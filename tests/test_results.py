@@ -0,0 +1,43 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from dehb.utils import results
+from dehb.utils.results import MANIFEST_FILE, ResultsReader, load_run, save_run
+
+
+def test_float_values_after_int_run(tmp_path):
+    save_run(str(tmp_path), 0, {"runtime": [1, 2, 3]})
+    save_run(str(tmp_path), 1, {"runtime": [0.5, 1.25]})
+    reader = ResultsReader(str(tmp_path))
+    assert np.array_equal(reader.load(0)["runtime"], [1, 2, 3])
+    assert np.array_equal(reader.load(1)["runtime"], [0.5, 1.25])
+
+
+def test_mismatch_raises(tmp_path):
+    save_run(str(tmp_path), 0, {"configs": np.zeros((2, 3))})
+    with pytest.raises(ValueError):
+        save_run(str(tmp_path), 1, {"configs": np.zeros((2, 4))})
+    # a column of a store written with the type of its first run
+    manifest_file = os.path.join(str(tmp_path), MANIFEST_FILE)
+    with open(manifest_file) as fh:
+        manifest = json.load(fh)
+    manifest["columns"]["configs"]["dtype"] = np.dtype(np.int64).str
+    with open(manifest_file, "w") as fh:
+        json.dump(manifest, fh)
+    with pytest.raises(ValueError):
+        save_run(str(tmp_path), 1, {"configs": np.full((2, 3), 0.5)})
+
+
+def test_readers_are_bounded(tmp_path):
+    for i in range(results.MAX_READERS + 4):
+        path = str(tmp_path / str(i))
+        save_run(path, 0, {"runtime": [float(i)]})
+        assert load_run(path, 0)["runtime"][0] == i
+    assert len(results._readers) == results.MAX_READERS
+    # a new write replaces the reader of the folder
+    save_run(path, 1, {"runtime": [1.0]})
+    assert load_run(path, 1)["runtime"][0] == 1.0
+    assert len(results._readers) == results.MAX_READERS